@@ -0,0 +1,431 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# aiohttp is only needed for live pulls; the rest of the app never imports this module
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - depends on environment
+    aiohttp = None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Asynchronous ad-platform ingestion into the `metrics` schema.
+# - one connector per row of the `platforms` table; each (campaign, date
+#   window) is its own task and follows its report's pagination
+# - all tasks share one pooled aiohttp session; every connector has its own
+#   concurrency cap and token-bucket rate limit
+# - 429 / 5xx / network errors are retried with exponential backoff and
+#   jitter (Retry-After honoured)
+# - raw rows are normalized in bulk, per connector, to the metrics columns
+#
+#   python -m app.api_ingest --start 2025-01-01 --end 2025-03-31 \
+#       --base-url http://127.0.0.1:8799 --append-csv
+#   (scripts/mock_ads_api.py serves a local mock of all three platforms)
+
+METRICS_CSV = PROJECT_ROOT / "database" / "metrics.csv"
+CAMPAIGNS_CSV = PROJECT_ROOT / "database" / "campaigns.csv"
+METRIC_COLUMNS = ["campaign_id", "date", "impressions", "clicks", "conversions", "spend", "revenue"]
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+CSV_SCAN_ROWS = 500_000
+
+
+class IngestError(RuntimeError):
+    """A report request failed permanently (non-retryable status or retries exhausted)."""
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None if unusable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Server asked us to slow down: drain the bucket for `seconds`."""
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+@dataclass
+class IngestStats:
+    requests: int = 0
+    retries: int = 0
+    pages: int = 0
+    rows: int = 0
+    failed_tasks: int = 0
+    seconds: float = 0.0
+    per_platform: dict = field(default_factory=dict)
+
+    def as_dict(self):
+        out = {k: v for k, v in self.__dict__.items() if k != "per_platform"}
+        out["rows_per_sec"] = round(self.rows / self.seconds, 1) if self.seconds else 0.0
+        out["per_platform"] = dict(self.per_platform)
+        return out
+
+
+class BaseConnector:
+    """
+    One ad platform's daily campaign report. Subclasses describe the endpoint,
+    the pagination style and how raw fields map onto the metrics columns.
+    """
+    name = "base"
+    platform_id = None
+    env_url = None
+    default_url = None
+    path = "/report"
+    page_size = 500
+    # raw field -> metrics column
+    field_map = {}
+
+    def __init__(self, base_url=None, token=None, rate=20.0, concurrency=8, max_retries=5, backoff=0.5):
+        self.base_url = (base_url or os.getenv(self.env_url or "", "") or self.default_url or "").rstrip("/")
+        self.token = token or os.getenv(f"ADWISE_{self.name.upper()}_TOKEN", "")
+        self.limiter = RateLimiter(rate)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def params(self, campaign_id, start, end, cursor):
+        raise NotImplementedError
+
+    def parse(self, payload):
+        """(list of raw row dicts, next cursor or None) from one response page."""
+        raise NotImplementedError
+
+    def normalize(self, raw):
+        """Raw rows (DataFrame) -> metrics columns; vectorized per connector."""
+        df = raw.rename(columns=self.field_map)
+        for col in METRIC_COLUMNS:
+            if col not in df.columns:
+                df[col] = 0
+        return df[METRIC_COLUMNS]
+
+    async def fetch(self, session, campaign_id, start, end, stats):
+        """All pages of one campaign's report for [start, end]."""
+        rows, cursor = [], None
+        url = self.base_url + self.path
+        while True:
+            payload = await self._get(session, url, self.params(campaign_id, start, end, cursor), stats)
+            page, cursor = self.parse(payload)
+            rows.extend(page)
+            stats.pages += 1
+            if not cursor:
+                return rows
+
+    async def _get(self, session, url, params, stats):
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            stats.requests += 1
+            try:
+                async with session.get(url, params=params, headers=self.headers()) as resp:
+                    if resp.status == 200:
+                        return await resp.json()
+                    if resp.status not in RETRY_STATUS:
+                        raise IngestError(f"{self.name}: HTTP {resp.status} for {params}")
+                    retry_after = resp.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise IngestError(f"{self.name}: {e!r} for {params}") from e
+                retry_after = None
+            if attempt == self.max_retries:
+                break
+            stats.retries += 1
+            # exponential backoff with full jitter; a usable Retry-After wins
+            wait = retry_after_seconds(retry_after)
+            delay = wait if wait is not None else random.uniform(0, self.backoff * 2 ** attempt)
+            if wait is not None:
+                self.limiter.pause(delay)
+            await asyncio.sleep(delay)
+        raise IngestError(f"{self.name}: retries exhausted for {params}")
+
+
+class GoogleAdsConnector(BaseConnector):
+    """Google Ads style: `results` + `nextPageToken`, cost in micros."""
+    name = "google_ads"
+    platform_id = 1
+    env_url = "ADWISE_GOOGLE_ADS_URL"
+    path = "/google_ads/report"
+    field_map = {"campaignId": "campaign_id", "segmentsDate": "date", "impressions": "impressions",
+                 "clicks": "clicks", "conversions": "conversions", "conversionsValue": "revenue"}
+
+    def params(self, campaign_id, start, end, cursor):
+        p = {"campaignId": campaign_id, "startDate": start, "endDate": end, "pageSize": self.page_size}
+        if cursor:
+            p["pageToken"] = cursor
+        return p
+
+    def parse(self, payload):
+        return payload.get("results", []), payload.get("nextPageToken")
+
+    def normalize(self, raw):
+        micros = pd.to_numeric(raw["costMicros"], errors="coerce") if "costMicros" in raw else 0
+        return super().normalize(raw.assign(spend=micros / 1e6))
+
+
+class YouTubeConnector(BaseConnector):
+    """YouTube Analytics style: column headers + row arrays, `nextPageToken`."""
+    name = "youtube"
+    platform_id = 3
+    env_url = "ADWISE_YOUTUBE_URL"
+    path = "/youtube/report"
+    field_map = {"campaign": "campaign_id", "day": "date", "adImpressions": "impressions",
+                 "clicks": "clicks", "conversions": "conversions", "cost": "spend", "revenue": "revenue"}
+
+    def params(self, campaign_id, start, end, cursor):
+        p = {"filters": f"campaign=={campaign_id}", "startDate": start, "endDate": end, "maxResults": self.page_size}
+        if cursor:
+            p["pageToken"] = cursor
+        return p
+
+    def parse(self, payload):
+        names = [h["name"] for h in payload.get("columnHeaders", [])]
+        return [dict(zip(names, r)) for r in payload.get("rows", [])], payload.get("nextPageToken")
+
+
+class FacebookAdsConnector(BaseConnector):
+    """Marketing API style: `data` + `paging.cursors.after`, numbers as strings."""
+    name = "facebook_ads"
+    platform_id = 2
+    env_url = "ADWISE_FACEBOOK_ADS_URL"
+    path = "/facebook_ads/insights"
+    field_map = {"campaign_id": "campaign_id", "date_start": "date", "impressions": "impressions",
+                 "clicks": "clicks", "conversions": "conversions", "spend": "spend", "purchase_value": "revenue"}
+
+    def params(self, campaign_id, start, end, cursor):
+        p = {"campaign_id": campaign_id, "since": start, "until": end, "limit": self.page_size,
+             "time_increment": 1}
+        if cursor:
+            p["after"] = cursor
+        return p
+
+    def parse(self, payload):
+        paging = payload.get("paging", {})
+        after = paging.get("cursors", {}).get("after") if paging.get("next") else None
+        return payload.get("data", []), after
+
+
+CONNECTORS = {c.platform_id: c for c in (GoogleAdsConnector, FacebookAdsConnector, YouTubeConnector)}
+
+
+def date_windows(start, end, days):
+    """[start, end] split into inclusive windows of at most `days` days (ISO strings)."""
+    start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+    out = []
+    while start <= end:
+        stop = min(end, start + timedelta(days=days - 1))
+        out.append((start.isoformat(), stop.isoformat()))
+        start = stop + timedelta(days=1)
+    return out
+
+
+def normalize_metrics(frames):
+    """Concatenate per-connector frames and coerce to the metrics column types."""
+    if not frames:
+        return pd.DataFrame(columns=METRIC_COLUMNS)
+    df = pd.concat(frames, ignore_index=True)
+    df["campaign_id"] = pd.to_numeric(df["campaign_id"], errors="coerce")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["campaign_id", "date"])
+    df["campaign_id"] = df["campaign_id"].astype(np.int64)
+    for col in ("impressions", "clicks", "conversions"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).round().astype(np.int64)
+    for col in ("spend", "revenue"):
+        # DECIMAL(12,2) in the schema
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).round(2)
+    # a re-pulled window supersedes earlier rows for the same campaign-day
+    df = df.drop_duplicates(["campaign_id", "date"], keep="last")
+    return df.sort_values(["campaign_id", "date"]).reset_index(drop=True)
+
+
+async def ingest_async(campaigns, start, end, connectors=None, window_days=31, pool_size=64, timeout=30):
+    """
+    Pull [start, end] for every campaign in `campaigns` (DataFrame with
+    campaign_id, platform_id). Returns (metrics DataFrame, IngestStats).
+    """
+    if aiohttp is None:
+        raise RuntimeError("API ingestion needs aiohttp (pip install aiohttp)")
+    connectors = connectors or {pid: cls() for pid, cls in CONNECTORS.items()}
+    stats = IngestStats()
+    t0 = time.perf_counter()
+    windows = date_windows(start, end, window_days)
+    raw = {pid: [] for pid in connectors}
+    limits = {pid: asyncio.Semaphore(c.concurrency) for pid, c in connectors.items()}
+
+    async def one(conn, pid, campaign_id, lo, hi):
+        async with limits[pid]:
+            try:
+                raw[pid].extend(await conn.fetch(session, campaign_id, lo, hi, stats))
+            except IngestError:
+                stats.failed_tasks += 1
+                raise
+
+    connector = aiohttp.TCPConnector(limit=pool_size, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        tasks = []
+        for row in campaigns[["campaign_id", "platform_id"]].itertuples(index=False):
+            conn = connectors.get(int(row.platform_id))
+            if conn is None:
+                continue
+            for lo, hi in windows:
+                tasks.append(one(conn, int(row.platform_id), int(row.campaign_id), lo, hi))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    frames = []
+    for pid, rows in raw.items():
+        stats.per_platform[connectors[pid].name] = len(rows)
+        if rows:
+            frames.append(connectors[pid].normalize(pd.DataFrame.from_records(rows)))
+    metrics = normalize_metrics(frames)
+    stats.rows = len(metrics)
+    stats.seconds = time.perf_counter() - t0
+    # exhausted retries are counted in stats; anything else is a bug and surfaces
+    for r in results:
+        if isinstance(r, Exception) and not isinstance(r, IngestError):
+            raise r
+    return metrics, stats
+
+
+def ingest(campaigns, start, end, **kwargs):
+    """Blocking wrapper around ingest_async for scripts."""
+    return asyncio.run(ingest_async(campaigns, start, end, **kwargs))
+
+
+def _existing_keys(path, start, end):
+    """
+    (max metric_id, campaign-day keys dated in [start, end]) already in the CSV
+    at path. metrics.csv is answered from the columnar store when the store
+    mirrors the file (max_metric_id from its manifest, keys from the pruned
+    month partitions); otherwise one chunked pass keeps only the window's keys.
+    """
+    from app import columnar_store
+    if Path(path) == METRICS_CSV and columnar_store.store_is_fresh():
+        manifest = columnar_store.read_manifest() or {}
+        if manifest.get("source", "csv") == "csv":
+            keys = columnar_store.read_metrics(["campaign_id", "date"], start, end)
+            return int(manifest.get("max_metric_id", 0)), keys
+    max_id, parts = 0, []
+    for chunk in pd.read_csv(path, usecols=["metric_id", "campaign_id", "date"], chunksize=CSV_SCAN_ROWS):
+        ids = pd.to_numeric(chunk["metric_id"], errors="coerce")
+        max_id = max(max_id, int(ids.max())) if ids.notna().any() else max_id
+        dates = pd.to_datetime(chunk["date"], errors="coerce")
+        window = (dates >= start) & (dates <= end)
+        parts.append(pd.DataFrame({"campaign_id": pd.to_numeric(chunk["campaign_id"][window], errors="coerce"),
+                                   "date": dates[window]}))
+    keys = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["campaign_id", "date"])
+    return max_id, keys
+
+
+def append_to_metrics_csv(metrics, path=METRICS_CSV):
+    """
+    Append rows to metrics.csv with metric_ids continuing after the current
+    maximum; app.etl picks them up incrementally on the next refresh.
+    Campaign-days already in the file are skipped, so re-pulling a window
+    never double-counts. Returns the number of rows appended.
+    """
+    from app import query_cache
+    path = Path(path)
+    start_id = 1
+    if path.exists() and path.stat().st_size and len(metrics):
+        dates = pd.to_datetime(metrics["date"])
+        max_id, existing = _existing_keys(path, dates.min(), dates.max())
+        start_id = max_id + 1
+        seen = pd.MultiIndex.from_arrays([pd.to_numeric(existing["campaign_id"], errors="coerce"),
+                                          pd.to_datetime(existing["date"], errors="coerce")])
+        new = pd.MultiIndex.from_arrays([metrics["campaign_id"], dates])
+        metrics = metrics[~new.isin(seen)]
+    if metrics.empty:
+        return 0
+    out = metrics.assign(metric_id=np.arange(start_id, start_id + len(metrics)))
+    out["date"] = out["date"].dt.strftime("%Y-%m-%d")
+    header = not path.exists() or not path.stat().st_size
+    out[["metric_id"] + METRIC_COLUMNS].to_csv(path, mode="a", header=header, index=False,
+                                               float_format="%.2f")
+    query_cache.invalidate()
+    return len(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent ad-platform report ingestion.")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", default=date.today().isoformat())
+    parser.add_argument("--campaigns", default=str(CAMPAIGNS_CSV), help="CSV with campaign_id, platform_id")
+    parser.add_argument("--base-url", default=None, help="one base URL for every connector (e.g. the mock server)")
+    parser.add_argument("--window-days", type=int, default=31)
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight requests per platform")
+    parser.add_argument("--rate", type=float, default=20.0, help="requests/second per platform")
+    parser.add_argument("--append-csv", action="store_true", help="append the rows to database/metrics.csv")
+    parser.add_argument("--out", default=None, help="write the normalized rows to this CSV instead")
+    parser.add_argument("--allow-partial", action="store_true",
+                        help="append even when some report requests failed (exit status is still 1)")
+    args = parser.parse_args()
+
+    campaigns = pd.read_csv(args.campaigns)
+    connectors = {pid: cls(base_url=args.base_url, rate=args.rate, concurrency=args.concurrency)
+                  for pid, cls in CONNECTORS.items()}
+    metrics, stats = ingest(campaigns, args.start, args.end, connectors=connectors, window_days=args.window_days)
+    print(stats.as_dict())
+    partial = stats.failed_tasks > 0
+    if partial:
+        print(f"{stats.failed_tasks} report request(s) failed after retries; the pull is incomplete",
+              file=sys.stderr)
+    if args.out:
+        metrics.to_csv(args.out, index=False)
+        print(f"Wrote {len(metrics):,} rows to {args.out}")
+    elif args.append_csv:
+        if partial and not args.allow_partial:
+            print("Not appending a partial pull to metrics.csv (re-run, or pass --allow-partial)", file=sys.stderr)
+        else:
+            print(f"Appended {append_to_metrics_csv(metrics):,} rows to {METRICS_CSV}")
+    if partial:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
-import requests
 import pandas as pd
 
-def fetch_google_ads_stub(credentials, start_date, end_date):
+from app.api_ingest import GoogleAdsConnector, ingest
+
+def fetch_google_ads_stub(credentials, start_date, end_date, campaign_ids=None):
     """
-    Placeholder: implement OAuth2, use google-ads python client or reporting API,
-    normalize JSON to DataFrame, and return a metrics DataFrame.
+    Google Ads metrics for [start_date, end_date] as a metrics DataFrame.
+    Kept for older callers; see app/api_ingest.py for the concurrent,
+    multi-platform version. `credentials` is the bearer token (or a dict with
+    'token' and optional 'base_url').
     """
-    # pseudo
-    # resp = requests.get("https://api.google.com/ads/metrics", params=..., headers=...)
-    # df = pd.json_normalize(resp.json()['rows'])
-    # return df
-    raise NotImplementedError("This is a stub. Replace with actual API client code.")
+    creds = credentials if isinstance(credentials, dict) else {"token": credentials}
+    connector = GoogleAdsConnector(base_url=creds.get("base_url"), token=creds.get("token"))
+    if campaign_ids is None:
+        campaigns = pd.read_csv("database/campaigns.csv", usecols=["campaign_id", "platform_id"])
+        campaigns = campaigns[campaigns["platform_id"] == connector.platform_id]
+    else:
+        campaigns = pd.DataFrame({"campaign_id": list(campaign_ids), "platform_id": connector.platform_id})
+    metrics, _ = ingest(campaigns, start_date, end_date, connectors={connector.platform_id: connector})
+    return metrics
@@ -0,0 +1,263 @@
+import sys
+import time
+import argparse
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import (MetaData, Table, Column, Integer, String, Date, Numeric, Float, ForeignKey,
+                        text, delete, inspect)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.db_connection import get_db_connection, get_engine
+from app import query_cache
+
+# Bulk writes of metrics / campaigns / predictions into the MySQL schema
+# (database/adwise360_schema.sql). Rows go in as batched multi-row upserts:
+# - MySQL: INSERT ... ON DUPLICATE KEY UPDATE (PyMySQL folds each executemany
+#   batch into one multi-row statement), or LOAD DATA LOCAL INFILE into a
+#   temporary staging table followed by one INSERT ... SELECT upsert
+# - SQLite (stand-in for checks): INSERT ... ON CONFLICT DO UPDATE
+# `chunk_rows` rows per statement, `txn_rows` rows per transaction, so a
+# failed load rolls back at most one transaction and reruns are idempotent.
+
+CHUNK_ROWS = 5_000
+TXN_ROWS = 100_000
+CSV_READ_ROWS = 500_000
+
+# mirrors database/adwise360_schema.sql plus database/migrations (also used to
+# create the tables on SQLite)
+metadata = MetaData()
+platforms = Table(
+    "platforms", metadata,
+    Column("platform_id", Integer, primary_key=True),
+    Column("name", String(50), nullable=False),
+)
+campaigns = Table(
+    "campaigns", metadata,
+    Column("campaign_id", Integer, primary_key=True),
+    Column("platform_id", Integer, ForeignKey("platforms.platform_id"), nullable=False),
+    Column("campaign_name", String(100), nullable=False),
+    Column("objective", String(50)),
+    Column("start_date", Date),
+    Column("end_date", Date),
+    Column("region", String(50)),
+    Column("budget", Numeric(12, 2)),
+)
+metrics = Table(
+    "metrics", metadata,
+    Column("metric_id", Integer, primary_key=True),
+    Column("campaign_id", Integer, ForeignKey("campaigns.campaign_id"), nullable=False),
+    Column("date", Date, nullable=False),
+    Column("impressions", Integer, default=0),
+    Column("clicks", Integer, default=0),
+    Column("conversions", Integer, default=0),
+    Column("spend", Numeric(12, 2), default=0),
+    Column("revenue", Numeric(12, 2), default=0),
+)
+predictions = Table(
+    "predictions", metadata,
+    Column("prediction_id", Integer, primary_key=True),
+    Column("campaign_id", Integer, ForeignKey("campaigns.campaign_id"), nullable=False),
+    Column("model_version", String(20)),
+    Column("performace_category", String(20)),   # column name as spelled in the schema
+    Column("probability_score", Numeric(5, 2)),
+    Column("predicted_roi", Float),                # migration 003
+    Column("prediction_date", Date),
+)
+TABLES = {t.name: t for t in (platforms, campaigns, metrics, predictions)}
+
+# unique keys added by database/migrations/001_metrics_indexes.*.sql
+NATURAL_KEYS = {"metrics": ["campaign_id", "date"]}
+
+# platform names as in database/adwise360_static_inserts.sql
+PLATFORM_NAMES = {1: "Google Ads", 2: "Facebook Ads", 3: "YouTube Ads"}
+
+# column-adding migrations the definitions above already include: a table
+# created by create_schema() has them, so they are recorded as applied
+BUILT_IN_MIGRATIONS = {"003": "predictions"}
+
+
+def create_schema(engine):
+    """Create any missing tables (for SQLite stand-ins; MySQL uses the schema SQL)."""
+    from app.migrate import mark_applied
+    existing = set(inspect(engine).get_table_names())
+    metadata.create_all(engine)
+    mark_applied(engine, [v for v, name in BUILT_IN_MIGRATIONS.items() if name not in existing])
+
+
+def _records(df, table):
+    """Rows of df as driver-ready dicts: Python scalars and dates, None for NaN/NaT."""
+    cols = [c.name for c in table.columns if c.name in df.columns]
+    out = {}
+    for col in cols:
+        values = df[col]
+        if isinstance(table.c[col].type, Date):
+            values = pd.to_datetime(values, errors="coerce").dt.date
+        elif isinstance(table.c[col].type, Numeric) and not isinstance(table.c[col].type, Float):
+            values = pd.to_numeric(values, errors="coerce").round(2)
+        arr = values.to_numpy(dtype=object)
+        arr[pd.isna(values).to_numpy()] = None
+        out[col] = arr
+    # column-wise conversion, then one zip; no per-cell pandas access
+    return [dict(zip(cols, row)) for row in zip(*(out[c] for c in cols))]
+
+
+def _upsert_statement(engine, table, columns):
+    """INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE for the dialect."""
+    keys = [c.name for c in table.primary_key.columns]
+    if not set(keys) <= set(columns):
+        # rows without their surrogate id (e.g. from app/api_ingest.py) match on the natural key
+        keys = NATURAL_KEYS.get(table.name, keys)
+    update = [c for c in columns if c not in keys]
+    if engine.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update}) if update else stmt.prefix_with("IGNORE")
+    if engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table)
+        if not update:
+            return stmt.on_conflict_do_nothing(index_elements=keys)
+        return stmt.on_conflict_do_update(index_elements=keys, set_={c: stmt.excluded[c] for c in update})
+    raise ValueError(f"No bulk upsert for dialect {engine.dialect.name!r}")
+
+
+def upsert_frame(engine, table, df, chunk_rows=CHUNK_ROWS, txn_rows=TXN_ROWS, replace_where=None):
+    """
+    Upsert df into table in chunk_rows statements, committing every txn_rows.
+    replace_where (SQL expression) deletes matching rows first, in the first transaction.
+    Returns the number of rows written.
+    """
+    table = TABLES[table] if isinstance(table, str) else table
+    if df.empty and replace_where is None:
+        return 0
+    rows = _records(df, table)
+    stmt = _upsert_statement(engine, table, list(rows[0]) if rows else [])
+    for start in range(0, max(len(rows), 1), txn_rows):
+        with engine.begin() as conn:
+            if start == 0 and replace_where is not None:
+                conn.execute(delete(table).where(replace_where))
+            for lo in range(start, min(start + txn_rows, len(rows)), chunk_rows):
+                conn.execute(stmt, rows[lo:lo + chunk_rows])
+    query_cache.invalidate()
+    return len(rows)
+
+
+def load_data_infile(engine, table, df, txn_rows=TXN_ROWS):
+    """
+    MySQL only: LOAD DATA LOCAL INFILE each txn_rows slice into a temporary
+    staging table, then upsert it with one INSERT ... SELECT ... ON DUPLICATE KEY UPDATE.
+    Needs an engine from get_db_connection(local_infile=True) and local_infile=ON on the server.
+    """
+    table = TABLES[table] if isinstance(table, str) else table
+    if engine.dialect.name != "mysql":
+        raise ValueError("LOAD DATA LOCAL INFILE needs MySQL; use upsert_frame()")
+    cols = [c.name for c in table.columns if c.name in df.columns]
+    keys = {c.name for c in table.primary_key.columns}
+    col_list = ", ".join(f"`{c}`" for c in cols)
+    updates = ", ".join(f"`{c}` = VALUES(`{c}`)" for c in cols if c not in keys) or f"`{cols[0]}` = `{cols[0]}`"
+    stage = f"_stage_{table.name}"
+    with tempfile.TemporaryDirectory(prefix="adwise_load_") as tmp:
+        path = Path(tmp) / f"{table.name}.tsv"
+        for start in range(0, len(df), txn_rows):
+            part = pd.DataFrame(_records(df.iloc[start:start + txn_rows], table), columns=cols)
+            # \N is MySQL's NULL marker in LOAD DATA files
+            part.to_csv(path, sep="\t", index=False, header=False, na_rep="\\N", lineterminator="\n")
+            with engine.begin() as conn:
+                conn.execute(text(f"CREATE TEMPORARY TABLE IF NOT EXISTS {stage} LIKE `{table.name}`"))
+                conn.execute(text(f"TRUNCATE TABLE {stage}"))
+                conn.execute(text(
+                    f"LOAD DATA LOCAL INFILE :path INTO TABLE {stage} "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({col_list})"
+                ), {"path": str(path)})
+                conn.execute(text(
+                    f"INSERT INTO `{table.name}` ({col_list}) SELECT {col_list} FROM {stage} "
+                    f"ON DUPLICATE KEY UPDATE {updates}"
+                ))
+    query_cache.invalidate()
+    return len(df)
+
+
+def predictions_rows(pred, prediction_date=None):
+    """
+    predictions_output.csv -> rows of the predictions table, predicted ROI in
+    predicted_roi (needs migration 003). probability_score and
+    performace_category are left NULL: the model produces neither.
+    """
+    return pd.DataFrame({
+        "campaign_id": pred["campaign_id"].to_numpy(),
+        "model_version": pred["model_version"].astype(str).str[:20].to_numpy() if "model_version" in pred else None,
+        "predicted_roi": pd.to_numeric(pred["predicted_roi"], errors="coerce").to_numpy(),
+        "prediction_date": prediction_date or date.today().isoformat(),
+    })
+
+
+def load_predictions(engine, pred, prediction_date=None, chunk_rows=CHUNK_ROWS):
+    """Replace the predictions of this (model_version, prediction_date) and insert the new ones."""
+    rows = predictions_rows(pred, prediction_date)
+    version = rows["model_version"].iloc[0] if len(rows) else None
+    where = (predictions.c.model_version == version) & (predictions.c.prediction_date == rows["prediction_date"].iloc[0]) \
+        if len(rows) else None
+    return upsert_frame(engine, predictions, rows, chunk_rows=chunk_rows, replace_where=where)
+
+
+def load_tables(engine, tables, chunk_rows=CHUNK_ROWS, txn_rows=TXN_ROWS, method="upsert",
+                read_rows=CSV_READ_ROWS, database_dir=PROJECT_ROOT / "database"):
+    """
+    Load the CSVs for `tables` (platforms, campaigns, metrics, predictions; parents
+    first). Returns {table: {"rows", "seconds", "rows_per_sec"}}.
+    """
+    database_dir = Path(database_dir)
+    order = [t for t in ("platforms", "campaigns", "metrics", "predictions") if t in tables]
+    report = {}
+    for name in order:
+        t0 = time.perf_counter()
+        if name == "platforms":
+            frame = pd.DataFrame({"platform_id": list(PLATFORM_NAMES), "name": list(PLATFORM_NAMES.values())})
+            rows = upsert_frame(engine, platforms, frame, chunk_rows, txn_rows)
+        elif name == "predictions":
+            rows = load_predictions(engine, pd.read_csv(database_dir / "predictions_output.csv"), chunk_rows=chunk_rows)
+        else:
+            rows = 0
+            # metrics.csv can be millions of rows: read and load it a block at a time
+            for block in pd.read_csv(database_dir / f"{name}.csv", chunksize=read_rows):
+                if method == "load_data":
+                    rows += load_data_infile(engine, name, block, txn_rows)
+                else:
+                    rows += upsert_frame(engine, name, block, chunk_rows, txn_rows)
+        seconds = time.perf_counter() - t0
+        report[name] = {"rows": rows, "seconds": round(seconds, 3),
+                        "rows_per_sec": round(rows / seconds, 1) if seconds else 0.0}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk upsert the CSVs into the MySQL (or SQLite) schema.")
+    parser.add_argument("--tables", nargs="+", default=["platforms", "campaigns", "metrics", "predictions"],
+                        choices=list(TABLES))
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per INSERT statement")
+    parser.add_argument("--txn-rows", type=int, default=TXN_ROWS, help="rows per transaction")
+    parser.add_argument("--method", choices=["upsert", "load_data"], default="upsert",
+                        help="load_data = LOAD DATA LOCAL INFILE via a staging table (MySQL only)")
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL instead of get_db_connection(), e.g. sqlite:///adwise.db")
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables first (SQLite stand-in)")
+    args = parser.parse_args()
+
+    if args.url:
+        engine = get_engine(args.url)
+    else:
+        engine = get_db_connection(local_infile=args.method == "load_data")
+    if args.create_schema:
+        create_schema(engine)
+    report = load_tables(engine, args.tables, args.chunk_rows, args.txn_rows, args.method)
+    for name, r in report.items():
+        print(f"{name:12s} {r['rows']:>12,} rows  {r['seconds']:>8.2f}s  {r['rows_per_sec']:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
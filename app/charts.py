@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from app.kpi import safe_ratio, roi_percent
+from app.rollup import CUBE_MEASURES
+
+# Chart-ready data, bounded in size whatever the row count:
+# - time series are aggregated to day / week / month buckets picked from the
+#   date range (ratios recomputed from bucket sums), then LTTB-downsampled if
+#   still longer than the point budget;
+# - the CTR-vs-ROAS scatter is either a stratified sample (every campaign keeps
+#   at least one point) or a 2-D binned density grid.
+
+MAX_LINE_POINTS = 1000
+MAX_SCATTER_POINTS = 4000   # under Altair's 5000-row default
+SCATTER_BINS = 60
+
+
+def pick_bucket(dates, max_points=MAX_LINE_POINTS):
+    """'D', 'W' or 'M' so the span fits the point budget at the finest grain."""
+    if len(dates) == 0:
+        return "D"
+    span_days = (pd.Timestamp(dates.max()) - pd.Timestamp(dates.min())).days + 1
+    if span_days <= max_points:
+        return "D"
+    if span_days / 7 <= max_points:
+        return "W"
+    return "M"
+
+
+def _bucket_start(dates, freq):
+    dates = pd.to_datetime(dates)
+    if freq == "D":
+        return dates.dt.normalize()
+    return dates.dt.to_period(freq).dt.start_time
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points of (x, y) that keep
+    the visual shape of the line. x must be sorted and numeric.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # bucket edges over the interior points; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_series(series, max_points=MAX_LINE_POINTS):
+    """LTTB over a date-indexed Series / single-column frame."""
+    if len(series) <= max_points:
+        return series
+    values = series.iloc[:, 0] if isinstance(series, pd.DataFrame) else series
+    x = pd.DatetimeIndex(series.index).asi8
+    return series.iloc[lttb(x, values.to_numpy(dtype=np.float64), max_points)]
+
+
+def time_series(cells, max_points=MAX_LINE_POINTS):
+    """
+    (frame indexed by bucket start with impressions, clicks, ROI; bucket code)
+    from rollup cube cells. ROI = (SUM(revenue) - SUM(spend)) / SUM(spend) * 100 per bucket.
+    """
+    if cells.empty:
+        return pd.DataFrame(columns=["impressions", "clicks", "ROI"]), "D"
+    freq = pick_bucket(cells["date"], max_points)
+    sums = cells[CUBE_MEASURES].groupby(_bucket_start(cells["date"], freq).to_numpy()).sum().sort_index()
+    sums.index = pd.DatetimeIndex(sums.index, name="date")
+    sums["ROI"] = roi_percent(sums["revenue"], sums["spend"])
+    return sums[["impressions", "clicks", "ROI"]], freq
+
+
+def _row_ctr_roas(frame):
+    ctr = safe_ratio(frame["clicks"], frame["impressions"], 100.0)
+    roas = safe_ratio(frame["revenue"], frame["spend"])
+    return ctr, roas
+
+
+def _cap_quotas(quota, budget):
+    """
+    Quotas lowered, largest first, until they sum to budget; every quota stays
+    >= 1 (needs len(quota) <= budget).
+    """
+    if quota.sum() <= budget:
+        return quota
+    # largest cap c with sum(min(quota, c)) <= budget (c = 1 always fits)
+    lo, hi = 1, int(quota.max())
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if np.minimum(quota, mid).sum() <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    capped = np.minimum(quota, lo)
+    # hand what is left of the budget, one row each, to groups the cap cut
+    spare = budget - int(capped.sum())
+    cut = np.flatnonzero(quota > lo)
+    capped[cut[:spare]] += 1
+    return capped
+
+
+def scatter_sample(frame, max_points=MAX_SCATTER_POINTS, seed=0, names=None):
+    """
+    campaign_name / CTR / ROAS for at most ~max_points rows, sampled within each
+    campaign in proportion to its row count (each campaign keeps >= 1 row while
+    there are fewer campaigns than max_points). When frame has no campaign_name
+    column, `names` (Series indexed by campaign_id) labels the sampled rows.
+    """
+    n = len(frame)
+    if n > max_points:
+        rng = np.random.default_rng(seed)
+        groups = frame["campaign_id"].to_numpy()
+        # random order within each campaign, then keep each group's first `quota` rows
+        order = np.lexsort((rng.random(n), groups))
+        sorted_groups = groups[order]
+        starts = np.r_[0, np.flatnonzero(sorted_groups[1:] != sorted_groups[:-1]) + 1]
+        sizes = np.diff(np.r_[starts, n])
+        quota = np.maximum(1, np.floor(sizes * (max_points / n))).astype(np.int64)
+        if len(sizes) <= max_points:
+            # the minimum of one row per campaign can overshoot: trim the big campaigns
+            quota = _cap_quotas(quota, max_points)
+        pos = np.arange(n) - np.repeat(starts, sizes)
+        keep = order[pos < np.repeat(quota, sizes)]
+        if len(keep) > max_points:
+            # more campaigns than the budget: one row per campaign, thinned uniformly
+            keep = rng.choice(keep, max_points, replace=False)
+        frame = frame.iloc[np.sort(keep)]
+    ctr, roas = _row_ctr_roas(frame)
+    if "campaign_name" in frame.columns:
+        labels = frame["campaign_name"].to_numpy()
+    elif names is not None:
+        labels = names.reindex(frame["campaign_id"].to_numpy()).to_numpy()
+    else:
+        labels = frame["campaign_id"].to_numpy()
+    return pd.DataFrame({"campaign_name": labels, "CTR": ctr, "ROAS": roas})
+
+
+def scatter_bins(frame, bins=SCATTER_BINS):
+    """2-D histogram of row CTR x ROAS: one row per non-empty cell with its bounds and count."""
+    if frame.empty:
+        return pd.DataFrame(columns=["CTR", "CTR_end", "ROAS", "ROAS_end", "rows"])
+    ctr, roas = _row_ctr_roas(frame)
+    counts, xe, ye = np.histogram2d(ctr, roas, bins=bins)
+    ix, iy = np.nonzero(counts)
+    return pd.DataFrame({
+        "CTR": xe[ix], "CTR_end": xe[ix + 1],
+        "ROAS": ye[iy], "ROAS_end": ye[iy + 1],
+        "rows": counts[ix, iy].astype(np.int64),
+    })
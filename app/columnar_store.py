@@ -0,0 +1,326 @@
+from pathlib import Path
+import os
+import shutil
+from uuid import uuid4
+import json
+import pandas as pd
+
+# pyarrow is optional: without it callers keep using the CSV files directly
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - depends on environment
+    pa = pq = ds = None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DATABASE_DIR = PROJECT_ROOT / "database"
+
+METRICS_CSV = DATABASE_DIR / "metrics.csv"
+CAMPAIGNS_CSV = DATABASE_DIR / "campaigns.csv"
+
+STORE_DIR = DATABASE_DIR / "store"
+METRICS_STORE = STORE_DIR / "metrics"              # month=YYYY-MM/part-*.parquet
+CAMPAIGNS_STORE = STORE_DIR / "campaigns.parquet"
+MANIFEST_PATH = STORE_DIR / "manifest.json"
+
+METRICS_COLUMNS = ["metric_id", "campaign_id", "date", "impressions", "clicks", "conversions", "spend", "revenue"]
+CAMPAIGNS_COLUMNS = ["campaign_id", "campaign_name", "platform_id", "objective", "start_date", "end_date", "region", "budget"]
+
+
+def store_available():
+    """True when pyarrow is installed and the store can be used."""
+    return pa is not None
+
+
+def _metrics_schema():
+    return pa.schema([
+        ("metric_id", pa.int64()),
+        ("campaign_id", pa.int32()),
+        ("date", pa.date32()),
+        ("impressions", pa.int64()),
+        ("clicks", pa.int64()),
+        ("conversions", pa.int64()),
+        ("spend", pa.float64()),
+        ("revenue", pa.float64()),
+    ])
+
+
+def _campaigns_schema():
+    return pa.schema([
+        ("campaign_id", pa.int32()),
+        ("campaign_name", pa.string()),
+        ("platform_id", pa.int32()),
+        ("objective", pa.string()),
+        ("start_date", pa.string()),
+        ("end_date", pa.string()),
+        ("region", pa.string()),
+        ("budget", pa.float64()),
+    ])
+
+
+def file_signature(path):
+    """Size + mtime of a source file, used to detect a stale store."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# one aggregate pass per table: inserts and deletes move the counts / max ids,
+# and an edit to an existing row moves one of the column sums
+_DB_SIGNATURE_SQL = {
+    "metrics": "SELECT COUNT(*), COALESCE(MAX(metric_id), 0), COALESCE(SUM(campaign_id), 0), "
+               "COALESCE(SUM(impressions), 0), COALESCE(SUM(clicks), 0), COALESCE(SUM(conversions), 0), "
+               "COALESCE(SUM(spend), 0), COALESCE(SUM(revenue), 0) FROM metrics",
+    "campaigns": "SELECT COUNT(*), COALESCE(MAX(campaign_id), 0), COALESCE(SUM(platform_id), 0), "
+                 "COALESCE(SUM(budget), 0) FROM campaigns",
+}
+_METRICS_SIGNATURE_SUMS = ["campaign_id", "impressions", "clicks", "conversions", "spend", "revenue"]
+
+
+def db_signature(engine=None):
+    """
+    Counts, max ids and column sums of the MySQL metrics / campaigns tables,
+    used to detect a stale store (the database counterpart of file_signature).
+    """
+    from sqlalchemy import text
+    if engine is None:
+        from app.db_connection import get_db_connection
+        engine = get_db_connection()
+    sig = {}
+    with engine.connect() as conn:
+        for table, sql in _DB_SIGNATURE_SQL.items():
+            sig[table] = [round(float(v), 2) for v in conn.execute(text(sql)).one()]
+    return sig
+
+
+def advance_db_signature(sig, new_metrics):
+    """Expected metrics signature after new_metrics (rows with new metric_ids) were inserted."""
+    if not len(new_metrics):
+        return sig
+    m = _typed_metrics(new_metrics)
+    rows, max_id, *sums = sig["metrics"]
+    sums = [round(a + float(m[c].sum()), 2) for a, c in zip(sums, _METRICS_SIGNATURE_SUMS)]
+    return dict(sig, metrics=[rows + len(m), max(max_id, float(m["metric_id"].max())), *sums])
+
+
+def db_signatures_match(a, b, tables=("metrics", "campaigns")):
+    """Signatures equal (for tables) up to rounding of the money sums."""
+    if not a or not b:
+        return False
+    return all(t in a and t in b and len(a[t]) == len(b[t])
+               and all(abs(x - y) < 0.005 for x, y in zip(a[t], b[t])) for t in tables)
+
+
+def _typed_metrics(metrics):
+    """Coerce a raw metrics frame to the store's column types."""
+    out = pd.DataFrame(index=metrics.index)
+    for col in ["metric_id", "campaign_id", "impressions", "clicks", "conversions"]:
+        out[col] = pd.to_numeric(metrics.get(col), errors="coerce").fillna(0).astype("int64")
+    for col in ["spend", "revenue"]:
+        out[col] = pd.to_numeric(metrics.get(col), errors="coerce").fillna(0).astype("float64")
+    out["date"] = pd.to_datetime(metrics.get("date"), errors="coerce")
+    return out[METRICS_COLUMNS]
+
+
+def _typed_campaigns(campaigns):
+    """Coerce a raw campaigns frame to the store's column types."""
+    out = campaigns.reindex(columns=CAMPAIGNS_COLUMNS).copy()
+    out["campaign_id"] = pd.to_numeric(out["campaign_id"], errors="coerce").fillna(0).astype("int64")
+    out["platform_id"] = pd.to_numeric(out["platform_id"], errors="coerce").fillna(0).astype("int64")
+    out["budget"] = pd.to_numeric(out["budget"], errors="coerce")
+    for col in ["campaign_name", "objective", "start_date", "end_date", "region"]:
+        out[col] = out[col].astype("string")
+    return out
+
+
+def _write_metrics(m, existing_data_behavior, basename_template=None, target=None):
+    """Write typed metrics into the month-partitioned dataset (at target, default METRICS_STORE)."""
+    table = pa.Table.from_pandas(m, schema=_metrics_schema(), preserve_index=False)
+    month = pa.array(m["date"].dt.strftime("%Y-%m").fillna("unknown"), type=pa.string())
+    table = table.append_column("month", month)
+    ds.write_dataset(
+        table,
+        target or METRICS_STORE,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+        basename_template=basename_template,
+        existing_data_behavior=existing_data_behavior,
+    )
+
+
+def _write_campaigns(c):
+    tmp = CAMPAIGNS_STORE.with_name(f".{CAMPAIGNS_STORE.name}.{uuid4().hex}.tmp")
+    pq.write_table(pa.Table.from_pandas(c, schema=_campaigns_schema(), preserve_index=False), tmp)
+    os.replace(tmp, CAMPAIGNS_STORE)
+
+
+def _write_manifest(manifest):
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(MANIFEST_PATH)
+
+
+def read_manifest():
+    """Return the store manifest dict, or None when no store has been built."""
+    if not MANIFEST_PATH.exists():
+        return None
+    try:
+        return json.loads(MANIFEST_PATH.read_text())
+    except Exception:
+        return None
+
+
+def build_store(metrics=None, campaigns=None, source="csv", db_sig=None):
+    """
+    Write metrics (partitioned by month) and campaigns as typed Parquet.
+    Frames can be passed in directly; otherwise they are read from the CSVs or MySQL.
+    db_sig is the db_signature() taken before passed-in MySQL frames were read.
+    Returns the manifest written next to the data.
+    """
+    if not store_available():
+        raise RuntimeError("pyarrow is not installed; the columnar store is unavailable.")
+
+    if metrics is None or campaigns is None:
+        if source == "mysql":
+            from app.db_connection import get_db_connection
+            engine = get_db_connection()
+            # signature before the read: rows written meanwhile make the store stale, not wrong
+            db_sig = db_signature(engine)
+            metrics = pd.read_sql("SELECT * FROM metrics", engine)
+            campaigns = pd.read_sql("SELECT * FROM campaigns", engine)
+        else:
+            metrics = pd.read_csv(METRICS_CSV)
+            campaigns = pd.read_csv(CAMPAIGNS_CSV)
+
+    m = _typed_metrics(metrics)
+    c = _typed_campaigns(campaigns)
+
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    # leftovers of builds that crashed mid-write
+    for stale in STORE_DIR.glob(f".{METRICS_STORE.name}-*"):
+        shutil.rmtree(stale, ignore_errors=True)
+    # full rebuild into a fresh sibling (months absent from the new data must not
+    # survive); readers keep the old store until it is swapped in below
+    building = STORE_DIR / f".{METRICS_STORE.name}-{uuid4().hex}"
+    try:
+        _write_metrics(m, existing_data_behavior="error", target=building)
+    except BaseException:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+    # no manifest while the directories are swapped: readers fall back to the source
+    MANIFEST_PATH.unlink(missing_ok=True)
+    retired = STORE_DIR / f".{METRICS_STORE.name}-{uuid4().hex}"
+    if METRICS_STORE.exists():
+        os.replace(METRICS_STORE, retired)
+    os.replace(building, METRICS_STORE)
+    shutil.rmtree(retired, ignore_errors=True)
+    _write_campaigns(c)
+
+    manifest = {
+        "source": source,
+        "built_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "metrics_rows": int(len(m)),
+        "campaigns_rows": int(len(c)),
+        "max_metric_id": int(m["metric_id"].max()) if len(m) else 0,
+        "metrics_csv": file_signature(METRICS_CSV) if source == "csv" else None,
+        "campaigns_csv": file_signature(CAMPAIGNS_CSV) if source == "csv" else None,
+        "db_signature": db_sig if source == "mysql" else None,
+    }
+    _write_manifest(manifest)
+    return manifest
+
+
+def append_metrics(metrics, campaigns=None, metrics_signature=None, campaigns_signature=None, db_sig=None):
+    """
+    Append new metric rows as extra part files (existing parts are never rewritten)
+    and advance the manifest watermark. campaigns, when given, replaces the small
+    campaigns table. The *_signature arguments (db_sig for MySQL) record which
+    source state the store now mirrors. Returns the updated manifest, or None
+    when there is no store.
+    """
+    manifest = read_manifest()
+    if not store_available() or manifest is None:
+        return None
+
+    m = _typed_metrics(metrics)
+    if len(m):
+        _write_metrics(m, existing_data_behavior="overwrite_or_ignore",
+                       basename_template=f"part-{uuid4().hex}-{{i}}.parquet")
+        manifest["metrics_rows"] = int(manifest.get("metrics_rows", 0)) + int(len(m))
+        manifest["max_metric_id"] = max(int(manifest.get("max_metric_id", 0)), int(m["metric_id"].max()))
+    if campaigns is not None:
+        c = _typed_campaigns(campaigns)
+        _write_campaigns(c)
+        manifest["campaigns_rows"] = int(len(c))
+    if metrics_signature is not None:
+        manifest["metrics_csv"] = metrics_signature
+    if campaigns_signature is not None:
+        manifest["campaigns_csv"] = campaigns_signature
+    if db_sig is not None:
+        manifest["db_signature"] = db_sig
+    manifest["appended_at"] = pd.Timestamp.now(tz="UTC").isoformat()
+    _write_manifest(manifest)
+    return manifest
+
+
+def store_is_fresh(db_sig=None):
+    """
+    True when the store exists and mirrors the current source: the CSV files,
+    or for a store built from MySQL the tables' db_signature() (pass db_sig
+    when the caller already took it).
+    """
+    if not store_available():
+        return False
+    manifest = read_manifest()
+    if not manifest or not METRICS_STORE.exists() or not CAMPAIGNS_STORE.exists():
+        return False
+    if manifest.get("source") == "mysql":
+        try:
+            current = db_sig if db_sig is not None else db_signature()
+        except Exception:
+            return False
+        return db_signatures_match(manifest.get("db_signature"), current)
+    return (manifest.get("metrics_csv") == file_signature(METRICS_CSV)
+            and manifest.get("campaigns_csv") == file_signature(CAMPAIGNS_CSV))
+
+
+def read_metrics(columns=None, start_date=None, end_date=None):
+    """
+    Read metrics from the store with column projection and memory mapping.
+    Optional start_date / end_date prune month partitions and rows.
+    """
+    columns = [c for c in (columns or METRICS_COLUMNS) if c in METRICS_COLUMNS]
+    filters = []
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        filters += [("month", ">=", start.strftime("%Y-%m")), ("date", ">=", start.date())]
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        filters += [("month", "<=", end.strftime("%Y-%m")), ("date", "<=", end.date())]
+    table = pq.read_table(
+        METRICS_STORE,
+        columns=columns,
+        filters=filters or None,
+        memory_map=True,
+        partitioning="hive",
+    )
+    df = table.to_pandas(date_as_object=False)
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+    if "metric_id" in df.columns:
+        df = df.sort_values("metric_id", kind="stable").reset_index(drop=True)
+    return df
+
+
+def read_campaigns(columns=None):
+    """Read the campaigns table from the store (memory mapped)."""
+    columns = [c for c in (columns or CAMPAIGNS_COLUMNS) if c in CAMPAIGNS_COLUMNS]
+    df = pq.read_table(CAMPAIGNS_STORE, columns=columns, memory_map=True).to_pandas()
+    for col in ["campaign_name", "objective", "start_date", "end_date", "region"]:
+        if col in df.columns:
+            df[col] = df[col].astype(object)
+    return df
@@ -14,14 +14,40 @@ if str(project_root) not in sys.path:
 
 from datetime import datetime, timedelta, timezone
 
-from app.etl import get_cached_data, refresh_data
+from app.etl import get_cached_data, get_campaign_attributes, get_data_version, refresh_data, DATA_SOURCE
+from app.schema import attach_campaign_attributes, memory_mb
+from app import queries
+from app.rollup import build_rollup, slice_rollup, kpis_from_rollup, filter_frame
+from app.charts import time_series, downsample_series, scatter_sample, scatter_bins
+from app.kpi import with_row_kpis
+from app.table import paginated_table, fmt_percent, fmt_money, fmt_int
+from app.export import export_widget, available_formats
+from app.memo import get_memo, memoized
+from app.query_cache import get_query_cache
+from app.db_connection import pool_status
 from app.data_loader import create_campaign_features, extract_platforms
 
 st.set_page_config(page_title='AdWise360 Dashboard', layout='wide')
 st.title('AdWise360 – Marketing Campaign Insights')
 
-# load cached data
-df = get_cached_data()
+# load cached data in the compact layout (base counters only; per-row CTR/CPC/ROAS
+# and the campaign attributes from the side table are added per view)
+df = get_cached_data(row_kpis=False, attributes=False)
+campaign_attrs = get_campaign_attributes()
+
+def with_attributes(rows):
+    return attach_campaign_attributes(rows, campaign_attrs)
+
+# derived results are memoized per (data version, filters); a new data
+# version drops everything computed for the previous one
+data_version = get_data_version()
+memo = get_memo()
+if getattr(memo, 'data_version', None) != data_version:
+    memo.invalidate(data_version)
+    memo.data_version = data_version
+
+# rollup cube, built once per data load
+cube = memoized('rollup', data_version, None, build_rollup, df)
 
 # platform mapping
 platforms_df = extract_platforms()
@@ -33,8 +59,12 @@ platform_map = dict(zip(platforms_df['platform_id'], platforms_df[name_col])) if
 
 # filter options
 friendly_platforms = ['All'] + [platform_map[i] for i in sorted(platform_map.keys())]
-friendly_regions = ['All'] + sorted(df['region'].dropna().unique().tolist()) if not df.empty else ['All']
-friendly_objectives = ['All'] + sorted(df['objective'].dropna().unique().tolist()) if not df.empty else ['All']
+def distinct_values(frame, col):
+    return sorted(frame[col].dropna().unique().tolist()) if not frame.empty else []
+
+# distinct values from the (much smaller) cube, once per data version
+friendly_regions = ['All'] + memoized('regions', data_version, None, distinct_values, cube, 'region')
+friendly_objectives = ['All'] + memoized('objectives', data_version, None, distinct_values, cube, 'objective')
 
 st.sidebar.header('Filters')
 selected_platform_name = st.sidebar.selectbox('Platform', friendly_platforms)
@@ -44,7 +74,7 @@ selected_objective = st.sidebar.selectbox('Objective', friendly_objectives)
 if st.sidebar.button('Refresh Data'):
     try:
         refresh_data()
-        st.sidebar.success('Refreshed cache.')
+        st.sidebar.success(f"Refreshed cache (+{st.session_state.get('last_refresh_rows', 0)} new rows).")
     except Exception as e:
         st.sidebar.error('Refresh failed: ' + str(e))
 
@@ -60,131 +90,149 @@ if last_refresh_iso:
 else:
     st.sidebar.info('No refresh recorded for this session. Use Refresh to load fresh data.')
 
-# export ML features
-if st.sidebar.button('Export ML Features'):
-    features = create_campaign_features(df)
-    csv_bytes = features.to_csv(index=False).encode('utf-8')
-    st.sidebar.download_button('Download ML features', csv_bytes, file_name='ml_campaign_features.csv', mime='text/csv')
+# exports are built on request (chunked, cached per data version / filters / format)
+st.sidebar.header('Export')
+export_format = st.sidebar.selectbox('Export format', available_formats())
+export_widget('ML features', 'ml_features', data_version, None, 'ml_campaign_features',
+              lambda: create_campaign_features(with_attributes(df)), fmt=export_format, container=st.sidebar)
 
 # apply filters
 selected_platform_id = None
 if selected_platform_name != 'All':
     selected_platform_id = next((k for k,v in platform_map.items() if v==selected_platform_name), None)
 
-filtered = df.copy() if not df.empty else pd.DataFrame()
-if selected_platform_id is not None and not filtered.empty:
-    filtered = filtered[filtered['platform_id']==selected_platform_id]
-if selected_region != 'All' and not filtered.empty:
-    filtered = filtered[filtered['region']==selected_region]
-if selected_objective != 'All' and not filtered.empty:
-    filtered = filtered[filtered['objective']==selected_objective]
+filter_args = dict(
+    platform_id=selected_platform_id,
+    region=None if selected_region == 'All' else selected_region,
+    objective=None if selected_objective == 'All' else selected_objective,
+)
+
+# KPI cards and time series come from the rollup cube; row-level views
+# (scatter, raw table, export) use one combined mask over the cached frame
+filters_key = tuple(filter_args.items())
+cells = memoized('cells', data_version, filters_key, slice_rollup, cube, **filter_args)
+series, bucket = memoized('time_series', data_version, filters_key, time_series, cells)
+BUCKET_LABELS = {'D': 'daily', 'W': 'weekly', 'M': 'monthly'}
+
+if df.empty:
+    filtered = pd.DataFrame()
+else:
+    filtered = memoized('filtered', data_version, filters_key, filter_frame, df, **filter_args)
+
+# MySQL source: let the database aggregate; the cube remains the fallback
+use_db = DATA_SOURCE == 'mysql'
 
 # KPI cards
 st.subheader('Key Metrics')
-if not filtered.empty:
-    total_impressions = int(filtered['impressions'].sum())
-    total_clicks = int(filtered['clicks'].sum())
-    avg_ctr = round(filtered['CTR'].mean(),2)
-    avg_cpc = round(filtered['CPC'].mean(),2)
-    avg_roi = round(filtered['ROI'].mean(),2)
-else:
-    total_impressions = total_clicks = avg_ctr = avg_cpc = avg_roi = 0
+kpis = None
+if use_db:
+    try:
+        kpis = queries.kpi_summary(**filter_args)
+    except Exception as e:
+        use_db = False
+        st.sidebar.warning('DB aggregation unavailable, using cached data: ' + str(e))
+if kpis is None:
+    kpis = memoized('kpis', data_version, filters_key, kpis_from_rollup, cells)
+total_impressions = kpis['total_impressions']
+total_clicks = kpis['total_clicks']
+avg_ctr, avg_cpc, avg_roi = kpis['avg_ctr'], kpis['avg_cpc'], kpis['avg_roi']
 
 c1,c2,c3,c4,c5 = st.columns(5)
 c1.metric("Total Impressions", f"{total_impressions:,}")
 c2.metric("Total Clicks", f"{total_clicks:,}")
-c3.metric("Avg CTR", f"{avg_ctr:.2f}%")
-c4.metric("Avg CPC", f"₹{avg_cpc:.2f}")
-c5.metric("Avg ROI", f"{avg_roi:.2f}%")
+# ratio of sums over the filtered rows, same formulas as database/adwise360_analysis_queries.sql
+c3.metric("CTR", f"{avg_ctr:.2f}%")
+c4.metric("CPC", f"₹{avg_cpc:.2f}")
+c5.metric("ROI", f"{avg_roi:.2f}%")
 
 # tabs
 tab1,tab2,tab3,tab4 = st.tabs(['Overview','Charts','Raw Data','Predictions'])
 
 with tab1:
     st.write('### ROI Trend Over Time')
-    if not filtered.empty:
-        roi_trend = filtered.groupby('date')['ROI'].mean().sort_index()
-        st.line_chart(roi_trend)
+    if use_db:
+        st.line_chart(downsample_series(queries.daily_roi_trend(**filter_args)))
+    elif not series.empty:
+        st.caption(f'{BUCKET_LABELS[bucket].capitalize()} ROI % ((revenue - spend) / spend per bucket)')
+        st.line_chart(downsample_series(series['ROI']))
     else:
         st.info('No data for current filters.')
 
 with tab2:
     st.write('### Impressions vs Clicks')
-    if not filtered.empty:
-        imp_clicks = filtered.groupby('date')[['impressions','clicks']].sum().sort_index()
-        st.area_chart(imp_clicks)
+    if use_db:
+        # LTTB picks points on impressions; clicks follow the same dates
+        st.area_chart(downsample_series(queries.daily_impressions_clicks(**filter_args)))
+    elif not series.empty:
+        st.caption(f'{BUCKET_LABELS[bucket].capitalize()} totals')
+        st.area_chart(series[['impressions','clicks']])
     else:
         st.info('No data for current filters.')
-    st.write('### CTR vs ROI Scatter')
+    st.write('### CTR vs ROAS Scatter')
+    st.caption('Per row: ROAS = revenue / spend (the ROI card is (revenue - spend) / spend × 100 over all rows)')
     if not filtered.empty:
-        scatter = alt.Chart(filtered).mark_circle(size=60).encode(x='CTR', y='ROI', tooltip=['campaign_name','CTR','ROI'])
-        st.altair_chart(scatter, use_container_width=True)
+        mode = st.radio('Show', ['Sample', 'Density'], horizontal=True, key='scatter_mode')
+        if mode == 'Density':
+            points = memoized('scatter', data_version, filters_key, scatter_bins, filtered, extra=(mode,))
+        else:
+            names = campaign_attrs['campaign_name'] if 'campaign_name' in campaign_attrs.columns else None
+            points = memoized('scatter', data_version, filters_key, scatter_sample, filtered, names=names, extra=(mode,))
+        if mode == 'Density':
+            scatter = alt.Chart(points).mark_rect().encode(
+                x=alt.X('CTR', title='CTR'), x2='CTR_end', y=alt.Y('ROAS', title='ROAS'), y2='ROAS_end',
+                color=alt.Color('rows', scale=alt.Scale(type='log')), tooltip=['rows'])
+        else:
+            if len(points) < len(filtered):
+                st.caption(f'{len(points):,} of {len(filtered):,} rows, sampled per campaign')
+            scatter = alt.Chart(points).mark_circle(size=60).encode(x='CTR', y='ROAS', tooltip=['campaign_name','CTR','ROAS'])
+        st.altair_chart(scatter, width='stretch')
 
 with tab3:
     st.write('### Dataset')
-    if not filtered.empty:
-        display = filtered.copy()
-        display['platform_name'] = display['platform_id'].map(platform_map)
-        st.dataframe(display)
-    else:
-        st.info('No data to show.')
+    def decorate_raw(page):
+        # KPIs and names for the visible page only
+        page = with_row_kpis(with_attributes(page))
+        page['platform_name'] = page['platform_id'].map(platform_map)
+        return page
+
+    sortable = [c for c in ('date', 'impressions', 'clicks', 'conversions', 'spend', 'revenue') if c in filtered.columns]
+    paginated_table(filtered, 'raw', decorate=decorate_raw, sort_columns=sortable, cache_key=(data_version, filters_key))
 
 with tab4:
     st.write("### Predicted Campaign ROI")
 
     preds_path = "database/predictions_output.csv"
-    metrics_path = "database/metrics.csv"  # used for dataset summary (days)
 
     try:
-        # 1. Load predictions (raw)
-        preds = pd.read_csv(preds_path)
+        # 1. Load predictions (raw), memoized until the file changes (not on metrics ingest)
+        preds = memoized('predictions', None, None, pd.read_csv, preds_path,
+                         extra=(Path(preds_path).stat().st_mtime_ns,))
 
         # 2. Remove internal dummy columns that start with 'platform_' or 'obj_'
         #    This hides platform_2, platform_3, obj_Engagement, obj_Sales, etc.
         cols_to_hide_prefix = ("platform_", "obj_")
-        visible_cols = [c for c in preds.columns if not c.startswith(cols_to_hide_prefix)]
-        display = preds[visible_cols].copy()
-
-        # 3. Add a friendly platform_name column if platform_id exists
-        if "platform_id" in display.columns:
-            try:
-                platforms_df = extract_platforms()  # returns platform_id / platform_name
-                if "platform_name" in platforms_df.columns:
-                    pmap = dict(zip(platforms_df["platform_id"], platforms_df["platform_name"]))
-                else:
-                    pmap = dict(zip(platforms_df["platform_id"], platforms_df[platforms_df.columns[1]]))
-                display["platform_name"] = display["platform_id"].map(pmap).fillna(display["platform_id"].astype(str))
-            except Exception:
-                # fallback: show id as string
-                display["platform_name"] = display["platform_id"].astype(str) if "platform_id" in display.columns else ""
-
-        # 4. Simple formatting for display copy (keep preds raw for download)
-        formatted = display.copy()
-
-        # Format percents
-        for pct_col in ("avg_ctr", "avg_roi", "predicted_roi"):
-            if pct_col in formatted.columns:
-                formatted[pct_col] = formatted[pct_col].apply(lambda v: f"{v:.2f}%" if pd.notnull(v) else "")
-
-        # Format money columns
-        for money_col in ("total_spend", "total_revenue", "profit"):
-            if money_col in formatted.columns:
-                formatted[money_col] = formatted[money_col].apply(lambda v: f"₹{v:,.2f}" if pd.notnull(v) else "")
-
-        # Nicely format big integer columns
-        for int_col in ("total_impressions", "total_clicks", "total_conversions"):
-            if int_col in formatted.columns:
-                formatted[int_col] = formatted[int_col].apply(lambda v: f"{int(v):,}" if pd.notnull(v) else "")
-
-        # 4. Show the table and offer raw download
-        st.dataframe(formatted, use_container_width=True)
-
-        st.download_button(
-            label="Download raw predictions CSV",
-            data=preds.to_csv(index=False).encode("utf-8"),
-            file_name="predicted_roi_raw.csv",
-            mime="text/csv",
-        )
+        # feature_hash is bookkeeping for incremental rescoring (ml/generate_predictions.py)
+        visible_cols = [c for c in preds.columns if not c.startswith(cols_to_hide_prefix) and c != "feature_hash"]
+
+        # 3. Friendly platform_name for the visible page (falls back to the id)
+        def decorate_preds(page):
+            page = page[visible_cols]
+            if "platform_id" in page.columns:
+                page = page.assign(platform_name=page["platform_id"].map(platform_map)
+                                   .fillna(page["platform_id"].astype(str)))
+            return page
+
+        # 4. Vectorized formatting of the visible page only (preds stay raw for download)
+        formatters = {c: fmt_percent for c in ("avg_ctr", "avg_roi", "predicted_roi")}
+        formatters.update({c: fmt_money for c in ("total_spend", "total_revenue", "profit")})
+        formatters.update({c: fmt_int for c in ("total_impressions", "total_clicks", "total_conversions")})
+
+        sortable = [c for c in ("predicted_roi", "avg_roi", "total_spend", "total_revenue", "profit") if c in preds.columns]
+        paginated_table(preds, "preds", decorate=decorate_preds, formatters=formatters, sort_columns=sortable,
+                        cache_key=(None, ("mtime", Path(preds_path).stat().st_mtime_ns)))
+
+        export_widget("raw predictions", "predictions", Path(preds_path).stat().st_mtime_ns, None,
+                      "predicted_roi_raw", lambda: preds, fmt=export_format)
 
     except FileNotFoundError:
         st.info("No predictions found. Run ml/train_model.py and ml/generate_predictions.py first.")
@@ -193,5 +241,15 @@ with tab4:
 
 
 
-# download filtered data
-st.download_button('Download filtered data (CSV)', filtered.to_csv(index=False).encode('utf-8'), 'adwise_filtered.csv', 'text/csv')
\ No newline at end of file
+# download filtered data (row KPIs are added chunk by chunk while writing)
+export_widget('filtered data', 'filtered', data_version, filter_args, 'adwise_filtered',
+              lambda: filtered, transform=lambda rows: with_row_kpis(with_attributes(rows)), fmt=export_format)
+
+# memo hit/miss counters (this server process)
+with st.sidebar.expander('Cache stats'):
+    st.json(memo.stats())
+    frame_mb = memoized('frame_mb', data_version, None, lambda: memory_mb(df) + memory_mb(campaign_attrs))
+    st.caption(f'Cached frame: {len(df):,} rows, {frame_mb:.1f} MiB (compact layout + campaign side table)')
+    if DATA_SOURCE == 'mysql':
+        st.caption('DB query results and connection pool')
+        st.json({'queries': get_query_cache().stats(), 'pools': pool_status()})
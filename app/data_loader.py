@@ -1,21 +1,44 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 import pandas as pd
 import numpy as np
 
+from app.kpi import compute_ratios, CAMPAIGN_RATIOS
+
 # Minimal helper functions: create_campaign_features and extract_platforms
 
-def create_campaign_features(df):
-    """Aggregate row-level metrics into campaign-level features CSV for ML."""
-    if df.empty:
-        return pd.DataFrame()
+GROUP_KEYS = ['campaign_id','campaign_name','platform_id','objective','region']
+SUM_COLUMNS = {
+    'impressions': 'total_impressions',
+    'clicks': 'total_clicks',
+    'conversions': 'total_conversions',
+    'spend': 'total_spend',
+    'revenue': 'total_revenue',
+}
+MONEY_COLUMNS = ['spend', 'revenue']
+
+
+def _coerce_counters(df):
+    """Shallow copy of df with the metric counters numeric (NaN -> 0)."""
+    df = df.copy(deep=False)
+    for col in SUM_COLUMNS:
+        values = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        # narrowed int32 counters (app/schema.py) are summed as int64 like before
+        if values.dtype.kind in 'iu' and values.dtype.itemsize < 8:
+            values = values.astype(np.int64)
+        df[col] = values
+    return df
+
 
-    # ensure numeric
-    df['impressions'] = pd.to_numeric(df['impressions'], errors='coerce').fillna(0)
-    df['clicks'] = pd.to_numeric(df['clicks'], errors='coerce').fillna(0)
-    df['conversions'] = pd.to_numeric(df['conversions'], errors='coerce').fillna(0)
-    df['spend'] = pd.to_numeric(df['spend'], errors='coerce').fillna(0)
-    df['revenue'] = pd.to_numeric(df['revenue'], errors='coerce').fillna(0)
+def aggregate_campaigns(df):
+    """Per-campaign sums of the counters plus the campaign attributes (one row per campaign)."""
+    # ensure numeric (on a shallow copy so the caller's frame is left untouched)
+    df = _coerce_counters(df)
 
-    agg = df.groupby(['campaign_id','campaign_name','platform_id','objective','region']).agg(
+    # observed=True: categorical keys (app/schema.py) must not expand to all combinations
+    agg = df.groupby(GROUP_KEYS, observed=True).agg(
         total_impressions=('impressions','sum'),
         total_clicks=('clicks','sum'),
         total_conversions=('conversions','sum'),
@@ -25,19 +48,26 @@ def create_campaign_features(df):
         end_date=('end_date','first'),
         budget=('budget','first')
     ).reset_index()
+    # per-campaign table is small: decode categoricals so the output dtypes match the wide frame
+    for col in agg.columns:
+        if isinstance(agg[col].dtype, pd.CategoricalDtype):
+            agg[col] = agg[col].astype(agg[col].cat.categories.dtype)
+    return agg
 
+
+def finalize_campaign_features(agg):
+    """Turn per-campaign aggregates into the ML feature table (ratios, profit, one-hot)."""
+    agg = agg.copy()
     agg['days_active'] = (pd.to_datetime(agg['end_date']) - pd.to_datetime(agg['start_date'])).dt.days.fillna(0).astype(int)
-    agg['avg_ctr'] = (agg['total_clicks'] / agg['total_impressions']).replace([np.inf, np.nan], 0) * 100
-    agg['conv_rate'] = (agg['total_conversions'] / agg['total_clicks']).replace([np.inf, np.nan], 0)
-    agg['avg_cpc'] = (agg['total_spend'] / agg['total_clicks']).replace([np.inf, np.nan], 0)
-    agg['avg_roi'] = (agg['total_revenue'] / agg['total_spend']).replace([np.inf, np.nan], 0)
+    # all eight ratios from one preallocated block (see app.kpi)
+    ratios = compute_ratios(agg, CAMPAIGN_RATIOS)
+    for col in ('avg_ctr', 'conv_rate', 'avg_cpc', 'avg_roi'):
+        agg[col] = ratios[col]
     agg['profit'] = agg['total_revenue'] - agg['total_spend']
 
     # engineered features
-    agg['clicks_per_rupee'] = agg['total_clicks'] / agg['total_spend'].replace({0:1})
-    agg['revenue_per_click'] = agg['total_revenue'] / agg['total_clicks'].replace({0:1})
-    agg['conversions_per_click'] = agg['total_conversions'] / agg['total_clicks'].replace({0:1})
-    agg['budget_utilization'] = agg['total_spend'] / agg['budget'].replace({0:1})
+    for col in ('clicks_per_rupee', 'revenue_per_click', 'conversions_per_click', 'budget_utilization'):
+        agg[col] = ratios[col]
 
     # one-hot platform/objective
     platform_dummies = pd.get_dummies(agg['platform_id'], prefix='platform', drop_first=True)
@@ -49,15 +79,90 @@ def create_campaign_features(df):
     return features
 
 
+def create_campaign_features(df):
+    """Aggregate row-level metrics into campaign-level features CSV for ML."""
+    if df.empty:
+        return pd.DataFrame()
+    return finalize_campaign_features(aggregate_campaigns(df))
+
+
+def create_campaign_features_parallel(df, workers=None):
+    """
+    Same output as create_campaign_features, with the groupby spread over a
+    process pool: rows are hash-partitioned by campaign_id so every campaign is
+    aggregated by exactly one worker; ratios and one-hot encoding run once on
+    the merged aggregates.
+    """
+    if df.empty:
+        return pd.DataFrame()
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return create_campaign_features(df)
+
+    cols = GROUP_KEYS + list(SUM_COLUMNS) + ['start_date','end_date','budget']
+    df = df[[c for c in cols if c in df.columns]]
+    buckets = pd.util.hash_array(df['campaign_id'].to_numpy()) % np.uint64(workers)
+    # stable sort keeps each campaign's rows in their original order
+    order = np.argsort(buckets, kind='stable')
+    bounds = np.searchsorted(buckets[order], np.arange(workers + 1, dtype=np.uint64))
+    parts = [df.iloc[order[lo:hi]] for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+        aggs = list(pool.map(aggregate_campaigns, parts))
+
+    agg = pd.concat(aggs, ignore_index=True).sort_values(GROUP_KEYS).reset_index(drop=True)
+    return finalize_campaign_features(agg)
+
+
+def create_campaign_features_streaming(metrics_csv, campaigns_csv, chunksize=500_000):
+    """
+    Same output as create_campaign_features(metrics joined with campaigns), but
+    metrics are read in chunks of `chunksize` rows and folded into per-campaign
+    partial sums, so memory is bounded by the number of campaigns, not rows.
+    """
+    partial = None
+    usecols = ['campaign_id'] + list(SUM_COLUMNS)
+    for chunk in pd.read_csv(metrics_csv, usecols=usecols, chunksize=chunksize):
+        chunk = _coerce_counters(chunk)
+        # money is DECIMAL(12,2): summing integer paise keeps the totals exact and
+        # independent of how rows fall into chunks
+        for col in MONEY_COLUMNS:
+            chunk[col] = np.rint(chunk[col].to_numpy(dtype=np.float64) * 100).astype(np.int64)
+        sums = chunk.groupby('campaign_id')[list(SUM_COLUMNS)].sum()
+        # fold into the running totals (concat + sum keeps integer dtypes)
+        partial = sums if partial is None else pd.concat([partial, sums]).groupby(level=0).sum()
+
+    if partial is None or partial.empty:
+        return pd.DataFrame()
+    for col in MONEY_COLUMNS:
+        partial[col] = partial[col] / 100
+
+    campaigns = pd.read_csv(campaigns_csv)
+    partial = partial.rename(columns=SUM_COLUMNS).reset_index()
+    agg = partial.merge(campaigns, on='campaign_id', how='inner')
+    # groupby in aggregate_campaigns drops campaigns with a missing key attribute
+    agg = agg.dropna(subset=GROUP_KEYS).sort_values(GROUP_KEYS).reset_index(drop=True)
+    agg = agg[GROUP_KEYS + list(SUM_COLUMNS.values()) + ['start_date','end_date','budget']]
+    return finalize_campaign_features(agg)
+
+
+PLATFORMS_CSV = Path(__file__).resolve().parents[1] / 'database' / 'platforms.csv'
+
+
+@lru_cache(maxsize=4)
+def _read_platforms(path, mtime_ns):
+    return pd.read_csv(path)
+
+
 def extract_platforms():
     """Return small DataFrame mapping platform_id -> platform_name. Uses static mapping if not present."""
     # If you have a platforms table or file, read it; otherwise return default map
     try:
-        # attempt to read platforms.csv if present
-        p = Path(__file__).resolve().parents[1] / 'database' / 'platforms.csv'
+        # attempt to read platforms.csv if present (re-read only when it changes)
+        p = PLATFORMS_CSV
         if p.exists():
-            return pd.read_csv(p)
+            return _read_platforms(str(p), p.stat().st_mtime_ns).copy()
     except Exception:
         pass
 
-    return pd.DataFrame({'platform_id':[1,2,3], 'platform_name':['Google Ads','YouTube','Facebook Ads']})
\ No newline at end of file
+    return pd.DataFrame({'platform_id':[1,2,3], 'platform_name':['Google Ads','YouTube','Facebook Ads']})
@@ -1,12 +1,61 @@
 from sqlalchemy import create_engine
 from urllib.parse import quote_plus
 import os
+import threading
 
-def get_db_connection():
+# One pooled engine per (URL, options) for the whole process: callers that ask
+# for a connection per request share the pool instead of building a new one.
+# Pool sizing is tunable from the environment.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))   # seconds; below MySQL's wait_timeout
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(url, connect_args=None, **pool_options):
+    """
+    Shared engine for url (created on first use).
+    pool_options override the DB_POOL_* defaults (pool_size, max_overflow,
+    pool_recycle, pool_timeout); SQLite keeps SQLAlchemy's own pool choice.
     """
-    Returns a SQLAlchemy engine connected to the MySQL DB.
+    key = (str(url), tuple(sorted((connect_args or {}).items())), tuple(sorted(pool_options.items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            options = {"pool_pre_ping": True}
+            if not str(url).startswith("sqlite"):
+                options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW,
+                               pool_recycle=POOL_RECYCLE, pool_timeout=POOL_TIMEOUT)
+            options.update(pool_options)
+            engine = create_engine(url, connect_args=connect_args or {}, **options)
+            _engines[key] = engine
+        return engine
+
+def pool_status():
+    """{url: pool status line} for every engine in the registry (passwords hidden)."""
+    with _engines_lock:
+        return {e.url.render_as_string(hide_password=True): e.pool.status() for e in _engines.values()}
+
+def dispose_engines():
+    """Close every pooled connection (e.g. after fork or in tests)."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+def get_db_connection(local_infile=False):
+    """
+    Returns the shared SQLAlchemy engine for the MySQL DB.
     Read credentials from environment variables if present, otherwise use defaults.
+    DB_URL, when set, overrides them (e.g. sqlite:///adwise360.db as a local stand-in).
+    local_infile=True lets app/bulk_load.py use LOAD DATA LOCAL INFILE.
     """
+    DB_URL = os.getenv("DB_URL")
+    if DB_URL:
+        return get_engine(DB_URL)
+
     DB_USER = os.getenv("DB_USER", "root")
     DB_PASS = os.getenv("DB_PASS", "nidhi@2004")   # replace with your password or set env var
     DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -16,7 +65,6 @@ def get_db_connection():
     # URL-encode password so special characters don't break the URL
     safe_pass = quote_plus(DB_PASS)
     url = f"mysql+pymysql://{DB_USER}:{safe_pass}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    connect_args = {"local_infile": True} if local_infile else {}
     # pool_pre_ping helps recover from transient disconnects in long-running apps
-    engine = create_engine(url, pool_pre_ping=True)
-    return engine
-
+    return get_engine(url, connect_args=connect_args)
@@ -1,8 +1,16 @@
 from pathlib import Path
+import io
+import os
+import time
+import threading
 import pandas as pd
 import numpy as np
 import streamlit as st
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
+
+from app import columnar_store, query_cache
+from app.kpi import with_row_kpis
+from app.schema import compact_frame, campaign_side_table, attach_campaign_attributes, append_compact
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATABASE_DIR = PROJECT_ROOT / "database"
@@ -10,30 +18,55 @@ DATABASE_DIR = PROJECT_ROOT / "database"
 METRICS_CSV = DATABASE_DIR / "metrics.csv"
 CAMPAIGNS_CSV = DATABASE_DIR / "campaigns.csv"
 
-@st.cache_data(ttl=600)
-def get_cached_data():
+# "csv" (default, cloud-friendly) or "mysql" (reads the metrics/campaigns tables)
+DATA_SOURCE = os.getenv("ADWISE_DATA_SOURCE", "csv").lower()
+
+# how often get_cached_data() looks for newly appended metric rows
+INGEST_TTL_SECONDS = 600
+
+# bytes kept from just before the CSV offset to detect an in-place rewrite
+_TAIL_CHECK_BYTES = 64
+
+def _read_sources(db_sig=None):
     """
-    Read CSVs, join metrics + campaigns, compute KPIs and return DataFrame.
-    Cached for 10 minutes by default.
+    Return (metrics, campaigns) frames.
+    Reads the Parquet store when it matches the source; otherwise reads the CSVs
+    (or MySQL) once and (re)builds the store so the next cache miss is a columnar read.
+    db_sig: the MySQL tables' columnar_store.db_signature(), taken before this read.
     """
-    # Check files
-    if not METRICS_CSV.exists() or not CAMPAIGNS_CSV.exists():
-        st.error(f"CSV fallback missing. Ensure {METRICS_CSV} and {CAMPAIGNS_CSV} exist in repository.")
-        return pd.DataFrame()
+    if DATA_SOURCE == "mysql" and db_sig is None:
+        # taken before any read, so rows written meanwhile leave the store stale, not wrong
+        db_sig = columnar_store.db_signature()
+    if columnar_store.store_is_fresh(db_sig):
+        manifest = columnar_store.read_manifest() or {}
+        if manifest.get("source", "csv") == DATA_SOURCE:
+            try:
+                return columnar_store.read_metrics(), columnar_store.read_campaigns()
+            except Exception:
+                # damaged store: fall through to the source and rebuild it
+                pass
 
-    # Read CSVs
-    try:
+    if DATA_SOURCE == "mysql":
+        from app.db_connection import get_db_connection
+        engine = get_db_connection()
+        metrics = pd.read_sql("SELECT * FROM metrics ORDER BY metric_id", engine)
+        campaigns = pd.read_sql("SELECT * FROM campaigns", engine)
+    else:
+        if not METRICS_CSV.exists() or not CAMPAIGNS_CSV.exists():
+            raise FileNotFoundError(f"{METRICS_CSV} / {CAMPAIGNS_CSV}")
         metrics = pd.read_csv(METRICS_CSV)
-    except Exception as e:
-        st.error(f"Failed to read metrics CSV: {e}")
-        return pd.DataFrame()
-
-    try:
         campaigns = pd.read_csv(CAMPAIGNS_CSV)
-    except Exception as e:
-        st.error(f"Failed to read campaigns CSV: {e}")
-        return pd.DataFrame()
 
+    if columnar_store.store_available():
+        try:
+            columnar_store.build_store(metrics, campaigns, source=DATA_SOURCE, db_sig=db_sig)
+        except Exception:
+            # store is an optimisation only; never block the dashboard on it
+            pass
+    return metrics, campaigns
+
+def _prepare_frame(metrics, campaigns):
+    """Join metrics + campaigns and normalize types (row KPIs are added lazily)."""
     # Join
     try:
         df = metrics.merge(campaigns, on="campaign_id", how="left", validate="m:1")
@@ -55,11 +88,6 @@ def get_cached_data():
         except Exception:
             pass
 
-    # KPIs (safe math; avoid divide-by-zero)
-    df["CTR"] = (df["clicks"] / df["impressions"]).replace([np.inf, -np.inf], 0).fillna(0) * 100
-    df["CPC"] = (df["spend"] / df["clicks"]).replace([np.inf, -np.inf], 0).fillna(0)
-    df["ROI"] = (df["revenue"] / df["spend"]).replace([np.inf, -np.inf], 0).fillna(0)
-
     # Keep consistent column types / names expected by the rest of pipeline
     # e.g., campaign_id, campaign_name, platform_id, objective, region, start_date, end_date, budget
     expected_cols = ["campaign_id","campaign_name","platform_id","objective","region","start_date","end_date","budget"]
@@ -69,23 +97,264 @@ def get_cached_data():
 
     return df
 
-def refresh_data():
+def load_wide_frame():
     """
-    Clear the cached get_cached_data() and write a last_refresh timestamp into st.session_state.
-    Call this from a Streamlit button (on_click) or in UI code when needed.
+    (joined metrics + campaigns frame in its wide pandas layout, campaigns),
+    read from the source without the session cache; for scripts and reports.
     """
-    # Clear cache for get_cached_data (works when it's decorated with @st.cache_data)
+    metrics, campaigns = _read_sources()
+    return _prepare_frame(metrics, campaigns), campaigns
+
+@st.cache_resource
+def _ingest_state():
+    """
+    Process-wide holder for the joined frame and its ingestion watermark.
+    frame is the compact layout (app/schema.py); side holds the per-campaign
+    attributes joined back on request.
+    watermark is the highest metric_id merged so far; csv_offset is the byte
+    position in metrics.csv up to which rows have been read; version is bumped
+    whenever the frame changes (derived caches key on it).
+    """
+    return {
+        "lock": threading.Lock(),
+        "frame": None,
+        "side": None,
+        "campaigns": None,
+        "watermark": 0,
+        "csv_offset": 0,
+        "csv_tail": b"",
+        "csv_columns": None,
+        "campaigns_sig": None,
+        "db_sig": None,
+        "checked_at": 0.0,
+        "last_ingested_rows": 0,
+        "version": 0,
+    }
+
+def _reset_state(state):
+    state.update(frame=None, side=None, campaigns=None, watermark=0, csv_offset=0, csv_tail=b"",
+                 csv_columns=None, campaigns_sig=None, db_sig=None, checked_at=0.0, last_ingested_rows=0)
+
+def _full_load(state):
+    """Load the whole history and initialise the watermarks."""
+    # stat before reading: rows appended meanwhile are re-read and dropped by metric_id
+    metrics_sig = columnar_store.file_signature(METRICS_CSV)
+    campaigns_sig = columnar_store.file_signature(CAMPAIGNS_CSV)
+    db_sig = columnar_store.db_signature() if DATA_SOURCE == "mysql" else None
+
+    metrics, campaigns = _read_sources(db_sig)
+    state["frame"] = compact_frame(_prepare_frame(metrics, campaigns))
+    state["side"] = campaign_side_table(campaigns)
+    state["campaigns"] = campaigns
+    state["watermark"] = int(pd.to_numeric(metrics["metric_id"], errors="coerce").max()) if len(metrics) else 0
+    state["campaigns_sig"] = campaigns_sig
+    state["db_sig"] = db_sig
+    state["checked_at"] = time.monotonic()
+    state["last_ingested_rows"] = len(metrics)
+    state["version"] += 1
+    query_cache.invalidate()
+
+    if DATA_SOURCE == "csv" and metrics_sig is not None:
+        with open(METRICS_CSV, "rb") as f:
+            state["csv_columns"] = pd.read_csv(io.BytesIO(f.readline())).columns.tolist()
+            start = max(0, metrics_sig["size"] - _TAIL_CHECK_BYTES)
+            f.seek(start)
+            tail = f.read(metrics_sig["size"] - start)
+        # align the offset to a line end; a half-written last line is re-read later
+        cut = tail.rfind(b"\n") + 1
+        state["csv_tail"] = tail[:cut]
+        state["csv_offset"] = start + cut
+
+def _read_csv_tail(state):
+    """
+    Return metric rows appended to metrics.csv since the last read, or None when
+    the file was truncated / rewritten and a full reload is required.
+    """
+    sig = columnar_store.file_signature(METRICS_CSV)
+    offset = state["csv_offset"]
+    if sig is None or sig["size"] < offset or state["csv_columns"] is None:
+        return None
+    if sig["size"] == offset:
+        return pd.DataFrame(columns=state["csv_columns"])
+
+    with open(METRICS_CSV, "rb") as f:
+        tail = state["csv_tail"]
+        if tail:
+            f.seek(offset - len(tail))
+            if f.read(len(tail)) != tail:
+                return None
+        f.seek(offset)
+        chunk = f.read(sig["size"] - offset)
+
+    # writer may have stopped mid-line: only consume complete lines
+    end = chunk.rfind(b"\n")
+    if end < 0:
+        return pd.DataFrame(columns=state["csv_columns"])
+    chunk = chunk[:end + 1]
+    state["csv_offset"] = offset + len(chunk)
+    state["csv_tail"] = (tail + chunk)[-_TAIL_CHECK_BYTES:]
+    if not chunk.strip():
+        return pd.DataFrame(columns=state["csv_columns"])
+    return pd.read_csv(io.BytesIO(chunk), header=None, names=state["csv_columns"])
+
+def _read_db_since(watermark):
+    """Metric rows with metric_id above the watermark, straight from MySQL."""
+    from sqlalchemy import text
+    from app.db_connection import get_db_connection
+    engine = get_db_connection()
+    with engine.connect() as conn:
+        return pd.read_sql(text("SELECT * FROM metrics WHERE metric_id > :wm ORDER BY metric_id"),
+                           conn, params={"wm": int(watermark)})
+
+def _refresh_campaigns(state):
+    """
+    Re-read campaigns when the source changed. Returns the new frame, the current
+    one when unchanged, or None when existing campaigns were edited (full reload).
+    """
+    current = state["campaigns"]
+    if DATA_SOURCE == "mysql":
+        from app.db_connection import get_db_connection
+        campaigns = pd.read_sql("SELECT * FROM campaigns", get_db_connection())
+    else:
+        sig = columnar_store.file_signature(CAMPAIGNS_CSV)
+        if sig == state["campaigns_sig"]:
+            return current
+        campaigns = pd.read_csv(CAMPAIGNS_CSV)
+        state["campaigns_sig"] = sig
+
+    # only additions are allowed incrementally; edits change historical rows
+    old = current.set_index("campaign_id").sort_index()
+    new = campaigns.set_index("campaign_id")
+    if not old.index.isin(new.index).all():
+        return None
+    new_subset = new.loc[old.index, old.columns]
+    if not new_subset.astype(str).equals(old.astype(str)):
+        return None
+    return campaigns
+
+def ingest_new_rows():
+    """
+    Merge metric rows newer than the watermark into the cached frame.
+    Only the delta is read, joined and normalized; the store gets the
+    delta appended as a new part file. Falls back to a full reload when the source
+    was rewritten. Returns the number of rows ingested.
+    """
+    state = _ingest_state()
+    with state["lock"]:
+        return _ingest_locked(state)
+
+def _ingest_locked(state):
+    if state["frame"] is None:
+        _full_load(state)
+        return state["last_ingested_rows"]
+
+    metrics_sig = columnar_store.file_signature(METRICS_CSV)
+    db_sig = columnar_store.db_signature() if DATA_SOURCE == "mysql" else None
+    campaigns = _refresh_campaigns(state)
+    new = _read_db_since(state["watermark"]) if DATA_SOURCE == "mysql" else _read_csv_tail(state)
+    if new is not None and db_sig is not None:
+        # rows above the watermark must account for every metrics change; otherwise
+        # existing rows were edited or deleted (or rows landed mid-check): reload
+        expected = columnar_store.advance_db_signature(state["db_sig"], new)
+        if not columnar_store.db_signatures_match(expected, db_sig, tables=("metrics",)):
+            new = None
+    if new is None or campaigns is None:
+        _reset_state(state)
+        _full_load(state)
+        return state["last_ingested_rows"]
+
+    state["checked_at"] = time.monotonic()
+    if len(new):
+        new = new[pd.to_numeric(new["metric_id"], errors="coerce") > state["watermark"]]
+    campaigns_changed = campaigns is not state["campaigns"]
+    state["campaigns"] = campaigns
+    state["db_sig"] = db_sig
+    state["last_ingested_rows"] = len(new)
+    if new.empty and not campaigns_changed:
+        return 0
+    state["version"] += 1
+    # server-side aggregates (app/queries.py) must see the new rows too
+    query_cache.invalidate()
+
+    if campaigns_changed:
+        state["side"] = campaign_side_table(campaigns)
+    if len(new):
+        delta = compact_frame(_prepare_frame(new, campaigns))
+        # keep column order of the cached frame; categories / int widths are unified
+        state["frame"] = append_compact(state["frame"], delta)
+        state["watermark"] = int(pd.to_numeric(new["metric_id"]).max())
+
     try:
-        get_cached_data.clear()
+        columnar_store.append_metrics(
+            new,
+            campaigns=campaigns if campaigns_changed else None,
+            metrics_signature=metrics_sig if DATA_SOURCE == "csv" else None,
+            campaigns_signature=state["campaigns_sig"] if DATA_SOURCE == "csv" and campaigns_changed else None,
+            db_sig=db_sig,
+        )
     except Exception:
+        # the store will be rebuilt on the next full load
+        pass
+    return len(new)
+
+def get_cached_data(row_kpis=True, attributes=True):
+    """
+    Return the joined metrics + campaigns DataFrame.
+    row_kpis=True adds per-row CTR / CPC / ROAS columns; pass False when only base
+    counters are needed (aggregate KPIs are ratios of sums, see app.kpi).
+    attributes=False leaves out campaign_name / start_date / end_date / budget;
+    join them for just the rows you need with attach_campaign_attributes(rows,
+    get_campaign_attributes()).
+    The first call loads the full history (Parquet store or CSV); afterwards new
+    rows are merged incrementally at most every INGEST_TTL_SECONDS (10 minutes).
+    """
+    state = _ingest_state()
+    with state["lock"]:
         try:
-            st.cache_data.clear()
-        except Exception:
-            pass
+            if state["frame"] is None:
+                _full_load(state)
+            elif time.monotonic() - state["checked_at"] > INGEST_TTL_SECONDS:
+                _ingest_locked(state)
+        except FileNotFoundError:
+            _reset_state(state)
+            st.error(f"CSV fallback missing. Ensure {METRICS_CSV} and {CAMPAIGNS_CSV} exist in repository.")
+            return pd.DataFrame()
+        except Exception as e:
+            _reset_state(state)
+            st.error(f"Failed to read source data: {e}")
+            return pd.DataFrame()
+        # shallow copy: callers adding/replacing columns don't touch the shared frame
+        frame = state["frame"].copy(deep=False)
+        side = state["side"]
+    if attributes:
+        frame = attach_campaign_attributes(frame, side)
+    return with_row_kpis(frame) if row_kpis else frame
+
+def get_campaign_attributes():
+    """Per-campaign side table (index campaign_id) for the cached frame."""
+    side = _ingest_state()["side"]
+    return side if side is not None else pd.DataFrame()
+
+def get_data_version():
+    """Version of the cached frame; changes on every load or ingested delta."""
+    return _ingest_state()["version"]
+
+def refresh_data(full=False):
+    """
+    Pull newly appended metric rows into the cached frame (full=True reloads
+    everything) and write a last_refresh timestamp into st.session_state.
+    Call this from a Streamlit button (on_click) or in UI code when needed.
+    """
+    state = _ingest_state()
+    with state["lock"]:
+        if full:
+            _reset_state(state)
+        rows = _ingest_locked(state)
 
     # Set last refresh timestamp (UTC ISO format)
     try:
         st.session_state["last_refresh"] = datetime.now(timezone.utc).isoformat()
+        st.session_state["last_refresh_rows"] = rows
     except Exception:
         # session_state might not exist in certain contexts, ignore silently
         pass
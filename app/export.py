@@ -0,0 +1,156 @@
+import gzip
+import hashlib
+import json
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from uuid import uuid4
+
+import streamlit as st
+
+# pyarrow is optional: without it only the CSV formats are offered
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pa = pq = None
+
+# Download exports are written to disk in row chunks only when a user asks for
+# them, and kept per (export, data version, filters, format), so script reruns
+# never serialize the dataset and a repeated request is a file read.
+
+CHUNK_ROWS = 100_000
+
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    return [f for f in FORMATS if f != "Parquet" or pq is not None]
+
+
+def iter_chunks(df, transform=None, chunk_rows=CHUNK_ROWS):
+    """Yield row slices of df (optionally transformed) without copying the whole frame."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield transform(chunk) if transform is not None else chunk
+
+
+def write_export(df, path, fmt="CSV", transform=None, chunk_rows=CHUNK_ROWS):
+    """Write df to path chunk by chunk in the given format; returns the row count."""
+    path = Path(path)
+    # unique per writer: concurrent builds of one key must not share a temp file
+    tmp = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    rows = 0
+    try:
+        if fmt == "Parquet":
+            if pq is None:
+                raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+            writer = None
+            try:
+                for chunk in iter_chunks(df, transform, chunk_rows):
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+                    rows += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            opener = gzip.open if fmt == "CSV (gzip)" else open
+            with opener(tmp, "wb") as f:
+                for i, chunk in enumerate(iter_chunks(df, transform, chunk_rows)):
+                    f.write(chunk.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+                    rows += len(chunk)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    tmp.replace(path)
+    return rows
+
+
+def export_key(name, version, filters, fmt):
+    blob = json.dumps([name, version, filters, fmt], sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+class ExportCache:
+    """Finished export files in a private temp dir; the oldest are dropped beyond max_files."""
+
+    def __init__(self, max_files=12):
+        self._dir = tempfile.TemporaryDirectory(prefix="adwise_exports_")
+        self.root = Path(self._dir.name)
+        self.max_files = max_files
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            path = self._files.get(key)
+            if path is not None and path.exists():
+                self._files.move_to_end(key)
+                return path
+            return None
+
+    def drop(self, key):
+        with self._lock:
+            self._files.pop(key, None)
+
+    def build(self, key, fmt, make_frame, transform=None):
+        """Path of the export for key, writing it (from make_frame()) on a miss."""
+        path = self.get(key)
+        if path is not None:
+            return path
+        path = self.root / f"{key}{FORMATS[fmt][0]}"
+        write_export(make_frame(), path, fmt, transform)
+        with self._lock:
+            self._files[key] = path
+            while len(self._files) > self.max_files:
+                _, old = self._files.popitem(last=False)
+                old.unlink(missing_ok=True)
+        return path
+
+    def read(self, key, fmt, make_frame, transform=None):
+        """
+        Contents of the export for key, built from make_frame() on a miss.
+        Another session's build can evict the file between the lookup and
+        the read; the key is then dropped and the export built again.
+        """
+        while True:
+            path = self.build(key, fmt, make_frame, transform)
+            try:
+                return path.read_bytes()
+            except FileNotFoundError:
+                self.drop(key)
+
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+
+def export_widget(label, name, version, filters, file_stem, make_frame, transform=None, fmt="CSV", container=st):
+    """
+    'Prepare' button; on click the export is written (or found in the cache)
+    and its bytes handed to a download button for that script run only, so
+    other reruns neither serialize the data nor read the file back.
+    """
+    cache = get_export_cache()
+    key = export_key(name, version, filters, fmt)
+    if not container.button(f"Prepare {label}", key=f"prepare_{name}"):
+        return
+    try:
+        with st.spinner(f"Preparing {label}..."):
+            data = cache.read(key, fmt, make_frame, transform)
+    except Exception as e:
+        container.error(f"Export failed: {e}")
+        return
+    ext, mime = FORMATS[fmt]
+    # on_click="ignore": downloading does not rerun the script (which would hide the button)
+    container.download_button(f"Download {label}", data, file_name=file_stem + ext, mime=mime,
+                              key=f"download_{name}", on_click="ignore")
@@ -0,0 +1,103 @@
+import numpy as np
+
+# Shared safe-ratio kernel for every derived KPI column.
+# Each ratio is one masked np.divide into a preallocated float64 buffer instead of
+# the divide -> replace(inf) -> fillna -> multiply chain (one temporary per step).
+
+# (output column, numerator, denominator, scale, on_zero)
+# on_zero="zero":      result is 0 where the denominator is 0      (x / 0 -> 0)
+# on_zero="numerator": result is the numerator where it is 0        (x / den.replace({0: 1}))
+ROW_KPIS = [
+    ("CTR", "clicks", "impressions", 100.0, "zero"),
+    ("CPC", "spend", "clicks", 1.0, "zero"),
+    # revenue per unit spend; "ROI" is reserved for the aggregate % (roi_percent)
+    ("ROAS", "revenue", "spend", 1.0, "zero"),
+]
+
+CAMPAIGN_RATIOS = [
+    ("avg_ctr", "total_clicks", "total_impressions", 100.0, "zero"),
+    ("conv_rate", "total_conversions", "total_clicks", 1.0, "zero"),
+    ("avg_cpc", "total_spend", "total_clicks", 1.0, "zero"),
+    ("avg_roi", "total_revenue", "total_spend", 1.0, "zero"),
+    ("clicks_per_rupee", "total_clicks", "total_spend", 1.0, "numerator"),
+    ("revenue_per_click", "total_revenue", "total_clicks", 1.0, "numerator"),
+    ("conversions_per_click", "total_conversions", "total_clicks", 1.0, "numerator"),
+    ("budget_utilization", "total_spend", "budget", 1.0, "numerator"),
+]
+
+
+def _as_array(values):
+    """
+    Underlying numeric ndarray of a Series/array without copying. Integer
+    columns stay integer: the ufuncs cast them chunk-wise into the float output.
+    """
+    arr = values.to_numpy(copy=False) if hasattr(values, "to_numpy") else np.asarray(values)
+    if arr.dtype.kind not in "iuf":
+        arr = arr.astype(np.float64)
+    return arr
+
+
+def safe_ratio(num, den, scale=1.0, on_zero="zero", out=None):
+    """
+    num / den * scale, written into `out` (allocated if not given).
+    Zero denominators give 0 (or the numerator, see on_zero); NaN/inf results give 0.
+    """
+    num = _as_array(num)
+    den = _as_array(den)
+    if out is None:
+        out = np.empty(num.shape, dtype=np.float64)
+    if on_zero == "numerator":
+        np.copyto(out, num)
+    else:
+        out.fill(0.0)
+    np.divide(num, den, out=out, where=den != 0)
+    if scale != 1.0:
+        np.multiply(out, scale, out=out)
+    np.nan_to_num(out, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return out
+
+
+def compute_ratios(df, specs):
+    """
+    Compute every ratio in `specs` for df into one preallocated (len(specs), n)
+    block. Returns {column: 1-D float64 array}; rows are views into the block.
+    """
+    block = np.empty((len(specs), len(df)), dtype=np.float64)
+    out = {}
+    for i, (name, num, den, scale, on_zero) in enumerate(specs):
+        out[name] = safe_ratio(df[num], df[den], scale=scale, on_zero=on_zero, out=block[i])
+    return out
+
+
+def add_row_kpis(df):
+    """Add the row-level CTR / CPC / ROAS columns to df in place and return it."""
+    for name, values in compute_ratios(df, ROW_KPIS).items():
+        df[name] = values
+    return df
+
+
+def with_row_kpis(df):
+    """Shallow copy of df with CTR / CPC / ROAS added (computed only when a view needs them)."""
+    if all(name in df.columns for name, *_ in ROW_KPIS):
+        return df
+    return add_row_kpis(df.copy(deep=False))
+
+
+def roi_percent(revenue, spend):
+    """Aggregate ROI as in the SQL reports: (SUM(revenue) - SUM(spend)) / SUM(spend) * 100."""
+    revenue, spend = _as_array(revenue), _as_array(spend)
+    return safe_ratio(revenue - spend, spend, 100.0)
+
+
+def aggregate_kpis(sums):
+    """
+    KPI values from summed base counters (ratio of sums, like the SQL reports):
+    CTR = SUM(clicks)/SUM(impressions)*100, CPC = SUM(spend)/SUM(clicks),
+    ROAS = SUM(revenue)/SUM(spend), ROI = roi_percent(). `sums` is a dict or Series of totals.
+    """
+    out = {}
+    for name, num, den, scale, _ in ROW_KPIS:
+        n, d = float(sums.get(num, 0) or 0), float(sums.get(den, 0) or 0)
+        out[name] = n / d * scale if d else 0.0
+    out["ROI"] = float(roi_percent(float(sums.get("revenue", 0) or 0), float(sums.get("spend", 0) or 0)))
+    return out
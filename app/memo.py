@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Process-wide memo for derived, filter-dependent results (filtered frames,
+# cube slices, KPI dicts, chart data). Keys are (name, data version, filter
+# tuple, extra args); values are kept by reference (no pickling per hit, unlike
+# st.cache_data) and evicted least-recently-used once their estimated size
+# exceeds the memory budget.
+
+DEFAULT_BUDGET_MB = float(os.getenv("ADWISE_MEMO_MB", "256"))
+
+
+def estimate_size(value):
+    """Approximate bytes held by value (frames/arrays exactly, containers recursively)."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class MemoCache:
+    """Thread-safe LRU with a byte budget and hit/miss/eviction counters."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute, *args, **kwargs):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        # computed outside the lock; two reruns racing on one key both compute once
+        value = compute(*args, **kwargs)
+        # a result that is one of the inputs (e.g. an unfiltered frame) is already
+        # held by its owner: caching it would only charge its size to the budget
+        if not any(value is a for a in args):
+            self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.budget:
+                return
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.budget:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def invalidate(self, version=None):
+        """
+        Drop every entry (or only those not for `version`). Entries memoized
+        with version None don't depend on the data version and are kept.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if version is None or k[1] not in (version, None)]:
+                self.bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "mb": round(self.bytes / 1024 / 1024, 2),
+                "budget_mb": round(self.budget / 1024 / 1024, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+@st.cache_resource
+def get_memo():
+    return MemoCache()
+
+
+def memoized(name, version, filters, compute, *args, extra=(), **kwargs):
+    """
+    compute(*args, **kwargs) memoized under (name, version, filters, extra).
+    `filters` and `extra` must be hashable; args are not part of the key.
+    version None: the result does not depend on the data version (key it via extra).
+    """
+    return get_memo().get_or_compute((name, version, filters, extra), compute, *args, **kwargs)
@@ -0,0 +1,124 @@
+import re
+import sys
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.db_connection import get_db_connection
+
+# Ordered schema migrations on top of database/adwise360_schema.sql.
+# database/migrations/NNN_name.<dialect>.sql (mysql, or sqlite for the local
+# stand-in); applied versions are recorded in schema_migrations, so running
+# the migrator again only applies what is new. MySQL DDL commits implicitly:
+# a migration that fails halfway is not recorded and must be fixed by hand
+# before it is rerun.
+
+MIGRATIONS_DIR = PROJECT_ROOT / "database" / "migrations"
+_FILE_RE = re.compile(r"^(\d+)_(\w+)\.(mysql|sqlite)\.sql$")
+
+
+def available(dialect, root=MIGRATIONS_DIR):
+    """[(version, name, path)] for dialect, ordered by version."""
+    found = []
+    for path in Path(root).glob(f"*.{dialect}.sql"):
+        m = _FILE_RE.match(path.name)
+        if m:
+            found.append((m.group(1), m.group(2), path))
+    return sorted(found)
+
+
+def split_statements(sql):
+    """Statements of a migration file, with /* */ and -- comments removed."""
+    sql = re.sub(r"/\*.*?\*/", "", sql, flags=re.S)
+    sql = "\n".join(line for line in sql.splitlines() if not line.lstrip().startswith("--"))
+    return [s.strip() for s in sql.split(";") if s.strip()]
+
+
+def _ensure_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(16) PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at VARCHAR(32) NOT NULL)"
+    ))
+
+
+def applied(engine):
+    """Set of applied migration versions."""
+    with engine.begin() as conn:
+        _ensure_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def pending(engine, root=MIGRATIONS_DIR):
+    done = applied(engine)
+    return [m for m in available(engine.dialect.name, root) if m[0] not in done]
+
+
+def mark_applied(engine, versions, root=MIGRATIONS_DIR):
+    """Record versions as applied without running them (their changes are already in place)."""
+    names = {v: n for v, n, _ in available(engine.dialect.name, root)}
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with engine.begin() as conn:
+        _ensure_table(conn)
+        done = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+        for version in versions:
+            if version in names and version not in done:
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                    {"v": version, "n": names[version], "t": now},
+                )
+
+
+def migrate(engine, target=None, dry_run=False, root=MIGRATIONS_DIR, log=print):
+    """Apply pending migrations up to `target` (inclusive); returns the versions applied."""
+    done = []
+    for version, name, path in pending(engine, root):
+        if target is not None and int(version) > int(target):
+            break
+        statements = split_statements(path.read_text(encoding="utf-8"))
+        log(f"{'(dry run) ' if dry_run else ''}{version} {name}: {len(statements)} statement(s)")
+        if dry_run:
+            for stmt in statements:
+                log(f"  {stmt};")
+            continue
+        with engine.begin() as conn:
+            for stmt in statements:
+                conn.execute(text(stmt))
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": version, "n": name, "t": datetime.now(timezone.utc).isoformat(timespec="seconds")},
+            )
+        done.append(version)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database/migrations to the MySQL (or SQLite) schema.")
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL instead of get_db_connection()")
+    parser.add_argument("--target", default=None, help="stop after this version")
+    parser.add_argument("--dry-run", action="store_true", help="print the statements without running them")
+    parser.add_argument("--status", action="store_true", help="list applied / pending migrations")
+    args = parser.parse_args()
+
+    if args.url:
+        from sqlalchemy import create_engine
+        engine = create_engine(args.url)
+    else:
+        engine = get_db_connection()
+    if args.status:
+        done = applied(engine)
+        for version, name, _ in available(engine.dialect.name):
+            print(f"{version} {name:40s} {'applied' if version in done else 'pending'}")
+        return
+    versions = migrate(engine, args.target, args.dry_run)
+    if not args.dry_run:
+        print(f"Applied {len(versions)} migration(s)" + (f": {', '.join(versions)}" if versions else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.db_connection import get_db_connection
+from app.query_cache import get_query_cache
+
+# Server-side aggregations for the dashboard. Only aggregates cross the wire;
+# the SQL is plain enough to run on MySQL and on a SQLite stand-in. Results are
+# cached per (query, params) with a TTL and dropped when data is ingested.
+# (1.0 * ... keeps SQLite from doing integer division.)
+
+# ratio of sums, as in database/adwise360_analysis_queries.sql
+_CTR = "COALESCE(100.0 * SUM(m.clicks) / NULLIF(SUM(m.impressions), 0), 0)"
+_CPC = "COALESCE(1.0 * SUM(m.spend) / NULLIF(SUM(m.clicks), 0), 0)"
+_ROI = "COALESCE(100.0 * (SUM(m.revenue) - SUM(m.spend)) / NULLIF(SUM(m.spend), 0), 0)"
+
+
+def _where(platform_id=None, region=None, objective=None):
+    """Build the WHERE clause + bound params for the sidebar filters."""
+    clauses, params = [], {}
+    if platform_id is not None:
+        clauses.append("c.platform_id = :platform_id")
+        params["platform_id"] = int(platform_id)
+    if region is not None:
+        clauses.append("c.region = :region")
+        params["region"] = region
+    if objective is not None:
+        clauses.append("c.objective = :objective")
+        params["objective"] = objective
+    sql = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    return sql, params
+
+
+def _read(sql, params, engine=None):
+    """Result of a read query, shared across sessions through app/query_cache.py."""
+    engine = engine or get_db_connection()
+
+    def run():
+        with engine.connect() as conn:
+            return pd.read_sql(text(sql), conn, params=params)
+
+    # copy: callers post-process the frame in place
+    return get_query_cache().get_or_run(engine.url, sql, params, run).copy()
+
+
+def kpi_summary(platform_id=None, region=None, objective=None, engine=None):
+    """
+    KPI card values for the current filters, computed by the database.
+    Returns dict: total_impressions, total_clicks, avg_ctr, avg_cpc, avg_roi.
+    """
+    where, params = _where(platform_id, region, objective)
+    sql = f"""
+        SELECT
+            COALESCE(SUM(m.impressions), 0) AS total_impressions,
+            COALESCE(SUM(m.clicks), 0) AS total_clicks,
+            {_CTR} AS avg_ctr,
+            {_CPC} AS avg_cpc,
+            {_ROI} AS avg_roi
+        FROM metrics m
+        JOIN campaigns c ON c.campaign_id = m.campaign_id
+        {where}
+    """
+    row = _read(sql, params, engine).iloc[0]
+    return {
+        "total_impressions": int(row["total_impressions"]),
+        "total_clicks": int(row["total_clicks"]),
+        "avg_ctr": round(float(row["avg_ctr"]), 2),
+        "avg_cpc": round(float(row["avg_cpc"]), 2),
+        "avg_roi": round(float(row["avg_roi"]), 2),
+    }
+
+
+def daily_roi_trend(platform_id=None, region=None, objective=None, engine=None):
+    """ROI % per date, (SUM(revenue) - SUM(spend)) / SUM(spend) * 100 (Series indexed by date)."""
+    where, params = _where(platform_id, region, objective)
+    sql = f"""
+        SELECT m.date AS date, {_ROI} AS ROI
+        FROM metrics m
+        JOIN campaigns c ON c.campaign_id = m.campaign_id
+        {where}
+        GROUP BY m.date
+        ORDER BY m.date
+    """
+    df = _read(sql, params, engine)
+    df["date"] = pd.to_datetime(df["date"])
+    return df.set_index("date")["ROI"]
+
+
+def daily_impressions_clicks(platform_id=None, region=None, objective=None, engine=None):
+    """Summed impressions and clicks per date (DataFrame indexed by date)."""
+    where, params = _where(platform_id, region, objective)
+    sql = f"""
+        SELECT m.date AS date, SUM(m.impressions) AS impressions, SUM(m.clicks) AS clicks
+        FROM metrics m
+        JOIN campaigns c ON c.campaign_id = m.campaign_id
+        {where}
+        GROUP BY m.date
+        ORDER BY m.date
+    """
+    df = _read(sql, params, engine)
+    df["date"] = pd.to_datetime(df["date"])
+    return df.set_index("date")[["impressions", "clicks"]]
+
+
+def filter_options(engine=None):
+    """Distinct regions and objectives for the sidebar selectboxes."""
+    regions = _read("SELECT DISTINCT region FROM campaigns WHERE region IS NOT NULL ORDER BY region", {}, engine)
+    objectives = _read("SELECT DISTINCT objective FROM campaigns WHERE objective IS NOT NULL ORDER BY objective", {}, engine)
+    return regions["region"].tolist(), objectives["objective"].tolist()
+
+
+def sqlite_standin(metrics, campaigns, url="sqlite://"):
+    """
+    Load metrics/campaigns frames into a SQLite engine with the same table names,
+    so the queries above can be exercised without a MySQL server.
+    """
+    engine = create_engine(url)
+    metrics = metrics.copy()
+    if "date" in metrics.columns:
+        metrics["date"] = pd.to_datetime(metrics["date"]).dt.strftime("%Y-%m-%d")
+    metrics.to_sql("metrics", engine, index=False, if_exists="replace")
+    campaigns.to_sql("campaigns", engine, index=False, if_exists="replace")
+    return engine
@@ -0,0 +1,96 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# Process-wide cache of read-query results (small aggregate frames) keyed by
+# (engine URL, SQL, bound params). Entries expire after a TTL so other writers
+# to the database are picked up; writers in this process (ETL ingest, bulk
+# loader, API ingest) call invalidate() so their rows show up at once.
+# Concurrent misses on one key run the query once and share the result.
+
+DEFAULT_TTL_SECONDS = float(os.getenv("ADWISE_QUERY_TTL", "60"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("ADWISE_QUERY_CACHE_ENTRIES", "512"))
+
+
+def _freeze(params):
+    return tuple(sorted((params or {}).items()))
+
+
+class QueryCache:
+    """TTL + LRU result cache with single-flight misses and hit/miss counters."""
+
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (expires_at, generation, value)
+        self._inflight = {}             # key -> Event of the query running for it
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_run(self, engine_url, sql, params, run):
+        """Cached result of run() for (engine_url, sql, params)."""
+        key = (str(engine_url), " ".join(sql.split()), _freeze(params))
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic() and entry[1] == self.generation:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    self.misses += 1
+                    done = self._inflight[key] = threading.Event()
+                    generation = self.generation
+                    break
+            # another session is running this query: wait for its result
+            waiting.wait()
+        try:
+            value = run()
+            with self._lock:
+                # a write that landed while the query ran makes this result stale
+                if generation == self.generation:
+                    self._entries[key] = (time.monotonic() + self.ttl, generation, value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            done.set()
+
+    def invalidate(self):
+        """Drop every cached result (call after writing to the database)."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache = QueryCache()
+
+
+def get_query_cache():
+    return _cache
+
+
+def invalidate():
+    """Invalidate the process-wide query cache."""
+    _cache.invalidate()
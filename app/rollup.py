@@ -0,0 +1,57 @@
+import pandas as pd
+
+from app.kpi import aggregate_kpis
+
+# Pre-aggregated rollup ("cube") of the joined frame, keyed by the dashboard's
+# filter dimensions + date. Built once per data load; every filter combination
+# is then answered by slicing a frame whose size depends on the number of
+# platform x region x objective x date cells, not on the raw row count.
+
+CUBE_KEYS = ["platform_id", "region", "objective", "date"]
+CUBE_MEASURES = ["impressions", "clicks", "conversions", "spend", "revenue"]
+
+
+def build_rollup(df):
+    """Aggregate row-level metrics to one row per (platform_id, region, objective, date)."""
+    if df.empty:
+        return pd.DataFrame(columns=CUBE_KEYS + CUBE_MEASURES + ["rows"])
+
+    aggs = {m: (m, "sum") for m in CUBE_MEASURES}
+    aggs["rows"] = ("impressions", "size")
+    # dropna=False keeps rows with unknown region/objective in the "All" totals
+    cube = df.groupby(CUBE_KEYS, dropna=False, sort=True, observed=True).agg(**aggs).reset_index()
+    return cube
+
+
+def filter_frame(df, platform_id=None, region=None, objective=None):
+    """Rows of df (cube or raw frame) matching the filters; None means 'All'."""
+    if platform_id is None and region is None and objective is None:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if platform_id is not None:
+        mask &= df["platform_id"] == platform_id
+    if region is not None:
+        mask &= df["region"] == region
+    if objective is not None:
+        mask &= df["objective"] == objective
+    return df[mask]
+
+
+def slice_rollup(cube, platform_id=None, region=None, objective=None):
+    """Return the cube cells matching the filters (None means 'All')."""
+    return filter_frame(cube, platform_id, region, objective)
+
+
+def kpis_from_rollup(cells):
+    """KPI card values from cube cells; CTR / CPC / ROI % are ratios of sums (app.kpi.aggregate_kpis)."""
+    if cells.empty or not cells["rows"].sum():
+        return {"total_impressions": 0, "total_clicks": 0, "avg_ctr": 0, "avg_cpc": 0, "avg_roi": 0}
+    sums = cells[CUBE_MEASURES].sum()
+    kpis = aggregate_kpis(sums)
+    return {
+        "total_impressions": int(sums["impressions"]),
+        "total_clicks": int(sums["clicks"]),
+        "avg_ctr": round(kpis["CTR"], 2),
+        "avg_cpc": round(kpis["CPC"], 2),
+        "avg_roi": round(kpis["ROI"], 2),
+    }
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+# Compact in-memory layout of the joined metrics + campaigns frame.
+# - filter dimensions (region, objective) are pandas categoricals: one small
+#   code per row instead of a Python string object
+# - ids and counters are narrowed to int32 (or smaller ids) when every value is
+#   integral and in range; money (spend, revenue) stays float64 so ratio-of-sums
+#   KPIs are unchanged
+# - per-campaign attributes (name, dates, budget) live once per campaign in a
+#   side table and are joined back by campaign_id only for the rows that need them
+
+DIMENSION_COLUMNS = ["region", "objective"]
+ID_COLUMNS = ["metric_id", "campaign_id", "platform_id"]
+COUNTER_COLUMNS = ["impressions", "clicks", "conversions"]
+ATTRIBUTE_COLUMNS = ["campaign_name", "start_date", "end_date", "budget"]
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _integral(values):
+    """Values as int64 when every value is finite and integral, else None."""
+    arr = values.to_numpy()
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.int64, copy=False)
+    if arr.dtype.kind != "f" or not np.isfinite(arr).all() or not (arr == np.floor(arr)).all():
+        return None
+    return arr.astype(np.int64)
+
+
+def _narrow_ints(df, col, smallest=True):
+    arr = _integral(df[col])
+    if arr is None or not len(arr):
+        return
+    if smallest:
+        df[col] = pd.to_numeric(pd.Series(arr, index=df.index), downcast="integer")
+    elif _INT32.min <= arr.min() and arr.max() <= _INT32.max:
+        df[col] = arr.astype(np.int32)
+
+
+def compact_frame(df):
+    """Narrowed / dictionary-encoded copy of the joined frame, without the campaign attributes."""
+    df = df.drop(columns=[c for c in ATTRIBUTE_COLUMNS if c in df.columns])
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            _narrow_ints(df, col, smallest=col != "metric_id")
+    for col in COUNTER_COLUMNS:
+        if col in df.columns:
+            _narrow_ints(df, col, smallest=False)
+    for col in DIMENSION_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def campaign_side_table(campaigns):
+    """One row per campaign_id with the attribute columns (categorical strings)."""
+    side = campaigns.drop_duplicates("campaign_id", keep="last").set_index("campaign_id")
+    side = side[[c for c in ATTRIBUTE_COLUMNS if c in side.columns]].copy()
+    for col in side.columns:
+        # budget first: a budget column read as strings must stay numeric
+        if col == "budget":
+            side[col] = pd.to_numeric(side[col], errors="coerce").fillna(0)
+        elif side[col].dtype == object:
+            side[col] = side[col].astype("category")
+    return side
+
+
+def attach_campaign_attributes(frame, side, columns=None):
+    """Frame (shallow copy) with the side-table attributes joined by campaign_id."""
+    columns = [c for c in (columns or ATTRIBUTE_COLUMNS) if c in side.columns and c not in frame.columns]
+    if not columns:
+        return frame
+    out = frame.copy(deep=False)
+    pos = side.index.get_indexer(frame["campaign_id"].to_numpy())
+    missing = pos < 0
+    for col in columns:
+        values = side[col].array
+        if isinstance(values, pd.Categorical):
+            # codes only; rows without a campaign become NaN
+            out[col] = values.take(pos, allow_fill=True)
+        else:
+            taken = values.take(np.where(missing, 0, pos)).astype(np.float64) if len(values) else np.full(len(pos), np.nan)
+            taken[missing] = np.nan
+            # budget was fillna(0)-ed on the joined frame
+            out[col] = np.nan_to_num(taken, nan=0.0) if col == "budget" else taken
+    return out
+
+
+def append_compact(frame, delta):
+    """Concatenate two compact frames, unifying categories and widening int dtypes as needed."""
+    delta = delta[frame.columns].copy()
+    frame = frame.copy(deep=False)
+    for col in frame.columns:
+        a, b = frame[col].dtype, delta[col].dtype
+        if isinstance(a, CategoricalDtype) or isinstance(b, CategoricalDtype):
+            if not isinstance(a, CategoricalDtype):
+                frame[col] = frame[col].astype("category")
+            new = pd.Index(delta[col].dropna().unique()).difference(frame[col].cat.categories)
+            if len(new):
+                # sorted like a full load's astype("category"), so codes don't depend on
+                # ingest history; remapping the small code array is cheap
+                frame[col] = frame[col].cat.set_categories(frame[col].cat.categories.union(new).sort_values())
+            delta[col] = pd.Categorical(delta[col], dtype=frame[col].dtype)
+        elif a != b:
+            common = np.result_type(a, b)
+            if a != common:
+                frame[col] = frame[col].astype(common)
+            delta[col] = delta[col].astype(common)
+    return pd.concat([frame, delta], ignore_index=True)
+
+
+def memory_mb(df):
+    """Deep memory usage of df in MiB."""
+    return float(df.memory_usage(deep=True, index=True).sum()) / 1024 / 1024
+
+
+def memory_report(wide, compact, side=None):
+    """Per-column MiB of the wide vs compact frame plus totals (DataFrame)."""
+    before = wide.memory_usage(deep=True, index=False) / 1024 / 1024
+    after = compact.memory_usage(deep=True, index=False) / 1024 / 1024
+    report = pd.DataFrame({"wide_mb": before, "compact_mb": after})
+    report["wide_dtype"] = wide.dtypes.astype(str)
+    report["compact_dtype"] = compact.dtypes.reindex(report.index).astype(str)
+    if side is not None:
+        report.loc["(campaign side table)", "compact_mb"] = memory_mb(side)
+    report.loc["TOTAL", ["wide_mb", "compact_mb"]] = report[["wide_mb", "compact_mb"]].sum()
+    return report
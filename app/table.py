@@ -0,0 +1,112 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app.memo import memoized
+
+# Paginated table for large frames: only the visible page is sliced out of the
+# cached frame, decorated and formatted, so the payload sent to the browser and
+# the formatting work scale with the page size instead of the row count.
+
+PAGE_SIZES = [50, 100, 250, 500, 1000]
+
+
+def _blank_missing(values, text):
+    """Replace the text of missing values with '' (vectorized)."""
+    out = pd.Series(text, index=values.index, dtype=object)
+    out[values.isna().to_numpy()] = ""
+    return out
+
+
+def _group_thousands(text, before):
+    # insert ',' every three digits counting back from `before` ('$' or '\.')
+    return text.str.replace(rf"(\d)(?=(\d{{3}})+{before})", r"\1,", regex=True)
+
+
+def fmt_percent(values, decimals=2):
+    """12.3456 -> '12.35%'"""
+    values = pd.to_numeric(values, errors="coerce")
+    text = np.char.mod(f"%.{decimals}f%%", values.fillna(0).to_numpy(dtype=np.float64))
+    return _blank_missing(values, text)
+
+
+def fmt_money(values, symbol="₹", decimals=2):
+    """1234567.891 -> '₹1,234,567.89'"""
+    values = pd.to_numeric(values, errors="coerce")
+    text = pd.Series(np.char.mod(f"%.{decimals}f", values.fillna(0).to_numpy(dtype=np.float64)), index=values.index)
+    return _blank_missing(values, symbol + _group_thousands(text, r"\." if decimals else "$"))
+
+
+def fmt_int(values):
+    """1234567 -> '1,234,567'"""
+    values = pd.to_numeric(values, errors="coerce")
+    text = pd.Series(np.char.mod("%d", values.fillna(0).to_numpy(dtype=np.float64).astype(np.int64)), index=values.index)
+    return _blank_missing(values, _group_thousands(text, "$"))
+
+
+def format_page(page, formatters):
+    """Apply {column: formatter} to the columns of `page` that exist."""
+    if not formatters:
+        return page
+    page = page.copy()
+    for col, fmt in formatters.items():
+        if col in page.columns:
+            page[col] = fmt(page[col])
+    return page
+
+
+def sort_positions(values):
+    """Row positions of values in stable ascending order."""
+    return np.argsort(values.to_numpy(), kind='stable')
+
+
+def paginated_table(df, key, decorate=None, formatters=None, page_size=100, sort_columns=None, cache_key=None):
+    """
+    Render df one page at a time.
+
+    decorate(page) -> page adds derived columns (KPIs, names) to the visible rows
+    only; formatters map column -> vectorized formatter applied after that.
+    Sorting, when offered, orders the full frame and keeps only the positions.
+    cache_key=(data version, filters) identifying df memoizes those positions
+    per sort column (app/memo.py), so paging through a sorted table doesn't re-sort.
+    """
+    n = len(df)
+    if n == 0:
+        st.info('No data to show.')
+        return
+
+    c1, c2, c3, c4 = st.columns([2, 2, 1, 1])
+    size = c3.selectbox('Rows per page', PAGE_SIZES,
+                        index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1, key=f'{key}_size')
+    pages = max(1, math.ceil(n / size))
+    # a narrower filter can leave the remembered page past the end
+    if st.session_state.get(f'{key}_page', 1) > pages:
+        st.session_state[f'{key}_page'] = pages
+    page_no = int(c4.number_input('Page', min_value=1, max_value=pages, step=1, key=f'{key}_page'))
+
+    order = None
+    if sort_columns:
+        sort_by = c1.selectbox('Sort by', ['(none)'] + list(sort_columns), key=f'{key}_sort')
+        descending = c2.checkbox('Descending', value=True, key=f'{key}_desc')
+        if sort_by != '(none)':
+            if cache_key is not None:
+                version, filters = cache_key
+                order = memoized('sort_positions', version, filters, sort_positions, df[sort_by], extra=(key, sort_by))
+            else:
+                order = sort_positions(df[sort_by])
+            if descending:
+                # reversed view; the memoized ascending order is never modified
+                order = order[::-1]
+
+    start = (page_no - 1) * size
+    stop = min(start + size, n)
+    rows = order[start:stop] if order is not None else slice(start, stop)
+    page = df.iloc[rows]
+    if decorate is not None:
+        page = decorate(page)
+    page = format_page(page, formatters)
+
+    st.caption(f'Rows {start + 1:,}–{stop:,} of {n:,} (page {page_no:,} of {pages:,})')
+    st.dataframe(page, width='stretch')
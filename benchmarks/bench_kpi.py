@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: pandas divide/replace/fillna chain vs the shared app.kpi kernel.
+Reports wall time and peak traced memory (numpy allocations) for the three
+row-level KPIs on a synthetic frame.
+
+    python benchmarks/bench_kpi.py --rows 10000000
+"""
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from app.kpi import compute_ratios, ROW_KPIS
+
+def make_frame(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    impressions = rng.integers(0, 50000, rows)
+    clicks = (impressions * rng.uniform(0, 0.12, rows)).astype(np.int64)
+    spend = np.round(clicks * rng.uniform(0.3, 3.0, rows), 2)
+    revenue = np.round(clicks * rng.uniform(0, 10, rows), 2)
+    return pd.DataFrame({"impressions": impressions, "clicks": clicks, "spend": spend, "revenue": revenue})
+
+def pandas_chain(df):
+    return {
+        "CTR": (df["clicks"] / df["impressions"]).replace([np.inf, -np.inf], 0).fillna(0) * 100,
+        "CPC": (df["spend"] / df["clicks"]).replace([np.inf, -np.inf], 0).fillna(0),
+        "ROI": (df["revenue"] / df["spend"]).replace([np.inf, -np.inf], 0).fillna(0),
+    }
+
+def kernel(df):
+    return compute_ratios(df, ROW_KPIS)
+
+def measure(fn, df, repeats):
+    best = float("inf")
+    peak = 0
+    for _ in range(repeats):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        result = fn(df)
+        best = min(best, time.perf_counter() - t0)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del result
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    ref, new = pandas_chain(df), kernel(df)
+    for name in ref:
+        assert np.allclose(ref[name].to_numpy(), new[name]), name
+    del ref, new
+
+    print(f"rows={args.rows:,}  repeats={args.repeats}")
+    print(f"{'variant':<14}{'best s':>10}{'peak MiB':>12}")
+    results = {}
+    for label, fn in [("pandas chain", pandas_chain), ("app.kpi", kernel)]:
+        secs, peak = measure(fn, df, args.repeats)
+        results[label] = (secs, peak)
+        print(f"{label:<14}{secs:>10.3f}{peak / 2**20:>12.1f}")
+    (t_old, m_old), (t_new, m_new) = results["pandas chain"], results["app.kpi"]
+    print(f"speedup x{t_old / t_new:.2f}, peak memory x{m_old / max(m_new, 1):.2f} lower")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Scaling benchmark for create_campaign_features_parallel across core counts.
+Builds a synthetic joined frame (metrics x campaigns) and times the serial
+builder against the process-pool builder for each worker count.
+
+    python benchmarks/bench_parallel_features.py --rows 5000000 --campaigns 20000
+"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from app.data_loader import create_campaign_features, create_campaign_features_parallel
+
+def make_joined_frame(rows, campaigns, seed=42):
+    rng = np.random.default_rng(seed)
+    cids = np.arange(1, campaigns + 1)
+    start = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 180, campaigns), unit="D")
+    camp = pd.DataFrame({
+        "campaign_id": cids,
+        "campaign_name": [f"Campaign_{c}" for c in cids],
+        "platform_id": rng.integers(1, 4, campaigns),
+        "objective": rng.choice(["Sales", "Traffic", "Awareness", "Engagement"], campaigns),
+        "region": rng.choice(["India", "USA", "UK"], campaigns),
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": (start + pd.to_timedelta(rng.integers(10, 60, campaigns), unit="D")).strftime("%Y-%m-%d"),
+        "budget": rng.integers(5000, 20000, campaigns).astype(float),
+    })
+    impressions = rng.integers(2000, 50000, rows)
+    clicks = (impressions * rng.uniform(0.01, 0.12, rows)).astype(np.int64)
+    metrics = pd.DataFrame({
+        "campaign_id": rng.choice(cids, rows),
+        "impressions": impressions,
+        "clicks": clicks,
+        "conversions": (clicks * rng.uniform(0.02, 0.25, rows)).astype(np.int64),
+        "spend": np.round(clicks * rng.uniform(0.3, 3.0, rows), 2),
+        "revenue": np.round(clicks * rng.uniform(0.1, 20, rows), 2),
+    })
+    return metrics.merge(camp, on="campaign_id", how="left")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--campaigns", type=int, default=20_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    df = make_joined_frame(args.rows, args.campaigns)
+    print(f"rows={args.rows:,}  campaigns={args.campaigns:,}  cores={os.cpu_count()}")
+
+    t0 = time.perf_counter()
+    serial = create_campaign_features(df)
+    base = time.perf_counter() - t0
+    print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}")
+    print(f"{'serial':>8}{base:>10.2f}{1.0:>10.2f}")
+
+    workers = 2
+    while workers <= args.max_workers:
+        t0 = time.perf_counter()
+        par = create_campaign_features_parallel(df, workers=workers)
+        secs = time.perf_counter() - t0
+        pd.testing.assert_frame_equal(serial, par)
+        print(f"{workers:>8}{secs:>10.2f}{base / secs:>10.2f}")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Load test for ml.prediction_service: concurrent clients post single-campaign
+requests; prints client-side latency percentiles and the server's batching stats.
+
+    python benchmarks/bench_prediction_service.py --clients 16 --requests 50
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from urllib.request import urlopen
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from ml.prediction_service import create_server, predict_rows
+
+FEATURES_CSV = Path(__file__).resolve().parents[1] / "database" / "ml_campaign_features.csv"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = create_server(port=0, max_wait_ms=args.max_wait_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    rows = pd.read_csv(FEATURES_CSV)[server.batcher.feature_names].to_dict(orient="records")
+    latencies = []
+    lock = threading.Lock()
+
+    def client(i):
+        local = []
+        for k in range(args.requests):
+            t0 = time.perf_counter()
+            predict_rows([rows[(i + k) % len(rows)]], url)
+            local.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{len(latencies):,} requests in {wall:.2f}s ({len(latencies) / wall:,.0f} req/s)")
+    print(f"client latency ms: p50={p50:.2f} p95={p95:.2f} p99={p99:.2f}")
+    with urlopen(url + "/stats") as resp:
+        print("server stats:", json.loads(resp.read()))
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
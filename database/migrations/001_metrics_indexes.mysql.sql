@@ -0,0 +1,26 @@
+/*
+AdWise360 migration 001: metrics indexes
+- drops duplicate (campaign_id, date) rows, keeping the latest metric_id
+- unique (campaign_id, date): one row per campaign-day, the key the bulk
+  loader and API ingest upsert on
+- covering indexes, campaign-leading (per-campaign GROUP BYs, joins from
+  campaigns) and date-leading (date-range scans, daily trend): the analysis
+  queries read an index only, never the table rows
+*/
+
+DELETE older FROM metrics older
+JOIN metrics newer
+  ON newer.campaign_id = older.campaign_id
+ AND newer.date = older.date
+ AND newer.metric_id > older.metric_id;
+
+ALTER TABLE metrics
+  ADD UNIQUE KEY uq_metrics_campaign_date (campaign_id, date),
+  ADD KEY ix_metrics_campaign_cover (campaign_id, date, impressions, clicks, conversions, spend, revenue),
+  ADD KEY ix_metrics_date_cover (date, campaign_id, impressions, clicks, conversions, spend, revenue);
+
+-- sidebar filters and the platform/region/objective GROUP BYs
+ALTER TABLE campaigns
+  ADD KEY ix_campaigns_platform_region (platform_id, region, objective);
+
+ANALYZE TABLE metrics, campaigns;
@@ -0,0 +1,11 @@
+-- AdWise360 migration 001 (SQLite stand-in): same keys as the MySQL version
+
+DELETE FROM metrics
+WHERE metric_id NOT IN (SELECT MAX(metric_id) FROM metrics GROUP BY campaign_id, date);
+
+CREATE UNIQUE INDEX uq_metrics_campaign_date ON metrics (campaign_id, date);
+CREATE INDEX ix_metrics_campaign_cover ON metrics (campaign_id, date, impressions, clicks, conversions, spend, revenue);
+CREATE INDEX ix_metrics_date_cover ON metrics (date, campaign_id, impressions, clicks, conversions, spend, revenue);
+CREATE INDEX ix_campaigns_platform_region ON campaigns (platform_id, region, objective);
+
+ANALYZE;
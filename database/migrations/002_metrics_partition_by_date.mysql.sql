@@ -0,0 +1,32 @@
+/*
+AdWise360 migration 002: range-partition metrics by date (one partition per year)
+MySQL requirements:
+- partitioned InnoDB tables cannot have foreign keys, so metrics_ibfk_1
+  (metrics.campaign_id -> campaigns) is dropped; the loaders only write
+  campaign_ids that exist in campaigns
+- every unique key must contain the partitioning column, so the primary
+  key becomes (metric_id, date); uq_metrics_campaign_date already has date
+Add next year's partition before it starts:
+  ALTER TABLE metrics REORGANIZE PARTITION pmax INTO
+    (PARTITION p2028 VALUES LESS THAN ('2029-01-01'), PARTITION pmax VALUES LESS THAN (MAXVALUE));
+*/
+
+ALTER TABLE metrics DROP FOREIGN KEY metrics_ibfk_1;
+
+ALTER TABLE metrics
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (metric_id, date);
+
+ALTER TABLE metrics
+PARTITION BY RANGE COLUMNS (date) (
+  PARTITION p2019 VALUES LESS THAN ('2020-01-01'),
+  PARTITION p2020 VALUES LESS THAN ('2021-01-01'),
+  PARTITION p2021 VALUES LESS THAN ('2022-01-01'),
+  PARTITION p2022 VALUES LESS THAN ('2023-01-01'),
+  PARTITION p2023 VALUES LESS THAN ('2024-01-01'),
+  PARTITION p2024 VALUES LESS THAN ('2025-01-01'),
+  PARTITION p2025 VALUES LESS THAN ('2026-01-01'),
+  PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+  PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+  PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
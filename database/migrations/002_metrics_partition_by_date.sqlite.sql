@@ -0,0 +1,2 @@
+-- AdWise360 migration 002 (SQLite stand-in): SQLite has no table partitioning;
+-- date-range queries use ix_metrics_date_cover from 001 instead. Recorded as applied.
@@ -0,0 +1,14 @@
+/*
+AdWise360 migration 003: predictions.predicted_roi
+- the ROI predicted by the model, unclipped; probability_score and
+  performace_category are not written by the loaders (no model produces them)
+- rows loaded before this migration held the ROI clipped into
+  probability_score with a High / Medium / Low label: move the value and
+  clear both columns
+*/
+
+ALTER TABLE predictions ADD COLUMN predicted_roi DOUBLE NULL AFTER probability_score;
+
+UPDATE predictions
+SET predicted_roi = probability_score, probability_score = NULL, performace_category = NULL
+WHERE performace_category IN ('High', 'Medium', 'Low');
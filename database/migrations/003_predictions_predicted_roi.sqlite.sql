@@ -0,0 +1,7 @@
+-- AdWise360 migration 003 (SQLite stand-in): same column and data fix as the MySQL version
+
+ALTER TABLE predictions ADD COLUMN predicted_roi REAL;
+
+UPDATE predictions
+SET predicted_roi = probability_score, probability_score = NULL, performace_category = NULL
+WHERE performace_category IN ('High', 'Medium', 'Low');
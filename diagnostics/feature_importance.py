@@ -1,4 +1,3 @@
-import joblib
 import pandas as pd
 import os
 import sys
@@ -10,26 +9,19 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 MODEL_PATH = "ml_models/rf_tuned.pkl"
-FEATURES_CSV = "database/ml_campaign_features.csv"
 
 if not os.path.exists(MODEL_PATH):
     raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Train model first.")
 
-# Load model
-model = joblib.load(MODEL_PATH)
+from ml.forest_artifact import load_model
+from ml.features import feature_names_for
 
-# Try to get feature names from the model (sklearn exposes .feature_names_in_ for most estimators)
-if hasattr(model, "feature_names_in_"):
-    feature_names = list(model.feature_names_in_)
-else:
-    # fallback: load features CSV and infer numeric cols used for training (drop id/label cols)
-    if not os.path.exists(FEATURES_CSV):
-        raise FileNotFoundError(f"Features CSV not found at {FEATURES_CSV}. Regenerate features first.")
-    df = pd.read_csv(FEATURES_CSV)
-    # Heuristics: drop obvious non-feature columns
-    drop_cols = {'campaign_id','campaign_name','platform_id','objective','region','avg_roi','predicted_roi'}
-    # preserve order
-    feature_names = [c for c in df.columns if c not in drop_cols]
+# Load model (compact exported forest when available, else the pickle)
+model = load_model(MODEL_PATH)
+
+# Feature names from the model itself; models fitted on bare arrays fall back
+# to the shared model input columns in ml/features.py (never guessed from the CSV)
+feature_names = [str(f) for f in feature_names_for(model)]
 
 # Get importances (works for sklearn tree-based models)
 if hasattr(model, "feature_importances_"):
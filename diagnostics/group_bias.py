@@ -1,16 +1,15 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-df = pd.read_csv("database/predictions_output.csv")
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
-df['abs_error'] = (df['predicted_roi'] - df['avg_roi']).abs()
-df['pct_error'] = df['abs_error'] / df['avg_roi'].replace(0, 1) * 100
+from diagnostics.pipeline import load_predictions, compute_errors, group_bias
 
-grouped = df.groupby('platform_id').agg(
-    actual_mean=('avg_roi','mean'),
-    predicted_mean=('predicted_roi','mean'),
-    mae=('abs_error','mean'),
-    median_pct_err=('pct_error','median')
-).reset_index()
+df = compute_errors(load_predictions())
+grouped = group_bias(df)
 
-print("\n===== PLATFORM-WISE BIAS =====")
-print(grouped.to_string(index=False))
+for key, g in grouped.groupby('group', sort=False):
+    print(f"\n===== {key.upper()}-WISE BIAS =====")
+    print(g.drop(columns='group').rename(columns={'value': key}).to_string(index=False))
@@ -0,0 +1,216 @@
+"""
+Permutation and grouped-permutation importance for the ROI model.
+
+Scores are measured on held-out rows: the saved model's configuration is
+refit on each training split of the eval-harness folds (ml/eval_harness.py)
+and its held-out split is permuted, then the folds are averaged. Importance
+on the rows a forest was trained on overstates what it memorised;
+--training-rows scores the saved model on its own training rows instead,
+and the output says so. Within a fold the baseline prediction is computed
+once; every (feature or group, repeat) permutation is scored in a process
+pool whose workers load the model and the validation matrix once. Results
+are cached under diagnostics/output/importance_cache/ keyed by model
+version + data hash + settings, so re-running is a file read.
+
+    python diagnostics/permutation_importance.py --repeats 10 --workers 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ml.features import model_version, feature_names_for
+from ml.eval_harness import data_hash, materialize_folds
+
+MODEL_PATH = PROJECT_ROOT / "ml_models" / "rf_tuned.pkl"
+FEATURES_CSV = PROJECT_ROOT / "database" / "ml_campaign_features.csv"
+OUTPUT_DIR = PROJECT_ROOT / "diagnostics" / "output"
+CACHE_DIR = OUTPUT_DIR / "importance_cache"
+
+# features that carry the same signal are permuted together for grouped importance
+FEATURE_GROUPS = {
+    "volume": ["total_impressions", "total_clicks", "total_conversions"],
+    "spend": ["total_spend", "log_spend", "clicks_per_rupee", "budget_utilization"],
+    "revenue": ["total_revenue", "log_revenue", "revenue_per_click"],
+    "profit": ["profit", "log_profit"],
+    "rates": ["avg_ctr", "conv_rate", "conversions_per_click"],
+    "duration": ["days_active"],
+}
+
+_WORKER = {}
+
+
+def _mae(y, pred):
+    return float(np.mean(np.abs(y - pred)))
+
+
+def _init_worker(model_path, X, y, feature_names):
+    from ml.forest_artifact import load_model
+    model = load_model(model_path)
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1   # the pool is the parallelism
+    _WORKER.update(model=model, X=X.copy(), y=y, feature_names=feature_names)
+
+
+def _predict(model, X, feature_names):
+    return model.predict(pd.DataFrame(X, columns=feature_names, copy=False))
+
+
+def _score_permutation(job):
+    """Worker: permute the given columns in place, score, then restore them."""
+    name, col_idx, repeat, seed = job
+    X, y, model = _WORKER["X"], _WORKER["y"], _WORKER["model"]
+    rng = np.random.default_rng([seed, repeat, *col_idx])
+    saved = X[:, col_idx].copy()
+    # one row permutation shared by a group keeps the grouped columns' joint distribution
+    X[:, col_idx] = saved[rng.permutation(len(X))]
+    try:
+        score = _mae(y, _predict(model, X, _WORKER["feature_names"]))
+    finally:
+        X[:, col_idx] = saved
+    return name, repeat, score
+
+
+def permutation_importance(model_path, X, y, groups=None, repeats=5, seed=42, workers=None):
+    """
+    MAE increase when each feature (and each group in `groups`) is permuted.
+    Returns a DataFrame with kind, name, importance_mean/std and baseline_mae.
+    """
+    from ml.forest_artifact import load_model
+    feature_names = list(X.columns)
+    Xa = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+    ya = y.to_numpy(dtype=np.float64)
+
+    # baseline prediction once, in the parent
+    model = load_model(model_path)
+    baseline = _mae(ya, _predict(model, Xa, feature_names))
+
+    targets = [("feature", f, [feature_names.index(f)]) for f in feature_names]
+    for g, cols in (groups or {}).items():
+        idx = [feature_names.index(c) for c in cols if c in feature_names]
+        if len(idx) > 1:
+            targets.append(("group", g, idx))
+    jobs = [(name, idx, r, seed) for _, name, idx in targets for r in range(repeats)]
+
+    scores = {}
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(model_path), Xa, ya, feature_names)) as pool:
+        for name, _, score in pool.map(_score_permutation, jobs, chunksize=max(1, len(jobs) // (workers * 4))):
+            scores.setdefault(name, []).append(score - baseline)
+
+    rows = []
+    for kind, name, idx in targets:
+        s = np.asarray(scores[name])
+        rows.append({"kind": kind, "name": name, "features": ",".join(feature_names[i] for i in idx),
+                     "importance_mean": float(s.mean()), "importance_std": float(s.std()),
+                     "repeats": repeats, "baseline_mae": baseline})
+    out = pd.DataFrame(rows)
+    return out.sort_values(["kind", "importance_mean"], ascending=[True, False]).reset_index(drop=True)
+
+
+def heldout_permutation_importance(model_path, X, y, groups=None, repeats=5, seed=42, workers=None, n_splits=5):
+    """
+    permutation_importance on held-out rows: a clone of the saved estimator is
+    fit on each fold's training rows and scored by permuting its test rows.
+    importance_mean / baseline_mae are fold averages; importance_std is the
+    spread of the fold means.
+    """
+    import joblib
+    from sklearn.base import clone
+    n_splits = max(2, min(n_splits, len(X)))
+    fold_dir = materialize_folds(X, y, n_splits)
+    base = joblib.load(model_path)
+    per_fold = []
+    with tempfile.TemporaryDirectory(prefix="adwise_importance_") as tmp:
+        for fold in range(n_splits):
+            train_idx = np.load(fold_dir / f"train_{fold}.npy")
+            test_idx = np.load(fold_dir / f"test_{fold}.npy")
+            model = clone(base)
+            model.fit(X.iloc[train_idx], y.iloc[train_idx])
+            fold_path = Path(tmp) / f"fold_{fold}.pkl"
+            joblib.dump(model, fold_path)
+            per_fold.append(permutation_importance(fold_path, X.iloc[test_idx], y.iloc[test_idx],
+                                                   groups, repeats, seed, workers))
+    folds = pd.concat(per_fold, ignore_index=True)
+    out = folds.groupby(["kind", "name", "features"], as_index=False).agg(
+        importance_mean=("importance_mean", "mean"), importance_std=("importance_mean", "std"),
+        repeats=("repeats", "first"), baseline_mae=("baseline_mae", "mean"))
+    out["folds"] = n_splits
+    return out.sort_values(["kind", "importance_mean"], ascending=[True, False]).reset_index(drop=True)
+
+
+def cached_permutation_importance(model_path=MODEL_PATH, features_csv=FEATURES_CSV, repeats=5,
+                                  seed=42, workers=None, max_rows=None, refresh=False,
+                                  training_rows=False, n_splits=5):
+    """
+    Held-out (or, with training_rows=True, training-set) permutation importance,
+    cached by model version + data hash + settings. Returns (result, cache hit).
+    """
+    from ml.forest_artifact import load_model
+    df = pd.read_csv(features_csv)
+    feature_names = [str(f) for f in feature_names_for(load_model(model_path))]
+    X = df[feature_names].astype(np.float64)
+    y = df["avg_roi"].astype(np.float64)
+    if max_rows and len(X) > max_rows:
+        X = X.sample(max_rows, random_state=seed)
+        y = y.loc[X.index]
+
+    scope = "train" if training_rows else f"k{n_splits}"
+    key = f"{model_version(model_path)}-{data_hash(X, y)}-r{repeats}-s{seed}-{scope}"
+    path = CACHE_DIR / f"{key}.json"
+    if path.exists() and not refresh:
+        return pd.read_json(path, orient="records"), True
+
+    if training_rows:
+        result = permutation_importance(model_path, X, y, FEATURE_GROUPS, repeats, seed, workers)
+    else:
+        result = heldout_permutation_importance(model_path, X, y, FEATURE_GROUPS, repeats, seed, workers, n_splits)
+    result["scored_on"] = "training rows" if training_rows else "held-out folds"
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    result.to_json(tmp, orient="records")
+    tmp.replace(path)
+    return result, False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, cached permutation / grouped importance.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=0, help="processes (0 = all cores)")
+    parser.add_argument("--max-rows", type=int, default=0, help="subsample the validation set (0 = all rows)")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cache")
+    parser.add_argument("--cv", type=int, default=5, help="folds for the held-out scores")
+    parser.add_argument("--training-rows", action="store_true",
+                        help="score the saved model on the rows it was trained on (overstates memorised features)")
+    args = parser.parse_args()
+
+    if not MODEL_PATH.exists():
+        raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Train model first.")
+    t0 = time.perf_counter()
+    result, hit = cached_permutation_importance(repeats=args.repeats, workers=args.workers or None,
+                                                max_rows=args.max_rows or None, refresh=args.refresh,
+                                                training_rows=args.training_rows, n_splits=args.cv)
+    scope = ("TRAINING ROWS: overstates features the forest memorised" if args.training_rows
+             else f"held-out rows, {args.cv}-fold refits")
+    print(f"\n===== PERMUTATION IMPORTANCE (MAE increase on {scope}; {'cached' if hit else 'computed'} "
+          f"in {time.perf_counter() - t0:.2f}s) =====")
+    print(result.drop(columns=["features", "scored_on"]).to_string(index=False))
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    result.to_csv(OUTPUT_DIR / "permutation_importance.csv", index=False)
+    print(f"\nSaved to {OUTPUT_DIR / 'permutation_importance.csv'}")
+
+
+if __name__ == "__main__":
+    main()
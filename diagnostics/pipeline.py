@@ -0,0 +1,155 @@
+"""
+Prediction diagnostics in one pass over predictions_output.csv.
+
+Loads only the columns it needs, computes abs/pct error once as NumPy arrays,
+aggregates per-group bias for every group key from those arrays, and renders
+the predicted-vs-actual plot headlessly (Agg) to a PNG. Results are written
+to diagnostics/output/ so the run can follow every scoring job.
+
+    python diagnostics/pipeline.py
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PREDICTIONS_CSV = PROJECT_ROOT / "database" / "predictions_output.csv"
+OUTPUT_DIR = PROJECT_ROOT / "diagnostics" / "output"
+
+GROUP_KEYS = ["platform_id", "region", "objective"]
+ID_COLUMNS = ["campaign_id", "campaign_name"]
+# above this many points the plot switches from a scatter to a hexbin density
+SCATTER_LIMIT = 50_000
+
+
+def load_predictions(path=PREDICTIONS_CSV, group_keys=GROUP_KEYS):
+    """Read just the id, group, actual and predicted columns."""
+    wanted = set(ID_COLUMNS + list(group_keys) + ["avg_roi", "predicted_roi"])
+    dtypes = {k: "category" for k in group_keys}
+    return pd.read_csv(path, usecols=lambda c: c in wanted, dtype=dtypes)
+
+
+def compute_errors(df):
+    """Add abs_error and pct_error (zero actual ROI is treated as 1, as before)."""
+    actual = df["avg_roi"].to_numpy(dtype=np.float64)
+    predicted = df["predicted_roi"].to_numpy(dtype=np.float64)
+    abs_error = np.abs(predicted - actual)
+    denom = np.where(actual == 0, 1.0, actual)
+    out = df.assign(abs_error=abs_error, pct_error=abs_error / denom * 100)
+    return out
+
+
+def error_summary(df):
+    return {
+        "rows": int(len(df)),
+        "mae": float(df["abs_error"].mean()),
+        "median_abs_error": float(df["abs_error"].median()),
+        "mean_pct_error": float(df["pct_error"].mean()),
+        "median_pct_error": float(df["pct_error"].median()),
+    }
+
+
+def group_bias(df, group_keys=GROUP_KEYS):
+    """One row per (group key, group value) with actual/predicted means, MAE and median % error."""
+    frames = []
+    for key in group_keys:
+        if key not in df.columns:
+            continue
+        g = df.groupby(key, observed=True, sort=True).agg(
+            rows=("avg_roi", "size"),
+            actual_mean=("avg_roi", "mean"),
+            predicted_mean=("predicted_roi", "mean"),
+            mae=("abs_error", "mean"),
+            median_pct_err=("pct_error", "median"),
+        )
+        g["bias"] = g["predicted_mean"] - g["actual_mean"]
+        frames.append(g.rename_axis("value").reset_index().assign(group=key))
+    if not frames:
+        return pd.DataFrame(columns=["group", "value", "rows", "actual_mean", "predicted_mean",
+                                     "mae", "median_pct_err", "bias"])
+    out = pd.concat(frames, ignore_index=True)
+    out["value"] = out["value"].astype(str)
+    return out[["group", "value"] + [c for c in out.columns if c not in ("group", "value")]]
+
+
+def worst_predictions(df, n=10):
+    cols = [c for c in ID_COLUMNS + ["avg_roi", "predicted_roi", "abs_error", "pct_error"] if c in df.columns]
+    return df.nlargest(n, "abs_error")[cols]
+
+
+def plot_pred_vs_actual(df, path):
+    """Headless predicted-vs-actual plot; hexbin density for large frames."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    actual = df["avg_roi"].to_numpy()
+    predicted = df["predicted_roi"].to_numpy()
+    fig, ax = plt.subplots(figsize=(8, 6))
+    if len(df) > SCATTER_LIMIT:
+        hb = ax.hexbin(actual, predicted, gridsize=80, bins="log", mincnt=1)
+        fig.colorbar(hb, ax=ax, label="campaigns (log)")
+    else:
+        ax.scatter(actual, predicted, alpha=0.6)
+    lo, hi = float(np.nanmin(actual)), float(np.nanmax(actual))
+    ax.plot([lo, hi], [lo, hi], 'r--', label="Perfect Prediction")
+    ax.set_xlabel("Actual ROI")
+    ax.set_ylabel("Predicted ROI")
+    ax.set_title("Predicted vs Actual ROI")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def run_diagnostics(df=None, path=PREDICTIONS_CSV, out_dir=OUTPUT_DIR, plot=True):
+    """
+    Compute everything from one load (or from an in-memory predictions frame)
+    and write summary.json, group_bias.csv, worst.csv and pred_vs_actual.png.
+    """
+    if df is None:
+        df = load_predictions(path)
+    df = compute_errors(df)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {
+        "summary": error_summary(df),
+        "group_bias": group_bias(df),
+        "worst": worst_predictions(df),
+    }
+    (out_dir / "summary.json").write_text(json.dumps(results["summary"], indent=2))
+    results["group_bias"].to_csv(out_dir / "group_bias.csv", index=False)
+    results["worst"].to_csv(out_dir / "worst.csv", index=False)
+    if plot and len(df):
+        results["plot"] = plot_pred_vs_actual(df, out_dir / "pred_vs_actual.png")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Error metrics, group bias and plots for predictions.")
+    parser.add_argument("--predictions", default=str(PREDICTIONS_CSV))
+    parser.add_argument("--out", default=str(OUTPUT_DIR))
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args()
+
+    results = run_diagnostics(path=args.predictions, out_dir=args.out, plot=not args.no_plot)
+    s = results["summary"]
+    print("\n===== BASIC ERROR METRICS =====")
+    print("Mean Absolute Error (ROI points):", s["mae"])
+    print("Median Absolute Error:", s["median_abs_error"])
+    print("Mean % Error:", s["mean_pct_error"])
+    print("Median % Error:", s["median_pct_error"])
+    print("\n===== GROUP BIAS =====")
+    print(results["group_bias"].to_string(index=False))
+    print(f"\nSaved diagnostics to {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,13 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
 
-df = pd.read_csv("database/predictions_output.csv")
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
-plt.figure(figsize=(8,6))
-plt.scatter(df['avg_roi'], df['predicted_roi'], alpha=0.6)
-plt.plot([df['avg_roi'].min(), df['avg_roi'].max()],
-         [df['avg_roi'].min(), df['avg_roi'].max()], 
-         'r--', label="Perfect Prediction")
+from diagnostics.pipeline import OUTPUT_DIR, load_predictions, plot_pred_vs_actual
 
-plt.xlabel("Actual ROI")
-plt.ylabel("Predicted ROI")
-plt.title("Predicted vs Actual ROI")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+# rendered headlessly to a file instead of a blocking plt.show()
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+path = plot_pred_vs_actual(load_predictions(), OUTPUT_DIR / "pred_vs_actual.png")
+print(f"Saved plot to {path}")
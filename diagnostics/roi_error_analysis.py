@@ -1,17 +1,20 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-df = pd.read_csv("database/predictions_output.csv")
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
-# Calculate errors
-df['abs_error'] = (df['predicted_roi'] - df['avg_roi']).abs()
-df['pct_error'] = df['abs_error'] / df['avg_roi'].replace(0, 1) * 100
+from diagnostics.pipeline import load_predictions, compute_errors, error_summary, worst_predictions
+
+df = compute_errors(load_predictions())
+s = error_summary(df)
 
 print("\n===== BASIC ERROR METRICS =====")
-print("Mean Absolute Error (ROI points):", df['abs_error'].mean())
-print("Median Absolute Error:", df['abs_error'].median())
-print("Mean % Error:", df['pct_error'].mean())
-print("Median % Error:", df['pct_error'].median())
+print("Mean Absolute Error (ROI points):", s['mae'])
+print("Median Absolute Error:", s['median_abs_error'])
+print("Mean % Error:", s['mean_pct_error'])
+print("Median % Error:", s['median_pct_error'])
 
 print("\n===== WORST 10 CAMPAIGNS =====")
-worst = df.sort_values('abs_error', ascending=False).head(5)
-print(worst[['campaign_id', 'campaign_name', 'avg_roi', 'predicted_roi', 'abs_error', 'pct_error']].to_string(index=False))
+print(worst_predictions(df, 10).to_string(index=False))
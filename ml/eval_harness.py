@@ -0,0 +1,217 @@
+"""
+Single-pass model evaluation on shared, memory-mapped CV folds.
+
+The feature matrix, target and every fold's train/test indices are written
+once per data hash under ml_models/eval_folds/ as .npy files; each fit then
+np.load(mmap_mode='r')s them instead of re-splitting. Every (model, fold) fit
+runs single-threaded in one worker pool, so the pool size is the only source
+of parallelism; each fit reports its wall time and peak resident memory.
+
+    python -m ml.eval_harness --cv 5 --workers 4
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import tempfile
+import argparse
+import resource
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ml.features import MODEL_INPUT_COLS
+
+FEATURES_CSV = PROJECT_ROOT / "database" / "ml_campaign_features.csv"
+FOLDS_DIR = PROJECT_ROOT / "ml_models" / "eval_folds"
+REPORT_CSV = PROJECT_ROOT / "ml_models" / "eval_report.csv"
+TUNED_PATH = PROJECT_ROOT / "ml_models" / "rf_tuned.pkl"
+
+# the untuned configuration train_model.py ships
+BASELINE_PARAMS = dict(n_estimators=300, max_depth=12, min_samples_split=4, min_samples_leaf=2, random_state=42)
+
+
+def load_xy(path=FEATURES_CSV):
+    df = pd.read_csv(path)
+    # same feature list (and order) train_model / generate_predictions use
+    X = df[[c for c in MODEL_INPUT_COLS if c in df.columns]].astype(np.float64)
+    y = df['avg_roi'].astype(np.float64)
+    return X, y
+
+
+def data_hash(X, y):
+    """Content hash of the training data (values + column order)."""
+    h = hashlib.sha256()
+    h.update(",".join(X.columns).encode())
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    h.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def materialize_folds(X, y, n_splits=5, root=FOLDS_DIR):
+    """
+    Write X, y and the KFold indices to root/<data hash>-k<n_splits>/ unless
+    they are already there; returns that directory.
+    """
+    fold_dir = Path(root) / f"{data_hash(X, y)}-k{n_splits}"
+    if (fold_dir / f"test_{n_splits - 1}.npy").exists():
+        return fold_dir
+    # partial set from before folds were written atomically
+    shutil.rmtree(fold_dir, ignore_errors=True)
+    # written under a temporary name and renamed, so a crash never leaves a
+    # partial fold set behind for later runs to reuse
+    fold_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{fold_dir.name}-", dir=fold_dir.parent))
+    try:
+        Xa = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+        np.save(tmp_dir / "X.npy", Xa)
+        np.save(tmp_dir / "y.npy", y.to_numpy(dtype=np.float64))
+        # unshuffled, same splits cross_val_score(cv=n_splits) used
+        for i, (train_idx, test_idx) in enumerate(KFold(n_splits=n_splits).split(Xa)):
+            np.save(tmp_dir / f"train_{i}.npy", train_idx.astype(np.int64))
+            np.save(tmp_dir / f"test_{i}.npy", test_idx.astype(np.int64))
+        os.rename(tmp_dir, fold_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # another process finished the same folds first
+        if not fold_dir.is_dir():
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return fold_dir
+
+
+def _status_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak():
+    """Reset the kernel's RSS high-water mark (Linux); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    peak = _status_mb("VmHWM")
+    # ru_maxrss (KiB on Linux) never resets, so without clear_refs this is an upper bound
+    return peak if peak is not None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _fit_fold(job):
+    """Worker: fit one model on one memory-mapped fold."""
+    fold_dir, fold, name, estimator = job
+    _reset_peak()
+    X = np.load(fold_dir / "X.npy", mmap_mode="r")
+    y = np.load(fold_dir / "y.npy", mmap_mode="r")
+    train_idx = np.load(fold_dir / f"train_{fold}.npy", mmap_mode="r")
+    test_idx = np.load(fold_dir / f"test_{fold}.npy", mmap_mode="r")
+
+    t0 = time.perf_counter()
+    estimator.fit(X[train_idx], y[train_idx])
+    fit_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    preds = estimator.predict(X[test_idx])
+    predict_s = time.perf_counter() - t0
+    y_test = y[test_idx]
+    return {
+        "model": name, "fold": fold,
+        "mae": float(mean_absolute_error(y_test, preds)),
+        "r2": float(r2_score(y_test, preds)) if len(y_test) > 1 else float("nan"),
+        "fit_s": fit_s, "predict_s": predict_s,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _single_threaded(estimator):
+    est = clone(estimator)
+    if "n_jobs" in est.get_params():
+        est.set_params(n_jobs=1)
+    return est
+
+
+def evaluate(models, X, y, n_splits=5, workers=None):
+    """
+    Cross-validate every estimator in `models` ({name: unfitted estimator})
+    on the same folds. Returns (per-model summary DataFrame, per-fold DataFrame).
+    """
+    fold_dir = materialize_folds(X, y, n_splits)
+    jobs = [(fold_dir, fold, name, _single_threaded(est))
+            for name, est in models.items() for fold in range(n_splits)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_fit_fold, jobs))
+    total_wall = time.perf_counter() - t0
+
+    folds = pd.DataFrame(results)
+    summary = folds.groupby("model", sort=False).agg(
+        cv_mae=("mae", "mean"), cv_mae_std=("mae", "std"), cv_r2=("r2", "mean"),
+        fit_s=("fit_s", "sum"), predict_s=("predict_s", "sum"), peak_rss_mb=("peak_rss_mb", "max"),
+    ).reset_index()
+    summary["folds"] = n_splits
+    summary["rows"] = len(X)
+    summary["data_hash"] = fold_dir.name.split("-")[0]
+    summary.attrs["wall_s"] = total_wall
+    return summary, folds
+
+
+def write_report(summary, path=REPORT_CSV):
+    """Append the summary to the running report so runs across refreshes compare."""
+    out = summary.assign(run_at=pd.Timestamp.now().isoformat(timespec="seconds"))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(path, mode="a", header=not path.exists(), index=False)
+
+
+def default_models():
+    """Baseline config from train_model.py plus the saved tuned model's params."""
+    from sklearn.ensemble import RandomForestRegressor
+    models = {"rf_baseline": RandomForestRegressor(**BASELINE_PARAMS)}
+    if TUNED_PATH.exists():
+        import joblib
+        models["rf_tuned"] = clone(joblib.load(TUNED_PATH))
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validate candidate models on shared folds.")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=0, help="processes (0 = all cores)")
+    parser.add_argument("--no-report", action="store_true", help="do not append to ml_models/eval_report.csv")
+    args = parser.parse_args()
+
+    X, y = load_xy()
+    summary, _ = evaluate(default_models(), X, y, n_splits=args.cv, workers=args.workers or None)
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        print(summary.drop(columns=["data_hash"]).to_string(index=False, float_format="%.4f"))
+    print(f"wall time: {summary.attrs['wall_s']:.2f}s over {len(summary) * args.cv} fits")
+    if not args.no_report:
+        write_report(summary)
+        print(f"Appended to {REPORT_CSV.relative_to(PROJECT_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
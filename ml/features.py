@@ -0,0 +1,30 @@
+"""
+Model inputs shared by training, scoring, evaluation and the prediction service.
+
+Kept free of heavy imports so that any module can use the column list or the
+model version without pulling in the prediction stack.
+"""
+import hashlib
+
+# feature list (and order) the model is trained and scored on
+MODEL_INPUT_COLS = [
+    'total_impressions','total_clicks','total_conversions','total_spend','total_revenue',
+    'avg_ctr','days_active','conv_rate','profit','clicks_per_rupee','revenue_per_click',
+    'conversions_per_click','budget_utilization','log_revenue','log_spend','log_profit'
+]
+
+
+def model_version(path):
+    """Short content hash of the model file, reported with every prediction."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+def feature_names_for(model):
+    """Input columns of a fitted model, falling back to MODEL_INPUT_COLS."""
+    if hasattr(model, "feature_names_in_"):
+        return list(model.feature_names_in_)
+    return MODEL_INPUT_COLS[:getattr(model, "n_features_in_", len(MODEL_INPUT_COLS))]
@@ -0,0 +1,191 @@
+"""
+Compact, memory-mappable export of the RandomForest in ml_models/.
+
+The forest's node arrays are concatenated across trees and written as plain
+.npy files, so loading is an np.load(mmap_mode='r') per array: no unpickling,
+and worker processes reading the same files share the OS page cache.
+CompactForest.predict walks all trees level by level with NumPy and returns
+the same values as RandomForestRegressor.predict.
+
+    python -m ml.forest_artifact export            # rf_tuned.pkl -> rf_tuned_forest/
+    python -m ml.forest_artifact verify            # compare with sklearn + load times
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ml.features import model_version
+
+MODEL_PATH = PROJECT_ROOT / "ml_models" / "rf_tuned.pkl"
+META_PATH = PROJECT_ROOT / "ml_models" / "rf_tuned_meta.json"
+ARTIFACT_DIR = PROJECT_ROOT / "ml_models" / "rf_tuned_forest"
+FEATURES_CSV = PROJECT_ROOT / "database" / "ml_campaign_features.csv"
+
+_ARRAYS = ["children_left", "children_right", "feature", "threshold", "value", "roots", "feature_importances"]
+
+
+def _feature_names(model):
+    if hasattr(model, "feature_names_in_"):
+        return [str(f) for f in model.feature_names_in_]
+    # older pickles: fall back to the documented feature order
+    meta = json.loads(META_PATH.read_text())
+    return meta["feature_list"][:model.n_features_in_]
+
+
+def export_forest(model, out_dir=ARTIFACT_DIR, source_path=None):
+    """Write the node arrays of a fitted RandomForestRegressor to out_dir."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    left, right, feat, thr, val, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in model.estimators_:
+        t = est.tree_
+        if t.value.shape[1] != 1:
+            raise ValueError("only single-output regression forests are supported")
+        cl = t.children_left.astype(np.int32)
+        cr = t.children_right.astype(np.int32)
+        # re-base child ids into the concatenated arrays; leaves stay -1
+        left.append(np.where(cl >= 0, cl + offset, -1))
+        right.append(np.where(cr >= 0, cr + offset, -1))
+        feat.append(t.feature.astype(np.int32))
+        thr.append(t.threshold.astype(np.float64))
+        val.append(t.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        offset += t.node_count
+        max_depth = max(max_depth, int(t.max_depth))
+
+    arrays = {
+        "children_left": np.concatenate(left).astype(np.int32),
+        "children_right": np.concatenate(right).astype(np.int32),
+        "feature": np.concatenate(feat),
+        "threshold": np.concatenate(thr),
+        "value": np.concatenate(val),
+        "roots": np.asarray(roots, dtype=np.int64),
+        "feature_importances": np.asarray(model.feature_importances_, dtype=np.float64),
+    }
+    for name, arr in arrays.items():
+        np.save(out_dir / f"{name}.npy", arr)
+
+    manifest = {
+        "model_name": type(model).__name__,
+        "n_trees": len(model.estimators_),
+        "n_nodes": int(offset),
+        "max_depth": max_depth,
+        "n_features": int(model.n_features_in_),
+        "feature_list": _feature_names(model),
+        "source_version": model_version(source_path) if source_path else None,
+    }
+    (out_dir / "forest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+class CompactForest:
+    """NumPy batch predictor over an exported forest (arrays may be memory-mapped)."""
+
+    def __init__(self, arrays, manifest):
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.feature_importances_ = np.asarray(arrays["feature_importances"])
+        self.manifest = manifest
+        self.feature_names_in_ = np.asarray(manifest["feature_list"], dtype=object)
+        self.n_features_in_ = manifest["n_features"]
+        self.max_depth = manifest["max_depth"]
+
+    @classmethod
+    def load(cls, path=ARTIFACT_DIR, mmap=True):
+        path = Path(path)
+        manifest = json.loads((path / "forest.json").read_text())
+        mode = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mode) for name in _ARRAYS}
+        return cls(arrays, manifest)
+
+    def _as_matrix(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[list(self.feature_names_in_)]
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return np.asarray(X, dtype=np.float32)
+
+    def predict(self, X, batch_size=8192):
+        X = self._as_matrix(X)
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), batch_size):
+            out[start:start + batch_size] = self._predict_block(X[start:start + batch_size])
+        return out
+
+    def _predict_block(self, X):
+        n = len(X)
+        rows = np.arange(n)[None, :]
+        nodes = np.repeat(np.asarray(self.roots)[:, None], n, axis=1)   # (n_trees, n)
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            internal = left >= 0
+            if not internal.any():
+                break
+            f = np.where(internal, self.feature[nodes], 0)
+            go_left = X[rows, f] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+        # sequential sum over trees, then divide: same order as sklearn's accumulation
+        return self.value[nodes].sum(axis=0) / len(self.roots)
+
+
+def load_model(model_path=MODEL_PATH, artifact_dir=ARTIFACT_DIR):
+    """
+    CompactForest when an export of this exact pickle exists, otherwise the
+    joblib-loaded estimator.
+    """
+    manifest_path = Path(artifact_dir) / "forest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("source_version") == model_version(model_path):
+            return CompactForest.load(artifact_dir)
+    import joblib
+    return joblib.load(model_path)
+
+
+def _verify(model_path, artifact_dir):
+    import joblib
+    t0 = time.perf_counter()
+    model = joblib.load(model_path)
+    t_joblib = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    forest = CompactForest.load(artifact_dir)
+    t_compact = time.perf_counter() - t0
+
+    X = pd.read_csv(FEATURES_CSV)[list(forest.feature_names_in_)]
+    ref = model.predict(X)
+    got = forest.predict(X)
+    print(f"joblib.load: {t_joblib * 1000:.1f} ms | CompactForest.load: {t_compact * 1000:.2f} ms")
+    print(f"max |sklearn - compact| = {np.abs(ref - got).max():.3e} over {len(X)} rows")
+    return np.allclose(ref, got, rtol=0, atol=1e-9)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export / verify the compact forest artifact.")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--out", default=str(ARTIFACT_DIR))
+    args = parser.parse_args()
+
+    if args.command == "export":
+        import joblib
+        manifest = export_forest(joblib.load(args.model), args.out, source_path=args.model)
+        print(f"Exported {manifest['n_trees']} trees / {manifest['n_nodes']} nodes to {args.out}")
+    else:
+        ok = _verify(args.model, args.out)
+        print("OK" if ok else "MISMATCH")
+        sys.exit(0 if ok else 1)
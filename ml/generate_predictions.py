@@ -1,33 +1,88 @@
-import joblib
+import argparse
 import os
 import pandas as pd
 from app.data_loader import create_campaign_features
+from ml.features import MODEL_INPUT_COLS, model_version
+from ml.forest_artifact import load_model
 
-# 1. load raw transformed df from database/csv fallback
-# we rely on app/etl.get_cached_data for the UI; here read CSV fallback
-raw = pd.read_csv('database/metrics.csv')
-campaigns = pd.read_csv('database/campaigns.csv')
-df = raw.merge(campaigns, on='campaign_id', how='left')
-
-# 2. build features
-features = create_campaign_features(df)
-
-# 3. load model
-model_path = 'ml_models/rf_tuned.pkl'
-if not os.path.exists(model_path):
-    raise FileNotFoundError('Model not found. Run ml/train_model.py first.')
-model = joblib.load(model_path)
-
-# 4. prepare model input
-cols = [c for c in [
-    'total_impressions','total_clicks','total_conversions','total_spend','total_revenue',
-    'avg_ctr','days_active','conv_rate','profit','clicks_per_rupee','revenue_per_click',
-    'conversions_per_click','budget_utilization','log_revenue','log_spend','log_profit'
-] if c in features.columns]
-X = features[cols]
-
-features['predicted_roi'] = model.predict(X)
-
-os.makedirs('database', exist_ok=True)
-features.to_csv('database/predictions_output.csv', index=False)
-print('Saved predictions to database/predictions_output.csv')
\ No newline at end of file
+MODEL_PATH = 'ml_models/rf_tuned.pkl'
+PREDICTIONS_CSV = 'database/predictions_output.csv'
+
+def fingerprint(features, cols):
+    """Hex hash of each campaign's model-input vector; equal hash = nothing to rescore."""
+    hashes = pd.util.hash_pandas_object(features[cols], index=False)
+    return hashes.map(lambda h: f"{h:016x}").to_numpy()
+
+def load_previous(path):
+    """Previous predictions keyed by campaign_id, or None when there are none to reuse."""
+    if not os.path.exists(path):
+        return None
+    # hex hashes and versions can be all digits; keep them as the strings that were written
+    prev = pd.read_csv(path, dtype={'feature_hash': str, 'model_version': str})
+    if not {'campaign_id', 'predicted_roi', 'feature_hash', 'model_version'}.issubset(prev.columns):
+        return None
+    return prev.drop_duplicates('campaign_id', keep='last').set_index('campaign_id')
+
+def main():
+    parser = argparse.ArgumentParser(description="Score campaigns whose features (or the model) changed.")
+    parser.add_argument('--full', action='store_true', help='rescore every campaign')
+    parser.add_argument('--no-diagnostics', action='store_true', help='skip diagnostics/pipeline.py after scoring')
+    parser.add_argument('--load-db', action='store_true', help='also upsert into the predictions table (app/bulk_load.py)')
+    args = parser.parse_args()
+
+    # 1. load raw transformed df from database/csv fallback
+    # we rely on app/etl.get_cached_data for the UI; here read CSV fallback
+    raw = pd.read_csv('database/metrics.csv')
+    campaigns = pd.read_csv('database/campaigns.csv')
+    df = raw.merge(campaigns, on='campaign_id', how='left')
+
+    # 2. build features
+    features = create_campaign_features(df)
+
+    # 3. prepare model input
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError('Model not found. Run ml/train_model.py first.')
+    cols = [c for c in MODEL_INPUT_COLS if c in features.columns]
+    version = model_version(MODEL_PATH)
+    features['feature_hash'] = fingerprint(features, cols)
+    features['model_version'] = version
+
+    # 4. reuse predictions whose feature hash and model version are unchanged
+    prev = None if args.full else load_previous(PREDICTIONS_CSV)
+    features['predicted_roi'] = float('nan')
+    if prev is not None:
+        old = prev.reindex(features['campaign_id'])
+        same = ((old['feature_hash'].to_numpy() == features['feature_hash'].to_numpy())
+                & (old['model_version'].to_numpy() == version))
+        features.loc[same, 'predicted_roi'] = old['predicted_roi'].to_numpy()[same]
+    stale = features['predicted_roi'].isna()
+
+    # 5. load the model only when something needs scoring
+    if stale.any():
+        # compact memory-mapped forest when exported (ml/forest_artifact.py), else the pickle
+        model = load_model(MODEL_PATH)
+        features.loc[stale, 'predicted_roi'] = model.predict(features.loc[stale, cols])
+    print(f'Rescored {int(stale.sum())} of {len(features)} campaigns (model {version})')
+
+    # predicted_roi stays right after the features; bookkeeping columns go last
+    out = features[[c for c in features.columns if c not in ('feature_hash', 'model_version')]
+                   + ['feature_hash', 'model_version']]
+    os.makedirs('database', exist_ok=True)
+    tmp = PREDICTIONS_CSV + '.tmp'
+    out.to_csv(tmp, index=False)
+    os.replace(tmp, PREDICTIONS_CSV)
+    print('Saved predictions to database/predictions_output.csv')
+
+    if args.load_db:
+        from app.bulk_load import load_predictions
+        from app.db_connection import get_db_connection
+        print(f'Loaded {load_predictions(get_db_connection(), out):,} rows into the predictions table')
+
+    # 6. error metrics / group bias / plot from the frame already in memory
+    if not args.no_diagnostics:
+        from diagnostics.pipeline import run_diagnostics
+        summary = run_diagnostics(out)['summary']
+        print(f"Diagnostics: MAE {summary['mae']:.4f} over {summary['rows']} campaigns -> diagnostics/output/")
+
+if __name__ == '__main__':
+    main()
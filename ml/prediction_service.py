@@ -0,0 +1,207 @@
+"""
+Long-lived local ROI scoring service.
+
+Loads ml_models/rf_tuned.pkl once and serves predictions over HTTP. Concurrent
+requests are micro-batched: the batcher thread waits up to --max-wait-ms for
+more rows (at most --max-batch) and scores them with a single model.predict.
+
+    python -m ml.prediction_service --port 8765
+
+    POST /predict  {"rows": [{"total_impressions": ..., ...}, ...]}
+                   -> {"predictions": [...], "model_version": "..."}
+    GET  /stats    request latency percentiles and batch sizes
+    GET  /health
+"""
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ml.features import model_version, feature_names_for
+
+MODEL_PATH = PROJECT_ROOT / "ml_models" / "rf_tuned.pkl"
+
+
+class MicroBatcher:
+    """Collects concurrent predict calls and scores them in one model.predict."""
+
+    def __init__(self, model, feature_names, max_batch=256, max_wait_ms=5.0):
+        self.model = model
+        self.feature_names = feature_names
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.latencies_ms = deque(maxlen=10_000)
+        self.batch_sizes = deque(maxlen=10_000)
+        self.requests = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def predict(self, X):
+        """Block until the rows of X (2-D float array) are scored; returns an array."""
+        job = {"X": X, "done": threading.Event(), "result": None, "error": None}
+        self._queue.put(job)
+        job["done"].wait()
+        if job["error"] is not None:
+            raise job["error"]
+        return job["result"]
+
+    def record(self, latency_ms):
+        with self._lock:
+            self.requests += 1
+            self.latencies_ms.append(latency_ms)
+
+    def stats(self):
+        with self._lock:
+            lat = np.array(self.latencies_ms, dtype=float)
+            sizes = np.array(self.batch_sizes, dtype=float)
+            requests = self.requests
+        out = {"requests": requests, "batches": int(len(sizes))}
+        if len(lat):
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            out.update(p50_ms=round(p50, 3), p95_ms=round(p95, 3), p99_ms=round(p99, 3),
+                       max_ms=round(float(lat.max()), 3))
+        if len(sizes):
+            out.update(mean_batch_rows=round(float(sizes.mean()), 2), max_batch_rows=int(sizes.max()))
+        return out
+
+    def _run(self):
+        while True:
+            jobs = [self._queue.get()]
+            rows = len(jobs[0]["X"])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                rows += len(job["X"])
+            self._score(jobs, rows)
+
+    def _score(self, jobs, rows):
+        try:
+            X = pd.DataFrame(np.vstack([j["X"] for j in jobs]), columns=self.feature_names)
+            preds = self.model.predict(X)
+        except Exception as e:
+            for j in jobs:
+                j["error"] = e
+                j["done"].set()
+            return
+        with self._lock:
+            self.batch_sizes.append(rows)
+        start = 0
+        for j in jobs:
+            n = len(j["X"])
+            j["result"] = preds[start:start + n]
+            start += n
+            j["done"].set()
+
+
+def make_handler(batcher, version):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "model_version": version})
+            elif self.path == "/stats":
+                self._send(200, batcher.stats())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "not found"})
+                return
+            t0 = time.perf_counter()
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                rows = json.loads(self.rfile.read(length) or b"{}").get("rows", [])
+                missing = sorted({f for r in rows for f in batcher.feature_names if f not in r})
+                if missing:
+                    self._send(400, {"error": "missing features", "features": missing})
+                    return
+                X = np.array([[float(r[f]) for f in batcher.feature_names] for r in rows], dtype=np.float64)
+                preds = batcher.predict(X.reshape(len(rows), len(batcher.feature_names))) if rows else []
+            except Exception as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(200, {"predictions": [float(p) for p in preds], "model_version": version})
+            batcher.record((time.perf_counter() - t0) * 1000)
+
+        def log_message(self, format, *args):
+            # per-request access logs would dominate at high request rates
+            pass
+
+    return PredictionHandler
+
+
+def create_server(host="127.0.0.1", port=8765, model_path=MODEL_PATH, max_batch=256, max_wait_ms=5.0):
+    """Load the model once and bind the HTTP server (port 0 picks a free port)."""
+    from ml.forest_artifact import load_model
+    model = load_model(model_path)
+    version = model_version(model_path)
+    batcher = MicroBatcher(model, feature_names_for(model), max_batch=max_batch, max_wait_ms=max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher, version))
+    server.daemon_threads = True
+    server.batcher = batcher
+    server.model_version = version
+    return server
+
+
+def serve(host="127.0.0.1", port=8765, model_path=MODEL_PATH, max_batch=256, max_wait_ms=5.0):
+    """Load the model once and serve until interrupted."""
+    server = create_server(host, port, model_path, max_batch, max_wait_ms)
+    print(f"Serving {Path(model_path).name} (version {server.model_version}) on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return server
+
+
+def predict_rows(rows, url="http://127.0.0.1:8765", timeout=30):
+    """Client helper: score a list of feature dicts (or a DataFrame) against a running service."""
+    if isinstance(rows, pd.DataFrame):
+        rows = rows.to_dict(orient="records")
+    body = json.dumps({"rows": rows}, default=float).encode("utf-8")
+    req = Request(url.rstrip("/") + "/predict", data=body, headers={"Content-Type": "application/json"})
+    with urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())["predictions"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve ROI predictions from a model loaded once.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--max-batch", type=int, default=256, help="max rows scored per model.predict")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="how long to wait for more rows")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.model, args.max_batch, args.max_wait_ms)
@@ -1,29 +1,222 @@
-import joblib, pandas as pd, os
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import RandomizedSearchCV
+"""
+Random-forest hyperparameter search with successive halving on n_estimators.
+
+Every (params, n_estimators, fold) fit is scored once and cached on disk under
+ml_models/tune_cache/<data hash>/, so a re-run on identical data (e.g. after an
+interrupted search) skips the fits that already finished. Any data change
+gives a new hash; the run then warm-starts instead: when the row count moved
+by at most --warm-max-change and the search settings are the same, the
+low rungs are skipped and halving resumes at the previous run's last
+contested rung with the candidates that reached it (tune_history.csv +
+tune_state.json), rescored on the new data. Fold fits run in a process pool
+with single-threaded forests (no nested n_jobs=-1 oversubscription).
+
+    python -m ml.tune_rf --candidates 30 --workers 4
+    python -m ml.tune_rf --cold      # full search even after a small data change
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
 import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import KFold, ParameterSampler
 
-df = pd.read_csv("database/ml_campaign_features.csv")
-# build feature list same as train_model used
-drop_cols = {'campaign_id','campaign_name','platform_id','objective','region','avg_roi','predicted_roi'}
-X = df[[c for c in df.columns if c not in drop_cols]]
-y = df['avg_roi']
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
+from ml.eval_harness import load_xy, data_hash
+
+MODEL_PATH = PROJECT_ROOT / "ml_models" / "rf_tuned.pkl"
+CACHE_DIR = PROJECT_ROOT / "ml_models" / "tune_cache"
+HISTORY_CSV = PROJECT_ROOT / "ml_models" / "tune_history.csv"
+STATE_JSON = PROJECT_ROOT / "ml_models" / "tune_state.json"
+
+
+# n_estimators is the halving resource, not a searched parameter.
+# 'auto' was removed from RandomForestRegressor; 1.0 (all features) is what it meant.
 param_dist = {
-    "n_estimators": [100,200,300,500],
     "max_depth": [6,8,12,16,None],
     "min_samples_split": [2,4,6,8],
     "min_samples_leaf": [1,2,4,6],
-    "max_features": ['auto','sqrt','log2']
+    "max_features": [1.0,'sqrt','log2']
 }
 
-rf = RandomForestRegressor(random_state=42, n_jobs=-1)
-rs = RandomizedSearchCV(rf, param_distributions=param_dist, n_iter=30, scoring='neg_mean_absolute_error', cv=4, verbose=2, random_state=42)
-rs.fit(X, y)
 
-print("Best params:", rs.best_params_)
-print("Best MAE (cv):", -rs.best_score_)
+def _cache_key(params, n_estimators, fold, n_splits, seed):
+    blob = json.dumps({"params": params, "n_estimators": n_estimators, "fold": fold,
+                       "n_splits": n_splits, "seed": seed}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:24]
+
+
+_WORKER_DATA = {}
+
+
+def _init_worker(X, y, folds):
+    """Ship the training data to each worker once instead of with every job."""
+    _WORKER_DATA.update(X=X, y=y, folds=folds)
+
+
+def _fit_fold(job):
+    """Worker: fit one single-threaded forest on one fold and return its MAE."""
+    fold, params, n_estimators, seed = job
+    X, y = _WORKER_DATA["X"], _WORKER_DATA["y"]
+    train_idx, test_idx = _WORKER_DATA["folds"][fold]
+    rf = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=1, **params)
+    rf.fit(X[train_idx], y[train_idx])
+    return float(mean_absolute_error(y[test_idx], rf.predict(X[test_idx])))
+
+
+class FoldCache:
+    """One small JSON file per (params, n_estimators, fold) result."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        p = self.root / f"{key}.json"
+        if p.exists():
+            try:
+                return json.loads(p.read_text())["mae"]
+            except Exception:
+                return None
+        return None
+
+    def put(self, key, mae, meta):
+        p = self.root / f"{key}.json"
+        tmp = p.with_suffix(".tmp")
+        tmp.write_text(json.dumps(dict(meta, mae=mae), default=str))
+        tmp.replace(p)
+
+
+def successive_halving(X, y, candidates, min_estimators=50, max_estimators=500, eta=3,
+                       n_splits=4, seed=42, workers=None, cache=None, resume=None):
+    """
+    Score candidates at min_estimators trees, keep the best 1/eta, multiply the
+    tree budget by eta, and repeat until max_estimators or one candidate is left.
+    resume=(n_estimators, candidate indices) starts at that rung instead.
+    Returns (best_params, best_n_estimators, best_mae, history DataFrame).
+    """
+    Xa = X.to_numpy(dtype=np.float64)
+    ya = y.to_numpy(dtype=np.float64)
+    folds = list(KFold(n_splits=n_splits).split(Xa))
+    workers = workers or os.cpu_count() or 1
+
+    history = []
+    alive, n_est = (list(resume[1]), resume[0]) if resume else (list(range(len(candidates))), min_estimators)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(Xa, ya, folds)) as pool:
+        while True:
+            scores = {}
+            pending = []
+            for ci in alive:
+                for fi in range(len(folds)):
+                    key = _cache_key(candidates[ci], n_est, fi, n_splits, seed)
+                    mae = cache.get(key) if cache else None
+                    if mae is None:
+                        pending.append((ci, fi, key))
+                    else:
+                        scores.setdefault(ci, []).append(mae)
+            jobs = [(fi, candidates[ci], n_est, seed) for ci, fi, _ in pending]
+            for (ci, fi, key), mae in zip(pending, pool.map(_fit_fold, jobs)):
+                scores.setdefault(ci, []).append(mae)
+                if cache:
+                    cache.put(key, mae, {"params": candidates[ci], "n_estimators": n_est, "fold": fi})
+
+            rung = sorted(((float(np.mean(scores[ci])), ci) for ci in alive))
+            for mae, ci in rung:
+                history.append(dict(candidates[ci], candidate=ci, n_estimators=n_est, cv_mae=mae))
+            print(f"n_estimators={n_est:<4} candidates={len(alive):<3} fits={len(pending):<4} "
+                  f"(cached {len(alive) * n_splits - len(pending)}) best MAE={rung[0][0]:.4f}")
+
+            if len(alive) == 1 or n_est >= max_estimators:
+                best_mae, best = rung[0]
+                return candidates[best], n_est, best_mae, pd.DataFrame(history)
+            alive = [ci for _, ci in rung[:max(1, len(alive) // eta)]]
+            n_est = min(n_est * eta, max_estimators)
+
+
+def warm_start(settings, rows, max_change, history_path=HISTORY_CSV, state_path=STATE_JSON):
+    """
+    (n_estimators, candidate indices) of the previous run's last rung with more
+    than one candidate, or None when there is no previous run with the same
+    settings, or the row count moved by more than max_change (a fraction).
+    """
+    try:
+        state = json.loads(Path(state_path).read_text())
+        history = pd.read_csv(history_path)
+    except (OSError, ValueError):
+        return None
+    if state.get("settings") != settings or "candidate" not in history.columns:
+        return None
+    if abs(rows - state["rows"]) > max_change * max(state["rows"], 1):
+        return None
+    rungs = history.groupby("n_estimators")["candidate"].apply(lambda c: sorted(set(c))).sort_index()
+    contested = [(int(n), [int(c) for c in cands]) for n, cands in rungs.items() if len(cands) > 1]
+    return contested[-1] if contested else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving RF tuning with a fold cache.")
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--min-estimators", type=int, default=50)
+    parser.add_argument("--max-estimators", type=int, default=500)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--cv", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=0, help="processes (0 = all cores)")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--cold", action="store_true", help="no warm start from the previous run")
+    parser.add_argument("--warm-max-change", type=float, default=0.1,
+                        help="largest relative row-count change that still warm-starts")
+    args = parser.parse_args()
+
+    X, y = load_xy()
+    dh = data_hash(X, y)
+    cache = None if args.no_cache else FoldCache(CACHE_DIR / dh)
+    candidates = list(ParameterSampler(param_dist, n_iter=args.candidates, random_state=42))
+    print(f"data hash {dh}: {len(X)} rows, {X.shape[1]} features, {len(candidates)} candidates")
+
+    # same settings => same candidate list and rungs as the previous run
+    settings = {"candidates": args.candidates, "min_estimators": args.min_estimators,
+                "max_estimators": args.max_estimators, "eta": args.eta, "cv": args.cv,
+                "features": list(X.columns)}
+    resume = None
+    if not args.cold:
+        state = json.loads(STATE_JSON.read_text()) if STATE_JSON.exists() else {}
+        # identical data: the fold cache already makes a full run cheap
+        if state.get("data_hash") != dh:
+            resume = warm_start(settings, len(X), args.warm_max_change)
+    if resume:
+        print(f"warm start: {len(resume[1])} candidates from the previous run at n_estimators={resume[0]}")
+
+    best_params, n_est, best_mae, history = successive_halving(
+        X, y, candidates, args.min_estimators, args.max_estimators, args.eta,
+        n_splits=args.cv, workers=args.workers or None, cache=cache, resume=resume)
+
+    print("Best params:", dict(best_params, n_estimators=n_est))
+    print("Best MAE (cv):", best_mae)
+
+    # final refit on all rows; this one may use every core
+    rf = RandomForestRegressor(n_estimators=n_est, random_state=42, n_jobs=-1, **best_params)
+    rf.fit(X, y)
+    os.makedirs(MODEL_PATH.parent, exist_ok=True)
+    joblib.dump(rf, MODEL_PATH)
+    if resume:
+        # keep the skipped low rungs so the next warm start sees the whole run
+        previous = pd.read_csv(HISTORY_CSV)
+        history = pd.concat([previous[previous["n_estimators"] < resume[0]], history], ignore_index=True)
+    history.to_csv(HISTORY_CSV, index=False)
+    STATE_JSON.write_text(json.dumps({"data_hash": dh, "rows": len(X), "settings": settings}, indent=2))
+    print(f"Saved tuned rf to {MODEL_PATH.relative_to(PROJECT_ROOT)}")
+
 
-os.makedirs("ml_models", exist_ok=True)
-joblib.dump(rs.best_estimator_, "ml_models/rf_tuned.pkl")
-print("Saved tuned rf to ml_models/rf_tuned.pkl")
+if __name__ == "__main__":
+    main()
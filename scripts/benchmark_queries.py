@@ -0,0 +1,198 @@
+import re
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Latency of database/adwise360_analysis_queries.sql (plus two date-range
+# queries the indexes target) on generated metrics at several row counts,
+# before and after database/migrations. Each size gets a fresh database
+# (a temp SQLite file by default, or a dedicated benchmark schema given with
+# --url, whose tables are dropped and recreated), so runs are repeatable;
+# results are appended to database/benchmarks/query_bench.csv.
+#
+#   python scripts/benchmark_queries.py --rows 1000000 10000000 100000000
+#   python scripts/benchmark_queries.py --url mysql+pymysql://user:pw@host/adwise_bench
+
+ANALYSIS_SQL = PROJECT_ROOT / "database" / "adwise360_analysis_queries.sql"
+OUT_CSV = PROJECT_ROOT / "database" / "benchmarks" / "query_bench.csv"
+DAYS = 2000
+START = "2020-01-01"
+
+# bound per database size from the loaded data (extra_params), so the ranges and
+# the campaign always exist whatever START / DAYS / rows generate
+EXTRA_QUERIES = {
+    "Last 30 days by platform": """
+        SELECT c.platform_id, SUM(m.spend) AS spend, SUM(m.revenue) AS revenue
+        FROM metrics m JOIN campaigns c ON c.campaign_id = m.campaign_id
+        WHERE m.date >= :since
+        GROUP BY c.platform_id""",
+    "One campaign, one quarter": """
+        SELECT m.date, m.impressions, m.clicks, m.spend, m.revenue
+        FROM metrics m
+        WHERE m.campaign_id = :campaign_id AND m.date BETWEEN :quarter_start AND :quarter_end
+        ORDER BY m.date""",
+}
+
+
+def analysis_queries(path=ANALYSIS_SQL):
+    """{label: sql} for the aggregating queries, labelled by the comment above each."""
+    text = re.sub(r"/\*.*?\*/", "", Path(path).read_text(encoding="utf-8"), flags=re.S)
+    queries, label = {}, None
+    for chunk in text.split(";"):
+        lines = []
+        for line in chunk.strip().splitlines():
+            if line.lstrip().startswith("#"):
+                label = line.lstrip("# ").split(" - ")[0].strip()
+            elif line.strip():
+                lines.append(line)
+        sql = "\n".join(lines).strip()
+        if "GROUP BY" in sql.upper():
+            queries[label or f"query {len(queries) + 1}"] = sql
+    return queries
+
+
+def generate(rows, seed=0):
+    """(campaigns, iterator of metrics blocks): rows // DAYS campaigns x DAYS unique campaign-days."""
+    from scripts.generate_synthetic_data import generate_campaigns, iter_metrics
+    rng = np.random.default_rng(seed)
+    campaigns, starts, days = generate_campaigns(rng, max(10, rows // DAYS), start=START, days=DAYS)
+    return campaigns, iter_metrics(rng, campaigns, starts, days)
+
+
+def extra_params(engine):
+    """Bind values for EXTRA_QUERIES: the 30 days and the quarter up to the latest
+    metrics date, and a campaign that has rows in that quarter."""
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        last = pd.Timestamp(conn.execute(text("SELECT MAX(date) FROM metrics")).scalar())
+        day = last.strftime("%Y-%m-%d")
+        campaign_id = conn.execute(text("SELECT MIN(campaign_id) FROM metrics WHERE date = :day"),
+                                   {"day": day}).scalar()
+    return {
+        "since": (last - pd.Timedelta(days=29)).strftime("%Y-%m-%d"),
+        "campaign_id": int(campaign_id),
+        "quarter_start": (last - pd.Timedelta(days=90)).strftime("%Y-%m-%d"),
+        "quarter_end": day,
+    }
+
+
+def time_queries(engine, queries, repeats, params=None):
+    """{label: median seconds} over `repeats` runs (after one warm-up run)."""
+    from sqlalchemy import text
+    out = {}
+    params = params or {}
+    with engine.connect() as conn:
+        for label, sql in queries.items():
+            conn.execute(text(sql), params).fetchall()
+            runs = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                runs.append(time.perf_counter() - t0)
+            out[label] = float(np.median(runs))
+    return out
+
+
+BENCH_TABLES = ("predictions", "metrics", "campaigns", "platforms", "schema_migrations")
+
+
+def non_empty_tables(engine, names=BENCH_TABLES):
+    """Those of names that exist in engine's database and hold rows."""
+    from sqlalchemy import inspect
+    existing = set(inspect(engine).get_table_names())
+    found = []
+    with engine.connect() as conn:
+        for name in names:
+            if name in existing and conn.exec_driver_sql(f"SELECT 1 FROM {name} LIMIT 1").first() is not None:
+                found.append(name)
+    return found
+
+
+def bench_size(engine, rows, queries, repeats, log=print):
+    from app.bulk_load import TABLES, PLATFORM_NAMES, create_schema, upsert_frame
+    from app.migrate import migrate
+
+    for name in BENCH_TABLES:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {name}")
+    create_schema(engine)
+    campaigns, blocks = generate(rows)
+    t0 = time.perf_counter()
+    upsert_frame(engine, TABLES["platforms"],
+                 pd.DataFrame({"platform_id": list(PLATFORM_NAMES), "name": list(PLATFORM_NAMES.values())}))
+    upsert_frame(engine, TABLES["campaigns"], campaigns)
+    loaded = sum(upsert_frame(engine, TABLES["metrics"], block) for block in blocks)
+    load_s = time.perf_counter() - t0
+    log(f"{rows:,} rows: loaded {loaded:,} in {load_s:.1f}s ({loaded / load_s:,.0f} rows/s)")
+
+    params = extra_params(engine)
+    log(f"  date-range queries: since {params['since']}, campaign {params['campaign_id']} "
+        f"{params['quarter_start']}..{params['quarter_end']}")
+    before = time_queries(engine, queries, repeats, params)
+    t0 = time.perf_counter()
+    migrate(engine, log=lambda msg: None)
+    migrate_s = time.perf_counter() - t0
+    log(f"  migrations applied in {migrate_s:.1f}s")
+    after = time_queries(engine, queries, repeats, params)
+
+    return pd.DataFrame({
+        "rows": loaded,
+        "dialect": engine.dialect.name,
+        "query": list(queries),
+        "before_ms": [before[q] * 1000 for q in queries],
+        "after_ms": [after[q] * 1000 for q in queries],
+        "migrate_s": migrate_s,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analysis-query latency vs metrics row count, before/after migrations.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000], help="e.g. 1000000 10000000 100000000")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--url", default=None,
+                        help="SQLAlchemy URL of a dedicated benchmark database (its tables are dropped and recreated)")
+    parser.add_argument("--force", action="store_true", help="with --url: drop tables that already hold rows")
+    parser.add_argument("--out", default=str(OUT_CSV))
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    if args.url:
+        engine = create_engine(args.url)
+        existing = non_empty_tables(engine)
+        engine.dispose()
+        if existing and not args.force:
+            sys.exit(f"{engine.url.render_as_string(hide_password=True)} has data in {', '.join(existing)}; "
+                     "point --url at a dedicated benchmark database, or pass --force to drop it")
+
+    queries = {**analysis_queries(), **EXTRA_QUERIES}
+    results = []
+    with tempfile.TemporaryDirectory(prefix="adwise_bench_") as tmp:
+        for rows in args.rows:
+            if args.url:
+                engine = create_engine(args.url)
+            else:
+                engine = create_engine(f"sqlite:///{Path(tmp) / f'bench_{rows}.db'}")
+            results.append(bench_size(engine, rows, queries, args.repeats))
+            engine.dispose()
+
+    report = pd.concat(results, ignore_index=True)
+    report["speedup"] = (report["before_ms"] / report["after_ms"]).round(2)
+    with pd.option_context("display.width", 160, "display.max_colwidth", 40, "display.float_format", "{:,.2f}".format):
+        print(report.drop(columns=["dialect", "migrate_s"]).to_string(index=False))
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report.assign(run_at=pd.Timestamp.now().isoformat(timespec="seconds")).to_csv(
+        out, mode="a", header=not out.exists(), index=False)
+    print(f"Appended to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import sys
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.columnar_store import build_store, STORE_DIR
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Parquet store read by app.etl.get_cached_data().")
+    parser.add_argument("--source", choices=["csv", "mysql"], default="csv",
+                        help="read database/*.csv (default) or the MySQL metrics/campaigns tables")
+    args = parser.parse_args()
+
+    print(f"Building columnar store from {args.source}...")
+    manifest = build_store(source=args.source)
+    print(f"Saved store to {STORE_DIR}")
+    print("Metrics rows:", manifest["metrics_rows"], "| Campaigns rows:", manifest["campaigns_rows"])
+
+if __name__ == "__main__":
+    main()
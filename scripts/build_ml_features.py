@@ -1,15 +1,36 @@
 import sys
+import argparse
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.etl import get_cached_data
-from app.data_loader import create_campaign_features
+from app.data_loader import create_campaign_features, create_campaign_features_parallel, create_campaign_features_streaming
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+METRICS_CSV = PROJECT_ROOT / "database" / "metrics.csv"
+CAMPAIGNS_CSV = PROJECT_ROOT / "database" / "campaigns.csv"
 
 def main():
-    print("Loading row-level joined dataset...")
-    df = get_cached_data()
-    print("Building ML features...")
-    features = create_campaign_features(df)
+    parser = argparse.ArgumentParser(description="Build database/ml_campaign_features.csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="read metrics.csv in bounded chunks (constant memory, no Streamlit cache)")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="rows per chunk in --stream mode")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for the per-campaign aggregation (0 = all cores; ignored with --stream)")
+    args = parser.parse_args()
+
+    if args.stream:
+        print(f"Streaming {METRICS_CSV} in chunks of {args.chunksize:,} rows...")
+        features = create_campaign_features_streaming(METRICS_CSV, CAMPAIGNS_CSV, chunksize=args.chunksize)
+    else:
+        from app.etl import get_cached_data
+        print("Loading row-level joined dataset...")
+        df = get_cached_data(row_kpis=False, attributes=True)
+        if args.workers == 1:
+            print("Building ML features...")
+            features = create_campaign_features(df)
+        else:
+            print(f"Building ML features with {args.workers or 'all'} worker processes...")
+            features = create_campaign_features_parallel(df, workers=args.workers or None)
     features.to_csv("database/ml_campaign_features.csv", index=False)
     print("Saved features to database/ml_campaign_features.csv")
     print("Rows:", len(features))
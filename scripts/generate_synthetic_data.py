@@ -3,54 +3,226 @@ AdWise360 Project: Marketing Campaign Database Schema
 Author: Nidhi Yugesh Sansare
 Date: 22-10-2025
 '''
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-import random
-from datetime import datetime, timedelta
-import os
-
-os.makedirs('database', exist_ok=True)
-
-platforms = [1,2,3]  # assume platforms table already has ids 1,2,3
-objectives = ['Sales','Traffic','Awareness','Engagement']
-regions = ['India','USA','UK']
-
-# Campaigns (10 campaigns)
-campaign_rows=[]
-start_base = datetime(2025,9,1)
-for i, cid in enumerate(range(101,111)):
-    pname = f"Campaign_{cid}"
-    platform = random.choice(platforms)
-    objective = random.choice(objectives)
-    start = start_base + timedelta(days=random.randint(0,9))
-    end = start + timedelta(days=random.randint(10,25))
-    region = random.choice(regions)
-    budget = float(random.randint(5000,20000))
-    campaign_rows.append([cid, pname, platform, objective, start.date().isoformat(), end.date().isoformat(), region, f"{budget:.2f}"])
-
-df_c = pd.DataFrame(campaign_rows, columns=['campaign_id','campaign_name','platform_id','objective','start_date','end_date','region','budget'])
-df_c.to_csv('database/campaigns.csv', index=False)
-
-# Metrics — 20 days per campaign 
-metric_rows=[]
-mid=1
-for row in campaign_rows:
-    cid = row[0]
-    s = datetime.fromisoformat(row[4])
-    days = (datetime.fromisoformat(row[5]) - s).days
-    days = max(days,10)
-    for d in range(days):
-        date = (s + timedelta(days=d)).date().isoformat()
-        impressions = random.randint(2000,50000)
-        ctr = random.uniform(0.01,0.12)
-        clicks = int(impressions * ctr)
-        conversions = max(0, int(clicks * random.uniform(0.02,0.25)))
-        spend = round(clicks * random.uniform(0.3,3.0),2)
-        revenue = round(conversions * random.uniform(5,100),2)
-        metric_rows.append([mid, cid, date, impressions, clicks, conversions, f"{spend:.2f}", f"{revenue:.2f}"])
-        mid += 1
-
-df_m = pd.DataFrame(metric_rows, columns=['metric_id','campaign_id','date','impressions','clicks','conversions','spend','revenue'])
-df_m.to_csv('database/metrics.csv', index=False)
-
-print("Created database/campaigns.csv and database/metrics.csv")
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Synthetic campaigns + daily metrics, generated with vectorized NumPy draws
+# from one seeded Generator. Metrics are produced a block of campaigns at a
+# time (about --chunk-rows rows per block) and streamed to CSV, Parquet or the
+# database, so memory stays bounded whatever the total row count.
+#
+#   python scripts/generate_synthetic_data.py                       # 10 campaigns -> database/*.csv
+#   python scripts/generate_synthetic_data.py --campaigns 50000 --days 2000 \
+#       --format parquet --out-dir /tmp/adwise_100m                  # 100M metric rows
+
+PLATFORMS = [1, 2, 3]  # assume platforms table already has ids 1,2,3
+OBJECTIVES = ['Sales', 'Traffic', 'Awareness', 'Engagement']
+REGIONS = ['India', 'USA', 'UK']
+
+
+def generate_campaigns(rng, n_campaigns, first_id=101, start='2025-09-01', days=None,
+                       platforms=PLATFORMS, objectives=OBJECTIVES, regions=REGIONS):
+    """
+    Campaign table. Start dates fall in the first 10 days after `start`; each
+    runs `days` days, or 10-25 days when days is None (one metric row per day).
+    """
+    ids = np.arange(first_id, first_id + n_campaigns)
+    starts = np.datetime64(start, 'D') + rng.integers(0, 10, n_campaigns)
+    length = rng.integers(10, 26, n_campaigns) if days is None else np.full(n_campaigns, days)
+    campaigns = pd.DataFrame({
+        'campaign_id': ids,
+        'campaign_name': np.char.add('Campaign_', ids.astype(str)),
+        'platform_id': rng.choice(np.asarray(platforms), n_campaigns),
+        'objective': rng.choice(np.asarray(objectives), n_campaigns),
+        'start_date': np.datetime_as_string(starts, unit='D'),
+        'end_date': np.datetime_as_string(starts + length, unit='D'),
+        'region': rng.choice(np.asarray(regions), n_campaigns),
+        'budget': rng.integers(5000, 20001, n_campaigns).astype(np.float64),
+    })
+    return campaigns, starts, length
+
+
+def metrics_block(rng, ids, starts, metric_days, first_metric_id):
+    """Daily metric rows for one block of campaigns (one row per campaign-day)."""
+    n = int(metric_days.sum())
+    offsets = np.arange(n) - np.repeat(np.cumsum(metric_days) - metric_days, metric_days)
+    impressions = rng.integers(2000, 50001, n)
+    clicks = (impressions * rng.uniform(0.01, 0.12, n)).astype(np.int64)
+    conversions = (clicks * rng.uniform(0.02, 0.25, n)).astype(np.int64)
+    return pd.DataFrame({
+        'metric_id': np.arange(first_metric_id, first_metric_id + n),
+        'campaign_id': np.repeat(ids, metric_days),
+        'date': np.repeat(starts, metric_days) + offsets,
+        'impressions': impressions,
+        'clicks': clicks,
+        'conversions': conversions,
+        'spend': (clicks * rng.uniform(0.3, 3.0, n)).round(2),
+        'revenue': (conversions * rng.uniform(5, 100, n)).round(2),
+    })
+
+
+def iter_metrics(rng, campaigns, starts, metric_days, chunk_rows=1_000_000):
+    """Metric blocks of whole campaigns, about chunk_rows rows each, with consecutive metric_ids."""
+    ids = campaigns['campaign_id'].to_numpy()
+    ends = np.cumsum(metric_days)
+    lo, next_id = 0, 1
+    while lo < len(ids):
+        # campaigns whose rows fit in this chunk (at least one)
+        hi = max(lo + 1, int(np.searchsorted(ends, (ends[lo - 1] if lo else 0) + chunk_rows, side='right')))
+        block = metrics_block(rng, ids[lo:hi], starts[lo:hi], metric_days[lo:hi], next_id)
+        next_id += len(block)
+        lo = hi
+        yield block
+
+
+def _arrow_table(block):
+    import pyarrow as pa
+    table = pa.Table.from_pandas(block, preserve_index=False)
+    # calendar dates, not timestamps
+    return table.set_column(table.schema.get_field_index('date'), 'date', table['date'].cast(pa.date32()))
+
+
+class CsvSink:
+    """metrics.csv written block by block; pyarrow's CSV writer when available (~10x pandas)."""
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        try:
+            import pyarrow.csv as pacsv
+        except ImportError:  # pragma: no cover - depends on environment
+            pacsv = None
+        self.pacsv = pacsv
+
+    def campaigns(self, df):
+        df.to_csv(self.out_dir / 'campaigns.csv', index=False, float_format='%.2f')
+
+    def open_metrics(self):
+        self.path = self.out_dir / 'metrics.csv'
+        self.f = open(self.path, 'wb')
+        self.header = True
+
+    def write(self, block):
+        if self.pacsv is not None:
+            if self.header:
+                # arrow quotes header names; keep the plain header of the pandas CSVs
+                self.f.write((','.join(block.columns) + '\n').encode())
+            options = self.pacsv.WriteOptions(include_header=False, quoting_style='needed')
+            self.pacsv.write_csv(_arrow_table(block), self.f, options)
+        else:
+            block = block.assign(date=np.datetime_as_string(block['date'].to_numpy(dtype='datetime64[D]'), unit='D'))
+            self.f.write(block.to_csv(index=False, header=self.header, float_format='%.2f').encode())
+        self.header = False
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetSink:
+    def __init__(self, out_dir):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa, self.pq = pa, pq
+        self.out_dir = Path(out_dir)
+
+    def campaigns(self, df):
+        self.pq.write_table(self.pa.Table.from_pandas(df, preserve_index=False), self.out_dir / 'campaigns.parquet')
+
+    def open_metrics(self):
+        self.path = self.out_dir / 'metrics.parquet'
+        self.writer = None
+
+    def write(self, block):
+        table = _arrow_table(block)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema, compression='snappy')
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class DbSink:
+    """Batched upserts through app/bulk_load.py (get_db_connection() or --url)."""
+
+    def __init__(self, url=None):
+        from app import bulk_load
+        self.bulk = bulk_load
+        if url:
+            from app.db_connection import get_engine
+            self.engine = get_engine(url)
+        else:
+            from app.db_connection import get_db_connection
+            self.engine = get_db_connection()
+        self.path = self.engine.url.render_as_string(hide_password=True)
+        bulk_load.create_schema(self.engine)
+
+    def campaigns(self, df):
+        ids = sorted(df['platform_id'].unique())
+        platforms = pd.DataFrame({'platform_id': ids,
+                                  'name': [self.bulk.PLATFORM_NAMES.get(int(i), f'Platform {i}') for i in ids]})
+        self.bulk.upsert_frame(self.engine, 'platforms', platforms)
+        self.bulk.upsert_frame(self.engine, 'campaigns', df)
+
+    def open_metrics(self):
+        pass
+
+    def write(self, block):
+        self.bulk.upsert_frame(self.engine, 'metrics', block)
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic campaigns and daily metrics.')
+    parser.add_argument('--campaigns', type=int, default=10)
+    parser.add_argument('--days', type=int, default=None, help='metric days per campaign (default: random 10-25)')
+    parser.add_argument('--start-date', default='2025-09-01')
+    parser.add_argument('--first-campaign-id', type=int, default=101)
+    parser.add_argument('--platforms', type=int, nargs='+', default=PLATFORMS)
+    parser.add_argument('--regions', nargs='+', default=REGIONS)
+    parser.add_argument('--objectives', nargs='+', default=OBJECTIVES)
+    parser.add_argument('--seed', type=int, default=None, help='fix for reproducible output (with the same --chunk-rows)')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'db'], default='csv')
+    parser.add_argument('--out-dir', default=str(PROJECT_ROOT / 'database'))
+    parser.add_argument('--url', default=None, help='--format db: SQLAlchemy URL instead of get_db_connection()')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help='metric rows generated and written per block')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    campaigns, starts, metric_days = generate_campaigns(
+        rng, args.campaigns, args.first_campaign_id, args.start_date, args.days,
+        args.platforms, args.objectives, args.regions)
+
+    if args.format == 'db':
+        sink = DbSink(args.url)
+    else:
+        Path(args.out_dir).mkdir(parents=True, exist_ok=True)
+        sink = CsvSink(args.out_dir) if args.format == 'csv' else ParquetSink(args.out_dir)
+
+    t0 = time.perf_counter()
+    sink.campaigns(campaigns)
+    sink.open_metrics()
+    rows = 0
+    try:
+        for block in iter_metrics(rng, campaigns, starts, metric_days, args.chunk_rows):
+            sink.write(block)
+            rows += len(block)
+    finally:
+        sink.close()
+    seconds = time.perf_counter() - t0
+    print(f"Created {len(campaigns):,} campaigns and {rows:,} metric rows -> {sink.path} "
+          f"in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
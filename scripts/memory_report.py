@@ -0,0 +1,29 @@
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of the joined frame: wide object layout vs compact schema.")
+    parser.parse_args()
+
+    import pandas as pd
+    from app.etl import load_wide_frame
+    from app.schema import compact_frame, campaign_side_table, memory_report
+
+    wide, campaigns = load_wide_frame()
+    compact = compact_frame(wide)
+    side = campaign_side_table(campaigns)
+    report = memory_report(wide, compact, side)
+
+    with pd.option_context("display.width", 120, "display.float_format", "{:,.3f}".format):
+        print(report.to_string())
+    total = report.loc["TOTAL"]
+    print(f"\n{len(wide):,} rows: {total['wide_mb']:,.2f} MiB -> {total['compact_mb']:,.2f} MiB "
+          f"({total['wide_mb'] / max(total['compact_mb'], 1e-9):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
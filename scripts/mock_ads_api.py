@@ -0,0 +1,122 @@
+import sys
+import zlib
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Local stand-in for the Google Ads / Facebook Ads / YouTube report endpoints
+# used by app/api_ingest.py. Numbers are a deterministic function of
+# (campaign, day), pages are cursor-based, and --fail-rate injects 429s with
+# Retry-After so retry/backoff can be exercised.
+
+
+def _day_metrics(campaign_id, day):
+    rng = random.Random(zlib.crc32(f"{campaign_id}:{day}".encode()))
+    impressions = rng.randint(500, 50_000)
+    clicks = int(impressions * rng.uniform(0.005, 0.08))
+    conversions = int(clicks * rng.uniform(0.01, 0.2))
+    spend = round(clicks * rng.uniform(0.2, 3.0), 2)
+    revenue = round(conversions * rng.uniform(5, 120), 2)
+    return impressions, clicks, conversions, spend, revenue
+
+
+def _days(start, end):
+    import pandas as pd
+    return [d.date().isoformat() for d in pd.date_range(start, end, freq="D")]
+
+
+def _page(days, cursor, size):
+    offset = int(cursor or 0)
+    chunk = days[offset:offset + size]
+    nxt = offset + size if offset + size < len(days) else None
+    return chunk, (str(nxt) if nxt is not None else None)
+
+
+def build_app(fail_rate=0.0, page_size=None, latency=0.0):
+    import asyncio
+    from aiohttp import web
+
+    counters = {"requests": 0, "throttled": 0}
+
+    @web.middleware
+    async def chaos(request, handler):
+        counters["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if fail_rate and random.random() < fail_rate:
+            counters["throttled"] += 1
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "0.05"})
+        return await handler(request)
+
+    def size(q, key):
+        return min(int(q.get(key, 500)), page_size or 10**9)
+
+    async def google(request):
+        q = request.query
+        cid = int(q["campaignId"])
+        days, token = _page(_days(q["startDate"], q["endDate"]), q.get("pageToken"), size(q, "pageSize"))
+        results = []
+        for d in days:
+            imp, clk, conv, spend, rev = _day_metrics(cid, d)
+            results.append({"campaignId": str(cid), "segmentsDate": d, "impressions": str(imp), "clicks": str(clk),
+                            "conversions": float(conv), "costMicros": str(int(round(spend * 1e6))),
+                            "conversionsValue": rev})
+        body = {"results": results}
+        if token:
+            body["nextPageToken"] = token
+        return web.json_response(body)
+
+    async def facebook(request):
+        q = request.query
+        cid = int(q["campaign_id"])
+        days, after = _page(_days(q["since"], q["until"]), q.get("after"), size(q, "limit"))
+        data = []
+        for d in days:
+            imp, clk, conv, spend, rev = _day_metrics(cid, d)
+            data.append({"campaign_id": str(cid), "date_start": d, "date_stop": d, "impressions": str(imp),
+                         "clicks": str(clk), "conversions": str(conv), "spend": f"{spend:.2f}",
+                         "purchase_value": f"{rev:.2f}"})
+        paging = {"cursors": {"after": after}} if after else {}
+        if after:
+            paging["next"] = f"{request.path}?after={after}"
+        return web.json_response({"data": data, "paging": paging})
+
+    async def youtube(request):
+        q = request.query
+        cid = int(q["filters"].split("==", 1)[1])
+        days, token = _page(_days(q["startDate"], q["endDate"]), q.get("pageToken"), size(q, "maxResults"))
+        names = ["campaign", "day", "adImpressions", "clicks", "conversions", "cost", "revenue"]
+        rows = [[cid, d, *_day_metrics(cid, d)] for d in days]
+        body = {"columnHeaders": [{"name": n} for n in names], "rows": rows}
+        if token:
+            body["nextPageToken"] = token
+        return web.json_response(body)
+
+    async def stats(request):
+        return web.json_response(counters)
+
+    app = web.Application(middlewares=[chaos])
+    app.router.add_get("/google_ads/report", google)
+    app.router.add_get("/facebook_ads/insights", facebook)
+    app.router.add_get("/youtube/report", youtube)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock ad-platform report API for app/api_ingest.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--page-size", type=int, default=None, help="cap on rows per page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    from aiohttp import web
+    web.run_app(build_app(args.fail_rate, args.page_size, args.latency), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pandas as pd
+
+from app.api_ingest import append_to_metrics_csv, retry_after_seconds
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert retry_after_seconds("3") == 3.0
+    soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= retry_after_seconds(soon) <= 30
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+
+
+def _pull(days):
+    return pd.DataFrame({"campaign_id": 101, "date": pd.to_datetime(days), "impressions": 10, "clicks": 1,
+                         "conversions": 0, "spend": 1.5, "revenue": 2.0})
+
+
+def test_append_skips_campaign_days_already_in_the_csv(tmp_path):
+    path = tmp_path / "metrics.csv"
+    assert append_to_metrics_csv(_pull(["2025-09-01", "2025-09-02"]), path) == 2
+    assert append_to_metrics_csv(_pull(["2025-09-02", "2025-09-03"]), path) == 1
+    assert append_to_metrics_csv(_pull(["2025-09-01", "2025-09-03"]), path) == 0
+
+    out = pd.read_csv(path)
+    assert out["metric_id"].tolist() == [1, 2, 3]
+    assert out["date"].tolist() == ["2025-09-01", "2025-09-02", "2025-09-03"]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from app.charts import downsample_series, lttb, scatter_sample
+
+
+def _frame(campaign_ids):
+    ids = np.asarray(campaign_ids)
+    return pd.DataFrame({"campaign_id": ids, "impressions": 100, "clicks": 5, "spend": 2.0, "revenue": 3.0})
+
+
+def test_scatter_sample_keeps_every_campaign_when_quotas_overflow():
+    # many one-row campaigns plus one huge campaign: the minimum quotas alone overshoot
+    ids = np.r_[np.arange(3000), np.full(100_000, 99_999)]
+    out = scatter_sample(_frame(ids), max_points=4000, names=pd.Series(ids, index=ids).drop_duplicates())
+    assert len(out) == 4000
+    assert out["campaign_name"].nunique() == 3001
+
+
+def test_scatter_sample_small_frame_is_untouched():
+    out = scatter_sample(_frame([1, 1, 2]), max_points=10)
+    assert len(out) == 3
+
+
+def test_lttb_keeps_endpoints_and_point_count():
+    x = np.arange(10_000)
+    y = np.sin(x / 50.0)
+    keep = lttb(x, y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_the_spike():
+    y = np.zeros(5_000)
+    y[1234] = 100.0
+    assert 1234 in lttb(np.arange(len(y)), y, 100)
+
+
+def test_lttb_short_input_is_untouched():
+    assert lttb(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_downsample_series_keeps_first_and_last_date():
+    series = pd.Series(np.random.default_rng(0).random(3_000),
+                       index=pd.date_range("2024-01-01", periods=3_000, freq="h"))
+    out = downsample_series(series, max_points=200)
+    assert len(out) == 200
+    assert out.index[0] == series.index[0] and out.index[-1] == series.index[-1]
@@ -0,0 +1,38 @@
+import pandas as pd
+from sqlalchemy import create_engine
+
+from app import columnar_store
+
+
+def _engine(tmp_path, metrics):
+    engine = create_engine(f"sqlite:///{tmp_path / 'adwise.db'}")
+    metrics.to_sql("metrics", engine, index=False)
+    pd.DataFrame({"campaign_id": [101, 102], "platform_id": [1, 2], "budget": [5000.0, 7000.5]}).to_sql(
+        "campaigns", engine, index=False)
+    return engine
+
+
+def _metrics(ids, spend):
+    return pd.DataFrame({"metric_id": ids, "campaign_id": 101, "date": "2025-09-01", "impressions": 100,
+                         "clicks": 10, "conversions": 1, "spend": spend, "revenue": 9.99})
+
+
+def test_db_signature_tracks_appends(tmp_path):
+    engine = _engine(tmp_path, _metrics([1, 2, 3], [1.10, 2.20, 3.30]))
+    before = columnar_store.db_signature(engine)
+    new = _metrics([4, 5], [0.01, 4.44])
+    new.to_sql("metrics", engine, index=False, if_exists="append")
+
+    after = columnar_store.db_signature(engine)
+    assert not columnar_store.db_signatures_match(before, after)
+    assert columnar_store.db_signatures_match(columnar_store.advance_db_signature(before, new), after)
+
+
+def test_db_signature_detects_edit_of_existing_row(tmp_path):
+    engine = _engine(tmp_path, _metrics([1, 2, 3], [1.10, 2.20, 3.30]))
+    before = columnar_store.db_signature(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE metrics SET spend = 2.21 WHERE metric_id = 2")
+
+    after = columnar_store.db_signature(engine)
+    assert not columnar_store.db_signatures_match(columnar_store.advance_db_signature(before, _metrics([], [])), after)
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.kpi import aggregate_kpis, roi_percent, safe_ratio, with_row_kpis
+
+
+def test_aggregate_kpis_are_ratios_of_sums():
+    rows = pd.DataFrame({"impressions": [1000, 10], "clicks": [10, 5], "spend": [100.0, 1.0],
+                         "revenue": [150.0, 10.0]})
+    kpis = aggregate_kpis(rows.sum())
+    assert kpis["CTR"] == pytest.approx(15 / 1010 * 100)
+    assert kpis["CPC"] == pytest.approx(101 / 15)
+    assert kpis["ROAS"] == pytest.approx(160 / 101)
+    # (SUM(revenue) - SUM(spend)) / SUM(spend) * 100, as in the SQL reports; not a mean of row ratios
+    assert kpis["ROI"] == pytest.approx((160 - 101) / 101 * 100)
+
+
+def test_zero_denominators_give_zero():
+    kpis = aggregate_kpis({"impressions": 0, "clicks": 0, "spend": 0, "revenue": 5})
+    assert kpis == {"CTR": 0.0, "CPC": 0.0, "ROAS": 0.0, "ROI": 0.0}
+    assert safe_ratio(np.array([1.0, 2.0]), np.array([0, 4]), on_zero="numerator").tolist() == [1.0, 0.5]
+
+
+def test_row_level_column_is_roas_not_roi():
+    rows = with_row_kpis(pd.DataFrame({"impressions": [100], "clicks": [4], "spend": [2.0], "revenue": [5.0]}))
+    assert rows["ROAS"].tolist() == [2.5]
+    assert "ROI" not in rows.columns
+    assert roi_percent(5.0, 2.0) == pytest.approx(150.0)
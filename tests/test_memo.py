@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from app.memo import MemoCache, estimate_size
+
+MB = 1024 * 1024
+
+
+def _block(mb):
+    return np.zeros(int(mb * MB) // 8)
+
+
+def test_estimate_size_counts_frames_and_containers():
+    frame = pd.DataFrame({"a": np.zeros(1000), "b": np.ones(1000)})
+    assert estimate_size(frame) >= 16_000
+    assert estimate_size((frame, _block(1))) >= 16_000 + MB
+
+
+def test_byte_budget_evicts_least_recently_used():
+    memo = MemoCache(budget_mb=3)
+    for key in ("a", "b", "c"):
+        memo.put(key, _block(1))
+    # touch "a" so "b" is now the oldest
+    assert memo.get_or_compute("a", lambda: None) is not None
+    memo.put("d", _block(1))
+    assert memo.bytes <= memo.budget
+    assert memo.evictions == 1
+    assert set(memo._entries) == {"a", "c", "d"}
+
+
+def test_value_larger_than_budget_is_not_cached():
+    memo = MemoCache(budget_mb=1)
+    memo.get_or_compute("big", _block, 2)
+    assert memo.stats()["entries"] == 0 and memo.bytes == 0
+
+
+def test_invalidate_keeps_version_independent_entries():
+    memo = MemoCache(budget_mb=1)
+    memo.put(("k", 1, None, ()), 1)
+    memo.put(("k", 2, None, ()), 2)
+    memo.put(("k", None, None, ()), 3)
+    memo.invalidate(2)
+    assert set(k[1] for k in memo._entries) == {2, None}
+    assert memo.bytes == sum(size for _, size in memo._entries.values())
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from app.etl import _prepare_frame
+from app.schema import append_compact, compact_frame, campaign_side_table
+
+
+def _sources():
+    campaigns = pd.DataFrame({
+        "campaign_id": [101, 102, 300],
+        "campaign_name": ["A", "B", "C"],
+        "platform_id": [1, 2, 3],
+        "objective": ["Sales", "Traffic", "Awareness"],
+        "start_date": ["2025-09-01"] * 3,
+        "end_date": ["2025-09-30"] * 3,
+        "region": ["UK", "India", "Germany"],
+        "budget": [5000, 6000, 7000],
+    })
+    metrics = pd.DataFrame({
+        "metric_id": range(1, 9),
+        "campaign_id": [101, 102, 101, 102, 101, 300, 300, 102],
+        "date": pd.date_range("2025-09-01", periods=8).strftime("%Y-%m-%d"),
+        "impressions": [1000, 2000, 1500, 1200, 900, 3000, 100_000, 800],
+        "clicks": [50, 80, 60, 40, 30, 200, 5000, 20],
+        "conversions": [5, 8, 6, 4, 3, 20, 500, 2],
+        "spend": [10.5, 20.0, 12.25, 8.0, 6.0, 40.0, 900.0, 4.0],
+        "revenue": [50.0, 70.0, 30.0, 9.0, 12.0, 120.0, 1800.0, 1.0],
+    })
+    return metrics, campaigns
+
+
+@pytest.mark.parametrize("split", [1, 3, 5, 7])
+def test_incremental_ingest_matches_full_load(split):
+    metrics, campaigns = _sources()
+    full = compact_frame(_prepare_frame(metrics, campaigns))
+
+    # same path as etl._ingest_locked: compact delta appended to the cached frame
+    frame = compact_frame(_prepare_frame(metrics.iloc[:split], campaigns))
+    for lo in range(split, len(metrics), 2):
+        delta = compact_frame(_prepare_frame(metrics.iloc[lo:lo + 2], campaigns))
+        frame = append_compact(frame, delta)
+
+    pd.testing.assert_frame_equal(frame, full)
+
+
+def test_new_category_is_sorted_in():
+    metrics, campaigns = _sources()
+    frame = compact_frame(_prepare_frame(metrics.iloc[:5], campaigns))
+    delta = compact_frame(_prepare_frame(metrics.iloc[5:], campaigns))
+    out = append_compact(frame, delta)
+    assert list(out["region"].cat.categories) == ["Germany", "India", "UK"]
+    assert list(out["region"]) == list(campaigns.set_index("campaign_id").loc[metrics["campaign_id"], "region"])
+
+
+def test_side_table_keeps_string_budget_numeric():
+    campaigns = pd.DataFrame({"campaign_id": [1, 2], "campaign_name": ["a", "b"], "budget": ["5000", "oops"]})
+    side = campaign_side_table(campaigns)
+    assert side["budget"].tolist() == [5000.0, 0.0]
+    assert isinstance(side["campaign_name"].dtype, pd.CategoricalDtype)